@@ -0,0 +1,68 @@
+"""Benchmark fixtures.
+
+Run with:  pytest benchmarks [--tc-benchmark-json=results.json]
+
+Each benchmark reports its results through the `report` fixture. The
+results are printed at the end of the run and, with --tc-benchmark-json,
+written to a JSON file so runs can be compared across releases.
+"""
+
+import importlib.metadata
+import json
+import platform
+import time
+
+import pytest
+
+_RESULTS: list[tuple[str, str, float, str]] = []
+
+
+def pytest_addoption(parser):
+    """Add the --tc-benchmark-json option."""
+    parser.addoption(
+        "--tc-benchmark-json",
+        metavar="PATH",
+        help="write benchmark results to PATH as JSON",
+    )
+
+
+@pytest.fixture
+def report(request):
+    """Return a function that records a named benchmark result."""
+
+    def _report(metric: str, value: float, unit: str) -> None:
+        _RESULTS.append((request.node.name, metric, value, unit))
+
+    return _report
+
+
+def _package_version() -> str:
+    try:
+        return importlib.metadata.version("total-connect-client")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Print all benchmark results, and write them as JSON if asked."""
+    if not _RESULTS:
+        return
+    terminalreporter.section("benchmark results")
+    for name, metric, value, unit in _RESULTS:
+        terminalreporter.write_line(f"{name:40} {metric:24} {value:14,.1f} {unit}")
+
+    path = config.getoption("tc_benchmark_json")
+    if path:
+        document = {
+            "version": _package_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "results": [
+                {"benchmark": name, "metric": metric, "value": value, "unit": unit}
+                for name, metric, value, unit in _RESULTS
+            ],
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=2)
+        terminalreporter.write_line(f"benchmark results written to {path}")
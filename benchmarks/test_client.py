@@ -0,0 +1,116 @@
+"""Benchmark the client end to end against the local stand-in server.
+
+Every request to the stand-in takes LATENCY seconds, so the numbers show
+how the client's request pattern adds up over a real network.
+"""
+
+import time
+import tracemalloc
+
+import pytest
+
+from total_connect_client.client import TotalConnectClient
+from total_connect_client.const import ArmType
+from total_connect_client.standin import StandInServer, StandInService
+
+LATENCY = 0.005  # seconds per request
+ZONES = 64
+POLL_ROUNDS = 5
+USERCODES = {"default": "1234"}
+
+
+@pytest.fixture(name="server", params=[1, 10], ids=lambda count: f"{count}locations")
+def fixture_server(request):
+    """Run a stand-in with the given number of locations."""
+    service = StandInService(num_locations=request.param, num_zones=ZONES, num_partitions=2)
+    service.default_behavior.latency = LATENCY
+    with StandInServer(service) as server:
+        yield server
+
+
+def make_client(server, **kwargs):
+    """Return a client connected to the stand-in server."""
+    return TotalConnectClient(
+        "user", "pass", USERCODES, retry_delay=0, transport=server.transport(), **kwargs
+    )
+
+
+def test_startup(server, report):
+    """Time each phase of constructing a client."""
+    timings = make_client(server).metrics.timings
+    for step in ("authenticate", "session details", "load_details", "__init__"):
+        report(step, timings[step] * 1000, "ms")
+
+
+def test_lazy_first_location(server, report):
+    """Time a lazy client from construction to the zones of one location."""
+    start = time.perf_counter()
+    client = make_client(server, lazy=True)
+    constructed = time.perf_counter() - start
+    assert next(iter(client.locations.values())).zones
+    report("construct", constructed * 1000, "ms")
+    report("first location zones", (time.perf_counter() - start) * 1000, "ms")
+
+
+def test_poll_throughput(server, report):
+    """Poll every location repeatedly, as an integration does."""
+    client = make_client(server)
+    locations = list(client.locations.values())
+    start = time.perf_counter()
+    for _ in range(POLL_ROUNDS):
+        for location in locations:
+            location.get_panel_meta_data()
+    elapsed = time.perf_counter() - start
+    report("polls", POLL_ROUNDS * len(locations) / elapsed, "polls/s")
+    report("round over all locations", elapsed / POLL_ROUNDS * 1000, "ms")
+
+
+def test_arm_disarm(server, report):
+    """Time arming and disarming, each followed by the poll that confirms it."""
+    location = next(iter(make_client(server).locations.values()))
+
+    start = time.perf_counter()
+    location.arm(ArmType.AWAY)
+    location.get_panel_meta_data()
+    armed = time.perf_counter()
+    assert location.arming_state.is_armed_away()
+
+    location.disarm()
+    location.get_panel_meta_data()
+    disarmed = time.perf_counter()
+    assert location.arming_state.is_disarmed()
+
+    report("arm round trip", (armed - start) * 1000, "ms")
+    report("disarm round trip", (disarmed - armed) * 1000, "ms")
+
+
+def test_reauthentication(server, report):
+    """Time a poll that finds its session expired, against a normal poll."""
+    client = make_client(server)
+    location = next(iter(client.locations.values()))
+
+    start = time.perf_counter()
+    location.get_panel_meta_data()
+    normal = time.perf_counter() - start
+
+    server.service.expire_sessions()
+    start = time.perf_counter()
+    location.get_panel_meta_data()
+    expired = time.perf_counter() - start
+    assert server.service.request_counts["token"] == 2
+
+    report("poll", normal * 1000, "ms")
+    report("poll with re-auth", expired * 1000, "ms")
+
+
+def test_memory(server, report):
+    """Measure peak memory allocated while constructing a client."""
+    tracemalloc.start()
+    try:
+        client = make_client(server)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    report("peak", peak / 1024, "KiB")
+    report("retained", current / 1024, "KiB")
+    assert client.locations
@@ -0,0 +1,41 @@
+"""Benchmark polling many accounts with a fleet.
+
+The stand-in answers in process, so the numbers are the client's own
+cost per account and per poll.
+"""
+
+import time
+import tracemalloc
+
+from total_connect_client.fleet import TotalConnectFleet
+from total_connect_client.ratelimit import HostRateLimits
+from total_connect_client.standin import StandInService
+
+ACCOUNTS = 200
+
+
+def test_fleet(report):
+    """Load and poll many accounts, and measure memory per account."""
+    service = StandInService(num_zones=16)
+    # no host limit: the stand-in is in process
+    fleet = TotalConnectFleet(
+        transport=service.transport(),
+        retry_delay=0,
+        rate_limits=HostRateLimits(rate=1e6, burst=1e6),
+    )
+    tracemalloc.start()
+    accounts = [fleet.add_account(f"user{number}", "pass") for number in range(ACCOUNTS)]
+    start = time.perf_counter()
+    for account in accounts:
+        fleet.poll(account)
+    loaded = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for account in accounts:
+        fleet.poll(account)
+    polled = time.perf_counter() - start
+    report("first poll (login and load)", loaded / ACCOUNTS * 1000, "ms/account")
+    report("unchanged polls", ACCOUNTS / polled, "polls/s")
+    report("memory", memory / ACCOUNTS / 1024, "KiB/account")
@@ -0,0 +1,98 @@
+"""Benchmark the pure-Python cost of handling API responses.
+
+Payloads come from the stand-in's simulated panels, and requests go
+through FakeTransport, so no time is spent on sockets or HTTP parsing.
+"""
+
+import copy
+import time
+from collections.abc import Callable
+
+import pytest
+
+from total_connect_client.client import TotalConnectClient
+from total_connect_client.standin import StandInService
+from total_connect_client.zone import ZoneStatus
+
+ZONE_COUNTS = [8, 64, 250]
+ROUNDS = 200
+LOCATION_ID = 1000001
+
+
+@pytest.fixture(name="service", params=ZONE_COUNTS, ids=lambda count: f"{count}zones")
+def fixture_service(request):
+    """Return a stand-in with one panel of each size."""
+    return StandInService(num_zones=request.param, num_partitions=2)
+
+
+@pytest.fixture(name="client")
+def fixture_client(service):
+    """Return a client loaded from the stand-in."""
+    return TotalConnectClient(
+        "user", "pass", {"default": "1234"}, retry_delay=0, transport=service.transport()
+    )
+
+
+def per_second(func: Callable[[], object], rounds: int = ROUNDS) -> float:
+    """Call func rounds times; return calls per second."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return rounds / (time.perf_counter() - start)
+
+
+def test_update_status(client, service, report):
+    """Apply the panel status of a fullStatus response."""
+    location = client.locations[LOCATION_ID]
+    result = service.panels[LOCATION_ID].full_status()
+    report("_update_status", per_second(lambda: location._update_status(result)), "calls/s")
+
+
+def test_update_partitions(client, service, report):
+    """Apply the partitions of a fullStatus response."""
+    location = client.locations[LOCATION_ID]
+    partitions = service.panels[LOCATION_ID].full_status()["PanelStatus"]["Partitions"]
+    rate = per_second(lambda: location._update_partitions(partitions))
+    report("_update_partitions", rate, "calls/s")
+
+
+def test_update_zones(client, service, report):
+    """Apply the zones of a fullStatus response, with one zone changing each time."""
+    location = client.locations[LOCATION_ID]
+    panel = service.panels[LOCATION_ID]
+    payloads = []
+    for round_number in range(ROUNDS):
+        panel.set_zone_status(1, ZoneStatus.FAULT if round_number % 2 else ZoneStatus.NORMAL)
+        # freshly decoded data each poll, as http_request would return
+        payloads.append(copy.deepcopy(panel.full_status()["PanelStatus"]["Zones"]))
+    zones = iter(payloads)
+    report("_update_zones", per_second(lambda: location._update_zones(next(zones))), "calls/s")
+
+
+def test_raise_for_resultcode(report):
+    """Check a successful response; this does not depend on the panel size."""
+    client = TotalConnectClient("user", "pass", transport=StandInService().transport())
+    response = {"ResultCode": 0, "ResultData": "Success"}
+    rate = per_second(lambda: client.raise_for_resultcode(response), ROUNDS * 100)
+    report("raise_for_resultcode", rate, "calls/s")
+
+
+def test_get_panel_meta_data(client, report):
+    """Poll a location end to end, including JSON encoding and decoding."""
+    location = client.locations[LOCATION_ID]
+    report("get_panel_meta_data", per_second(location.get_panel_meta_data), "polls/s")
+
+
+def test_get_panel_meta_data_unchanged(service, report):
+    """Poll an unchanged location with skip_unchanged, which skips decoding the response."""
+    client = TotalConnectClient(
+        "user",
+        "pass",
+        {"default": "1234"},
+        retry_delay=0,
+        transport=service.transport(),
+        skip_unchanged=True,
+    )
+    location = client.locations[LOCATION_ID]
+    rate = per_second(location.get_panel_meta_data)
+    report("get_panel_meta_data unchanged", rate, "polls/s")
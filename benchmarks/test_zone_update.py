@@ -0,0 +1,93 @@
+"""Benchmark TotalConnectZone._update, the innermost loop of every poll."""
+
+import time
+from unittest.mock import Mock
+
+from total_connect_client.location import TotalConnectLocation
+from total_connect_client.zone import TotalConnectZone, ZoneStatus, ZoneType
+
+NUM_ZONES = 10_000
+ROUNDS = 5
+
+LOCATION_INFO = {
+    "LocationID": 1,
+    "LocationName": "Benchmark",
+    "PhotoURL": "",
+    "LocationModuleFlags": "Security=1",
+    "SecurityDeviceID": 1,
+}
+
+# raw ZoneTypeId values, including one that is not in the ZoneType enum
+ZONE_TYPES = [
+    ZoneType.ENTRY_EXIT1.value,
+    ZoneType.PERIMETER.value,
+    ZoneType.INTERIOR_FOLLOWER.value,
+    12345,
+]
+
+
+def make_zone(zone_id: int, status: int) -> dict:
+    """Return zone data shaped like ZoneStatusInfoWithPartitionId."""
+    return {
+        "ZoneID": zone_id,
+        "ZoneDescription": f"Zone {zone_id}",
+        "PartitionId": 1 + zone_id % 2,
+        "Batterylevel": 5,
+        "Signalstrength": 3,
+        "zoneAdditionalInfo": {
+            "SensorSerialNumber": f"{zone_id:06}",
+            "LoopNumber": 1,
+            "ResponseType": "1",
+            "AlarmReportState": 1,
+            "ZoneSupervisionType": 0,
+            "ChimeState": 1,
+            "DeviceType": 0,
+        },
+        "CanBeBypassed": 1,
+        "ZoneStatus": status,
+        "ZoneTypeId": ZONE_TYPES[zone_id % len(ZONE_TYPES)],
+    }
+
+
+def make_zones(status: int) -> list[dict]:
+    """Return NUM_ZONES zones, all with the given status."""
+    return [make_zone(zone_id, status) for zone_id in range(1, NUM_ZONES + 1)]
+
+
+def make_location() -> tuple[TotalConnectLocation, list[TotalConnectZone]]:
+    """Return a location with NUM_ZONES normal zones."""
+    location = TotalConnectLocation(LOCATION_INFO, Mock())
+    zones = [TotalConnectZone(data, location) for data in make_zones(ZoneStatus.NORMAL)]
+    return location, zones
+
+
+def time_updates(zones: list[TotalConnectZone], payloads: list[list[dict]]) -> float:
+    """Apply each payload list to the zones in turn; return zones updated per second."""
+    start = time.perf_counter()
+    for payload in payloads:
+        for zone, data in zip(zones, payload, strict=True):
+            zone._update(data)
+    elapsed = time.perf_counter() - start
+    return len(zones) * len(payloads) / elapsed
+
+
+def test_changed_zone_updates(report):
+    """Every update changes the zone status, so no update can be skipped."""
+    location, zones = make_location()
+    faulted = make_zones(ZoneStatus.FAULT)
+    normal = make_zones(ZoneStatus.NORMAL)
+
+    rate = time_updates(zones, [faulted, normal] * ROUNDS)
+    report("changed zones/second", rate, "zones/s")
+    assert not location.zones_with_status(ZoneStatus.FAULT)
+
+
+def test_unchanged_zone_updates(report):
+    """Every update repeats the previous data, as most zones do on most polls."""
+    location, zones = make_location()
+    # freshly decoded data each poll, as http_request would return
+    polls = [make_zones(ZoneStatus.NORMAL) for _ in range(ROUNDS)]
+
+    rate = time_updates(zones, polls)
+    report("unchanged zones/second", rate, "zones/s")
+    assert all(zone.status == ZoneStatus.NORMAL for zone in zones)
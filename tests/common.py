@@ -54,3 +54,14 @@ def create_http_client(status=PANEL_STATUS_DISARMED):
             location.get_panel_meta_data()
 
     return mock_client
+
+
+def create_standin_client(standin, usercodes=None, **kwargs):
+    """Return a TotalConnectClient of the stand-in's user.
+
+    standin is a StandInService, used in process, or a StandInServer. The
+    test must be marked standin so its requests are not mocked. Retries
+    are not delayed unless retry_delay is given.
+    """
+    kwargs.setdefault("retry_delay", 0)
+    return TotalConnectClient("user", "pass", usercodes, transport=standin.transport(), **kwargs)
@@ -15,9 +15,19 @@ from total_connect_client.const import (
 )
 
 
+def pytest_configure(config):
+    """Register the markers."""
+    config.addinivalue_line(
+        "markers", "standin: the test talks to the stand-in, so HTTP requests are not mocked"
+    )
+
+
 @pytest.fixture(autouse=True)
-def mock_http_requests():
+def mock_http_requests(request):
     """Automatically mock any direct HTTP requests, right now these are used for authentication only."""
+    if request.node.get_closest_marker("standin"):
+        yield
+        return
     with requests_mock.Mocker() as rm:
         rm.get(AUTH_CONFIG_ENDPOINT, json=HTTP_RESPONSE_CONFIG, status_code=200)
         rm.post(AUTH_TOKEN_ENDPOINT, json=HTTP_RESPONSE_TOKEN, status_code=200)
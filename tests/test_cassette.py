@@ -0,0 +1,94 @@
+"""Test recording and replaying API traffic."""
+
+import pytest
+
+from total_connect_client.cassette import (
+    REDACTED,
+    Cassette,
+    RecordingTransport,
+    ReplayTransport,
+    redact,
+)
+from total_connect_client.client import TotalConnectClient
+from total_connect_client.const import ArmingState, ArmType
+from total_connect_client.standin import StandInService
+
+LOCATION_ID = 1000001
+ZONES = "api/v1/locations/{id}/partitions/zones/{id}"
+
+
+pytestmark = pytest.mark.standin
+
+
+@pytest.fixture(name="recording")
+def fixture_recording():
+    """Return a cassette of a session where zone details fail on the first call."""
+    service = StandInService(num_zones=6, usercode="4321")
+    service.set_behavior("zones", fail_first=1)
+    recorder = RecordingTransport(service.transport())
+    client = TotalConnectClient(
+        "someone", "secret", {"default": "4321"}, retry_delay=0, transport=recorder
+    )
+    location = client.locations[LOCATION_ID]
+    location.arm(ArmType.AWAY)
+    location.get_panel_meta_data()
+    return recorder.cassette
+
+
+def tests_redact():
+    """Test redacting nested data."""
+    data = {"UserInfo": {"Username": "someone", "UserID": 1}, "list": [{"userCode": "1"}]}
+    assert redact(data) == {
+        "UserInfo": {"Username": REDACTED, "UserID": 1},
+        "list": [{"userCode": REDACTED}],
+    }
+
+
+def tests_recording(recording, tmp_path):
+    """Test that the recording is complete and leaks no secrets."""
+    assert [interaction["status"] for interaction in recording.interactions][:2] == [200, 200]
+    zones = [i for i in recording.interactions if "zones/0" in i["url"]]
+    assert [i["body"]["ResultCode"] for i in zones] == [4101, 0]
+
+    path = str(tmp_path / "session.json.gz")
+    recording.save(path)
+    text = Cassette.load(path).interactions.__repr__()
+    assert "secret" not in text
+    assert "someone" not in text
+    assert "4321" not in text
+    assert recording.interactions[1]["body"]["access_token"] == REDACTED
+    assert len(Cassette.load(path)) == len(recording)
+
+
+def tests_replay(recording, tmp_path):
+    """Test that a replayed session behaves as recorded."""
+    path = str(tmp_path / "session.json")
+    recording.save(path)
+    client = TotalConnectClient(
+        "anyone",
+        "anything",
+        {"default": "1234"},
+        retry_delay=0,
+        transport=ReplayTransport(Cassette.load(path), time_scale=0),
+    )
+    snapshot = client.metrics.snapshot()
+    # the recorded first-call failure of zone details goes to the warm-up request
+    assert snapshot["endpoints"][ZONES]["requests"] == 2
+    assert snapshot["endpoints"][ZONES]["result_codes"] == {0: 1}
+
+    location = client.locations[LOCATION_ID]
+    assert len(location.zones) == 6
+    # the last recorded response is repeated for extra requests
+    location.get_panel_meta_data()
+    location.get_panel_meta_data()
+    assert location.arming_state == ArmingState.ARMED_AWAY
+
+
+def tests_replay_timing(recording):
+    """Test that replay delays responses by the scaled recorded time."""
+    for interaction in recording.interactions:
+        interaction["seconds"] = 0.01
+    transport = ReplayTransport(recording, time_scale=2)
+    client = TotalConnectClient("user", "pass", transport=transport, load_details=False)
+    requests = sum(client.metrics.requests.values())
+    assert client.metrics.timings["__init__"] >= 0.02 * requests
@@ -0,0 +1,46 @@
+"""Test flag string parsing."""
+
+from const import REST_RESULT_SESSION_DETAILS
+
+from total_connect_client.device import TotalConnectDevice
+from total_connect_client.flags import parse_flags
+
+DEVICE_INFO = REST_RESULT_SESSION_DETAILS["SessionDetailsResult"]["Locations"][0]["DeviceList"][0]
+
+
+def tests_parse():
+    """Test parsing a flag string."""
+    flags = parse_flags("Security=1,Video=0,TimezoneOffset=-8.0")
+    assert flags["Security"] == "1"
+    assert flags.get("TimezoneOffset") == "-8.0"
+    assert flags.get("Missing") is None
+    assert list(flags) == ["Security", "Video", "TimezoneOffset"]
+    assert dict(flags) == {"Security": "1", "Video": "0", "TimezoneOffset": "-8.0"}
+
+
+def tests_parse_unusual():
+    """Test empty strings and entries without a value."""
+    assert len(parse_flags(None)) == 0
+    assert len(parse_flags("")) == 0
+    assert dict(parse_flags("A=1,,B,C=x=y")) == {"A": "1", "B": "", "C": "x=y"}
+
+
+def tests_lazy():
+    """Test that a table is not parsed until it is read."""
+    flags = parse_flags("Lazy=1,Other=2")
+    assert flags._parsed is None
+    assert flags["Lazy"] == "1"
+    assert flags._parsed is not None
+
+
+def tests_shared():
+    """Test that devices with identical flag strings share one table."""
+    first = TotalConnectDevice(DEVICE_INFO)
+    second = TotalConnectDevice(dict(DEVICE_INFO))
+    assert first.flags is second.flags
+    assert first.model_key == second.model_key == (1, 12, 1)
+
+    # interned names are the same object across tables
+    other = parse_flags("PanelType=3")
+    (panel_type,) = (key for key in first.flags if key == "PanelType")
+    assert next(iter(other)) is panel_type
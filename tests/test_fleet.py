@@ -0,0 +1,139 @@
+"""Test polling many accounts with a fleet."""
+
+import time
+
+import pytest
+
+from total_connect_client.const import ArmingState, ArmType
+from total_connect_client.fleet import (
+    EVENT_ARMING_STATE,
+    EVENT_ERROR,
+    EVENT_ZONE_STATUS,
+    FleetEvent,
+    TotalConnectFleet,
+)
+from total_connect_client.retry import RetryBudget
+from total_connect_client.standin import StandInService
+from total_connect_client.zone import ZoneStatus
+
+LOCATION_ID = 1000001
+
+
+pytestmark = pytest.mark.standin
+
+
+@pytest.fixture(name="service")
+def fixture_service():
+    """Return a stand-in; every account sees its panels."""
+    return StandInService(num_zones=4)
+
+
+def make_fleet(service, **kwargs):
+    """Return a fleet using the stand-in in process."""
+    kwargs.setdefault("poll_interval", 0.02)
+    kwargs.setdefault("min_poll_interval", 0)
+    return TotalConnectFleet(transport=service.transport(), retry_delay=0, **kwargs)
+
+
+def wait_for(predicate, timeout=5.0):
+    """Wait until predicate() is true."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def tests_no_requests_until_polled(service):
+    """Test that adding accounts sends nothing."""
+    fleet = make_fleet(service)
+    for number in range(100):
+        fleet.add_account(f"user{number}", "pass")
+    assert not service.request_counts
+
+
+def tests_events(service):
+    """Test that changes of every account arrive on the event stream."""
+    fleet = make_fleet(service)
+    accounts = [
+        fleet.add_account(f"user{number}", "pass", {"default": "1234"}) for number in range(3)
+    ]
+    with fleet:
+        wait_for(lambda: all(account.polls >= 2 for account in accounts))
+        service.panels[LOCATION_ID].set_zone_status(2, ZoneStatus.FAULT)
+        events = [fleet.get_event(timeout=5) for _ in accounts]
+        assert {event.username for event in events} == {"user0", "user1", "user2"}
+        assert events[0] == FleetEvent(
+            EVENT_ZONE_STATUS,
+            events[0].username,
+            LOCATION_ID,
+            2,
+            ZoneStatus.NORMAL,
+            ZoneStatus.FAULT,
+        )
+
+        accounts[0].locations[LOCATION_ID].arm(ArmType.AWAY)
+        accounts[0].refresh()
+        kinds = {fleet.get_event(timeout=5).kind for _ in accounts}
+        assert kinds == {EVENT_ARMING_STATE}
+    assert accounts[1].locations[LOCATION_ID].arming_state == ArmingState.ARMED_AWAY
+    assert service.request_counts["token"] == 3
+
+
+def tests_poll_rate(service):
+    """Test that accounts are polled every poll_interval, refresh or not."""
+    fleet = make_fleet(service, poll_interval=0.1, min_poll_interval=0.1)
+    account = fleet.add_account("user", "pass")
+    with fleet:
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            account.refresh()
+            time.sleep(0.005)
+    assert 2 <= account.polls <= 7
+
+
+def tests_errors(service):
+    """Test that a failed poll is reported and polling goes on."""
+    fleet = make_fleet(service, retry_budget=RetryBudget(rate=0, burst=0))
+    account = fleet.add_account("user", "pass")
+    fleet.poll(account)
+    service.set_behavior("fullStatus", error_rates={500: 1.0})
+    (event,) = fleet.poll(account)
+    assert event.kind == EVENT_ERROR
+    # no retries left in the budget
+    assert service.request_counts["fullStatus"] == 2
+
+    service.set_behavior("fullStatus")
+    assert fleet.poll(account) == []
+    assert fleet.events.qsize() == 1
+
+
+def tests_remove_account(service):
+    """Test that a removed account is no longer polled."""
+    fleet = make_fleet(service)
+    account = fleet.add_account("user", "pass")
+    with pytest.raises(ValueError):
+        fleet.add_account("user", "other")
+    with fleet:
+        wait_for(lambda: account.polls >= 1)
+        fleet.remove_account("user")
+        polls = account.polls
+        time.sleep(0.1)
+    assert account.polls <= polls + 1
+
+
+def tests_restart(service):
+    """Test that polls cancelled by stop() are made after the fleet starts again."""
+    service.set_behavior("fullStatus", latency=0.02)
+    fleet = make_fleet(service, workers=1, poll_interval=0.01)
+    accounts = [fleet.add_account(f"user{number}", "pass") for number in range(5)]
+    with fleet:
+        wait_for(lambda: all(account.polls >= 1 for account in accounts))
+    assert not any(account._busy for account in accounts)
+
+    polls = [account.polls for account in accounts]
+    with fleet:
+        wait_for(
+            lambda: all(
+                account.polls >= count + 2 for account, count in zip(accounts, polls, strict=True)
+            )
+        )
@@ -0,0 +1,113 @@
+"""Test the SQLite history of changes."""
+
+import time
+
+import pytest
+from common import create_standin_client
+
+from total_connect_client.const import ArmingState, ArmType
+from total_connect_client.history import (
+    EVENT_ARMING_STATE,
+    EVENT_PARTITION_ARMING_STATE,
+    EVENT_ZONE_STATUS,
+    HistoryEvent,
+    HistoryStore,
+)
+from total_connect_client.standin import StandInService
+from total_connect_client.zone import ZoneStatus
+
+LOCATION_ID = 1000001
+
+
+pytestmark = pytest.mark.standin
+
+
+@pytest.fixture(name="history")
+def fixture_history(tmp_path):
+    """Return a running history store in a temporary file."""
+    with HistoryStore(str(tmp_path / "history.db"), flush_interval=0.01) as history:
+        yield history
+
+
+def tests_changes_recorded(history):
+    """Test that zone and arming changes seen by polls are recorded, and the load is not."""
+    service = StandInService(num_zones=4)
+    client = create_standin_client(service, {"default": "1234"}, history=history)
+    location = client.locations[LOCATION_ID]
+    history.flush()
+    assert history.events(LOCATION_ID) == []
+
+    service.panels[LOCATION_ID].set_zone_status(2, ZoneStatus.FAULT)
+    location.get_panel_meta_data()
+    location.arm(ArmType.AWAY)
+    location.get_panel_meta_data()
+    service.panels[LOCATION_ID].set_zone_status(2, ZoneStatus.NORMAL)
+    location.get_panel_meta_data()
+    history.flush()
+
+    zone_events = history.events(LOCATION_ID, zone_id=2)
+    assert [(event.old, event.new) for event in zone_events] == [
+        (ZoneStatus.NORMAL, ZoneStatus.FAULT),
+        (ZoneStatus.FAULT, ZoneStatus.NORMAL),
+    ]
+    (armed,) = history.events(LOCATION_ID, kind=EVENT_ARMING_STATE)
+    assert ArmingState(armed.new) == ArmingState.ARMED_AWAY
+    (partition,) = history.events(LOCATION_ID, kind=EVENT_PARTITION_ARMING_STATE)
+    assert partition.partition_id == 1
+    assert ArmingState(partition.old) == ArmingState.DISARMED
+    assert [event.kind for event in history.events(LOCATION_ID)].count(EVENT_ZONE_STATUS) == 2
+
+
+def tests_queries(history):
+    """Test selecting events by time range and limit."""
+    for second in range(1000):
+        history.record(
+            HistoryEvent(float(second), LOCATION_ID, EVENT_ZONE_STATUS, second % 4, None, 0, 1)
+        )
+    history.record(HistoryEvent(5.0, LOCATION_ID + 1, EVENT_ZONE_STATUS, 1, None, 0, 1))
+    history.flush()
+
+    assert len(history.events(LOCATION_ID)) == 1000
+    assert len(history.events(LOCATION_ID + 1)) == 1
+    events = history.events(LOCATION_ID, start=100, end=200)
+    assert [event.time for event in events] == [float(second) for second in range(100, 200)]
+    events = history.events(LOCATION_ID, zone_id=3, start=100, limit=2)
+    assert [event.time for event in events] == [103.0, 107.0]
+
+
+def tests_prune(tmp_path):
+    """Test that events older than the retention are deleted."""
+    history = HistoryStore(str(tmp_path / "history.db"), retention=60)
+    now = time.time()
+    with history:
+        history.record(HistoryEvent(now - 120, LOCATION_ID, EVENT_ARMING_STATE, None, None, 0, 1))
+        history.record(HistoryEvent(now - 30, LOCATION_ID, EVENT_ARMING_STATE, None, None, 1, 0))
+    assert history.prune(now) == 1
+    assert [event.old for event in history.events(LOCATION_ID)] == [1]
+
+    # the writer prunes when it starts
+    with HistoryStore(history.path, retention=10) as pruned:
+        pruned.record(HistoryEvent(now, LOCATION_ID, EVENT_ARMING_STATE, None, None, 0, 1))
+        pruned.flush()
+        assert [event.time for event in pruned.events(LOCATION_ID)] == [now]
+
+
+def tests_dropped(tmp_path, caplog):
+    """Test that events are dropped when the writer is not running or is behind."""
+    history = HistoryStore(str(tmp_path / "history.db"), batch_size=1, max_queued=2)
+    event = HistoryEvent(time.time(), LOCATION_ID, EVENT_ARMING_STATE, None, None, 0, 1)
+    history.record(event)
+    assert history._queue.empty()
+    assert "not running" in caplog.text
+
+    with history:
+        # the writer waits for the lock with at most one event, so the queue fills
+        connection = history._connect()
+        connection.execute("BEGIN EXCLUSIVE")
+        for _ in range(5):
+            history.record(event)
+        connection.rollback()
+        connection.close()
+        history.flush()
+    assert len(history.events(LOCATION_ID)) in (2, 3)
+    assert "2 events are waiting" in caplog.text
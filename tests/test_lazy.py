@@ -0,0 +1,89 @@
+"""Test lazy clients, which load on first use."""
+
+import pytest
+from common import create_standin_client
+
+from total_connect_client.const import ArmingState, ArmType
+from total_connect_client.exceptions import RetryableTotalConnectError
+from total_connect_client.standin import StandInService
+from total_connect_client.zone import ZoneStatus
+
+LOCATION_ID = 1000002
+
+
+pytestmark = pytest.mark.standin
+
+
+def tests_no_requests():
+    """Test that constructing a lazy client sends nothing."""
+    service = StandInService()
+    client = create_standin_client(service, {"default": "1234"}, lazy=True)
+    assert not service.request_counts
+    assert not client.is_logged_in()
+
+
+def tests_locations_on_first_use():
+    """Test that reading the locations logs in but loads no details."""
+    service = StandInService(num_locations=3)
+    client = create_standin_client(service, {"default": "1234"}, lazy=True)
+    assert len(client.locations) == 3
+    assert client.is_logged_in()
+    assert service.request_counts == {"config": 1, "token": 1, "sessiondetails": 1}
+
+
+def tests_one_location_loaded():
+    """Test that only the location whose zones are read is loaded."""
+    service = StandInService(num_locations=3, num_zones=4)
+    client = create_standin_client(service, {"default": "1234"}, lazy=True)
+    location = client.locations[LOCATION_ID]
+    assert len(location.zones) == 4
+    assert location.arming_state == ArmingState.DISARMED
+    assert service.request_counts["partitions"] == 1
+    assert service.request_counts["fullStatus"] == 1
+
+    # reading again loads nothing
+    assert len(location.partitions) == 1
+    assert service.request_counts["partitions"] == 1
+
+    location.arm(ArmType.AWAY)
+    location.get_panel_meta_data()
+    assert location.partitions[1].arming_state == ArmingState.ARMED_AWAY
+
+
+def tests_arm_loads_location():
+    """Test that arming an unloaded location loads its partitions first."""
+    service = StandInService(num_partitions=2)
+    client = create_standin_client(service, {"default": "1234"}, lazy=True)
+    location = client.locations[1000001]
+    location.arm(ArmType.STAY, partition_id=2)
+    assert service.panels[1000001].partitions == {
+        1: ArmingState.DISARMED,
+        2: ArmingState.ARMED_STAY,
+    }
+
+
+def tests_failed_load_retried():
+    """Test that a location that failed to load is loaded on the next access."""
+    service = StandInService()
+    client = create_standin_client(service, {"default": "1234"}, lazy=True)
+    location = client.locations[1000001]
+    service.set_behavior("partitions", error_rates={500: 1.0})
+    with pytest.raises(RetryableTotalConnectError):
+        location.zones  # noqa: B018
+    service.set_behavior("partitions")
+    assert len(location.zones) == 8
+
+
+def tests_bypass_loads_location():
+    """Test that bypassing from an unloaded location loads its zones first."""
+    service = StandInService()
+    service.panels[1000001].set_zone_status(1, ZoneStatus.FAULT)
+    location = create_standin_client(service, {"default": "1234"}, lazy=True).locations[1000001]
+    location.zone_bypass_all()
+    assert service.request_counts["bypass"] == 1
+
+    service = StandInService()
+    service.panels[1000001].set_zone_status(1, ZoneStatus.BYPASSED)
+    location = create_standin_client(service, {"default": "1234"}, lazy=True).locations[1000001]
+    location.clear_bypass()
+    assert service.request_counts["clearBypass"] == 1
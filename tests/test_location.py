@@ -1,6 +1,6 @@
 """Tests TotalConnectLocation."""
 
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import requests_mock
 from common import create_http_client
@@ -10,21 +10,31 @@ from const import (
     PANEL_STATUS_DISARMED,
     RESPONSE_DISARM_SUCCESS,
     RESPONSE_UNKNOWN,
+    REST_RESULT_CLEAR_BYPASS,
     REST_RESULT_FULL_STATUS,
     REST_RESULT_PARTITIONS_CONFIG,
     REST_RESULT_PARTITIONS_ZONES,
     REST_RESULT_SESSION_DETAILS,
     REST_RESULT_VALIDATE_USER_LOCATIONS,
+    SECURITY_DEVICE_ID,
 )
 from pytest import raises
 
-from total_connect_client.const import ArmingState, ArmType, make_http_endpoint
+from total_connect_client.const import ArmingCategory, ArmingState, ArmType, make_http_endpoint
 from total_connect_client.exceptions import (
     FeatureNotSupportedError,
     PartialResponseError,
     TotalConnectError,
 )
 from total_connect_client.location import TotalConnectLocation
+from total_connect_client.partition import TotalConnectPartition
+from total_connect_client.zone import (
+    PANEL_ZONE_CATEGORIES,
+    TotalConnectZone,
+    ZoneCategory,
+    ZoneStatus,
+    ZoneType,
+)
 
 RESULT_LOCATION = REST_RESULT_SESSION_DETAILS["SessionDetailsResult"]["Locations"][0]
 result_num_zones = len(REST_RESULT_PARTITIONS_ZONES["ZoneStatus"]["Zones"])
@@ -202,3 +212,96 @@ def tests_arm():
 
         # now just the location should work
         location.arm(usercode="1234", arm_type=ArmType.AWAY)
+
+
+def tests_zone_indexes():
+    """Test the zone status indexes follow zone updates."""
+    location = TotalConnectLocation(RESULT_LOCATION, Mock())
+    location._update_zone_details(REST_RESULT_PARTITIONS_ZONES)
+    zones = location.zones
+
+    def matching(predicate):
+        return {zone_id for zone_id, zone in zones.items() if predicate(zone)}
+
+    assert location.zones_with_status(ZoneStatus.FAULT) == matching(TotalConnectZone.is_faulted)
+    assert location.bypassable_zones() == matching(lambda zone: zone.can_be_bypassed)
+    assert location.button_zones() == matching(TotalConnectZone.is_type_button)
+    assert location.security_zones() == matching(TotalConnectZone.is_type_security)
+
+    zone_id = next(iter(zones))
+    data = {"ZoneID": zone_id, "ZoneStatus": ZoneStatus.FAULT | ZoneStatus.LOW_BATTERY}
+    location._update_zones([data])
+    assert zone_id in location.zones_with_status(ZoneStatus.FAULT)
+    assert zone_id in location.zones_with_status(ZoneStatus.LOW_BATTERY)
+    assert zone_id not in location.zones_with_status(ZoneStatus.BYPASSED)
+
+    data["ZoneStatus"] = ZoneStatus.NORMAL
+    location._update_zones([data])
+    assert zone_id not in location.zones_with_status(ZoneStatus.FAULT | ZoneStatus.LOW_BATTERY)
+
+    zones[zone_id]._mark_as_bypassed()
+    assert zone_id in location.zones_with_status(ZoneStatus.BYPASSED)
+
+
+def tests_zone_bypass_all():
+    """Test zone_bypass_all only bypasses faulted zones that can be bypassed."""
+    client = Mock()
+    client.http_request.return_value = REST_RESULT_CLEAR_BYPASS
+    location = TotalConnectLocation(RESULT_LOCATION, client)
+    location.usercode = "1234"
+    location._update_zone_details(REST_RESULT_PARTITIONS_ZONES)
+
+    # nothing is faulted, so no request is made
+    location.zone_bypass_all()
+    client.http_request.assert_not_called()
+
+    bypassable, *_ = location.bypassable_zones()
+    location._update_zones(
+        [{"ZoneID": bypassable, "ZoneStatus": ZoneStatus.FAULT, "CanBeBypassed": 1}]
+    )
+    location.zone_bypass_all()
+    client.http_request.assert_called_once()
+    assert client.http_request.call_args.kwargs["data"]["ZoneIds"] == [bypassable]
+
+
+def tests_clear_bypass():
+    """Test clear_bypass only makes a request when a zone is bypassed."""
+    client = Mock()
+    client.http_request.return_value = REST_RESULT_CLEAR_BYPASS
+    location = TotalConnectLocation(RESULT_LOCATION, client)
+    location.usercode = "1234"
+    location._update_zone_details(REST_RESULT_PARTITIONS_ZONES)
+    for zone_id in location.zones_with_status(ZoneStatus.BYPASSED):
+        location._update_zones([{"ZoneID": zone_id, "ZoneStatus": ZoneStatus.NORMAL}])
+
+    location.clear_bypass()
+    client.http_request.assert_not_called()
+
+    next(iter(location.zones.values()))._mark_as_bypassed()
+    location.clear_bypass()
+    client.http_request.assert_called_once()
+
+
+def tests_categories():
+    """Test bulk filtering of zones and partitions by category."""
+    location = TotalConnectLocation(RESULT_LOCATION, Mock())
+    location._update_zone_details(REST_RESULT_PARTITIONS_ZONES)
+    motion = {zone_id for zone_id, zone in location.zones.items() if zone.is_type_motion()}
+    assert motion
+    assert location.zones_in_category(ZoneCategory.MOTION) == motion
+
+    location.partitions[1] = TotalConnectPartition(
+        REST_RESULT_PARTITIONS_CONFIG["Partitions"][0], location
+    )
+    assert location.partitions_in_category(ArmingCategory.DISARMED) == [1]
+    assert location.partitions_in_category(ArmingCategory.ARMED) == []
+
+
+def tests_panel_category_overrides():
+    """Test that zones use the category overrides for the location's panel model."""
+    panel = TotalConnectLocation(RESULT_LOCATION, Mock()).devices[SECURITY_DEVICE_ID]
+    overrides = {ZoneType.INTERIOR_FOLLOWER: ZoneCategory.SECURITY}
+    with patch.dict(PANEL_ZONE_CATEGORIES, {panel.model_key: overrides}):
+        location = TotalConnectLocation(RESULT_LOCATION, Mock())
+    location._update_zone_details(REST_RESULT_PARTITIONS_ZONES)
+    assert not location.zones_in_category(ZoneCategory.MOTION)
@@ -0,0 +1,35 @@
+"""Test the command line interface."""
+
+import pytest
+
+from total_connect_client.__main__ import main, parse_args, percentile
+
+pytestmark = pytest.mark.standin
+
+
+def tests_percentile():
+    """Test nearest-rank percentiles."""
+    values = [float(value) for value in range(10, 0, -1)]
+    assert percentile(values, 0.5) == 5.0
+    assert percentile(values, 0.9) == 9.0
+    assert percentile(values, 0.99) == 10.0
+    assert percentile([3.0], 0.5) == 3.0
+
+
+def tests_username_required():
+    """Test that a username is needed unless using the stand-in."""
+    with pytest.raises(SystemExit):
+        parse_args([])
+    assert parse_args(["--standin"]).username is None
+
+
+def tests_profile_standin(tmp_path, monkeypatch, capsys):
+    """Test profiling refresh cycles against the stand-in."""
+    monkeypatch.chdir(tmp_path)
+    argv = ["--standin", "--latency", "0", "--cycles", "3", "--profile", "--tracemalloc", "-q"]
+    assert main(argv) == 0
+    out = capsys.readouterr().out
+    assert "3 refreshes in" in out
+    assert "api/v3/locations/{id}/partitions/fullStatus" in out
+    assert "Ordered by: cumulative time" in out
+    assert "peak traced memory" in out
@@ -0,0 +1,131 @@
+"""Test client metrics."""
+
+import pytest
+from common import create_standin_client
+
+from total_connect_client.const import endpoint_template, make_http_endpoint
+from total_connect_client.metrics import Histogram, InMemorySink, prometheus_text
+from total_connect_client.standin import StandInService
+
+FULL_STATUS = "api/v3/locations/{id}/partitions/fullStatus"
+ZONES = "api/v1/locations/{id}/partitions/zones/{id}"
+
+
+pytestmark = pytest.mark.standin
+
+
+def tests_endpoint_template():
+    """Test that IDs are removed from endpoint URLs."""
+    url = make_http_endpoint("api/v1/locations/1234567/devices/7654321/bypass")
+    assert endpoint_template(url) == "api/v1/locations/{id}/devices/{id}/bypass"
+    assert endpoint_template("https://rs.alarmnet.com/TC2API.Auth/token") == "TC2API.Auth/token"
+
+
+def tests_histogram():
+    """Test histogram buckets."""
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(3.65)
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+
+
+def tests_requests():
+    """Test request counts, latency, bytes, result codes and timings."""
+    client = create_standin_client(StandInService(num_zones=4))
+    snapshot = client.metrics.snapshot()
+    full_status = snapshot["endpoints"][FULL_STATUS]
+    assert full_status["requests"] == 1
+    assert full_status["statuses"] == {200: 1}
+    assert full_status["latency"]["count"] == 1
+    assert full_status["bytes_received"] > 0
+    assert full_status["result_codes"] == {0: 1}
+    assert snapshot["endpoints"]["TC2API.Auth/token"]["bytes_sent"] > 0
+    assert snapshot["retries"] == {}
+    assert set(snapshot["timings"]) == {
+        "authenticate",
+        "session details",
+        "load_details",
+        "__init__",
+    }
+    # the deprecated times dict still works
+    assert client.times["authenticate"] == snapshot["timings"]["authenticate"]
+    # and is the caller's to change
+    client.times.clear()
+    assert client.metrics.timings["authenticate"] == snapshot["timings"]["authenticate"]
+    assert "total running time" in client.times_as_string()
+
+
+def tests_retries():
+    """Test retries by cause, and re-authentication."""
+    service = StandInService(num_zones=4)
+    # one failure goes to the warm-up request
+    service.set_behavior("zones", fail_first=3)
+    client = create_standin_client(service)
+    service.expire_sessions()
+    client.locations[1000001].get_panel_meta_data()
+
+    snapshot = client.metrics.snapshot()
+    assert snapshot["endpoints"][ZONES]["result_codes"] == {4101: 2, 0: 1}
+    assert snapshot["endpoints"][ZONES]["retries"] == {"RetryableTotalConnectError": 2}
+    assert snapshot["endpoints"][FULL_STATUS]["statuses"] == {200: 2, 401: 1}
+    assert snapshot["retries"] == {"RetryableTotalConnectError": 2, "InvalidSessionError": 1}
+    assert snapshot["reauthentications"] == 1
+
+
+def tests_prometheus_text():
+    """Test the Prometheus text exposition."""
+    sink = InMemorySink()
+    sink.record_request('a"b', "GET", 200, 0.02, 0, 10)
+    sink.record_retry('a"b', "RequestException")
+    text = prometheus_text(sink)
+    assert "# TYPE total_connect_requests_total counter" in text
+    assert 'total_connect_requests_total{endpoint="a\\"b",method="GET",status="200"} 1' in text
+    assert 'total_connect_request_duration_seconds_bucket{endpoint="a\\"b",le="0.01"} 0' in text
+    assert 'total_connect_request_duration_seconds_bucket{endpoint="a\\"b",le="0.025"} 1' in text
+    assert 'total_connect_request_duration_seconds_bucket{endpoint="a\\"b",le="+Inf"} 1' in text
+    assert 'total_connect_retries_total{endpoint="a\\"b",cause="RequestException"} 1' in text
+    assert "total_connect_reauthentications_total 0" in text
+    assert text.endswith("\n")
+
+
+def tests_copy():
+    """Test that a copy is not updated with the sink."""
+    sink = InMemorySink()
+    sink.record_request("a", "GET", 200, 0.02, 0, 10)
+    copy = sink.copy()
+    sink.record_request("a", "GET", 200, 0.02, 0, 10)
+    sink.record_reauthentication()
+    assert copy.requests == {("a", "GET", 200): 1}
+    assert copy.latency["a"].count == 1
+    assert copy.reauthentications == 0
+    assert prometheus_text(copy) != prometheus_text(sink)
+
+
+def tests_custom_sink():
+    """Test that another sink can be used."""
+
+    class CountingSink:
+        def __init__(self):
+            self.requests = 0
+
+        def record_request(self, *args):
+            self.requests += 1
+
+        def record_result_code(self, endpoint, result_code):
+            pass
+
+        def record_retry(self, endpoint, cause):
+            pass
+
+        def record_reauthentication(self):
+            pass
+
+        def record_timing(self, name, seconds):
+            pass
+
+    sink = CountingSink()
+    client = create_standin_client(StandInService(), metrics=sink)
+    assert sink.requests == 7
+    assert client.times == {}
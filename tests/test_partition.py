@@ -7,7 +7,7 @@ import pytest
 from const import PARTITION_DETAILS_1, PARTITION_DISARMED
 
 from total_connect_client.client import ArmingHelper
-from total_connect_client.const import ArmingState
+from total_connect_client.const import ArmingCategory, ArmingState
 from total_connect_client.exceptions import PartialResponseError, TotalConnectError
 from total_connect_client.partition import TotalConnectPartition
 
@@ -116,3 +116,21 @@ def tests_proa7_states():
         assert partition.arming_state.is_armed_home() is True
         assert partition.arming_state.is_armed_night() is True
         assert partition.arming_state.is_armed_away() is False
+
+
+def tests_arming_categories():
+    """Test ArmingState categories."""
+    state = ArmingState.ARMED_STAY_NIGHT
+    assert state.categories == ArmingCategory.ARMED_HOME | ArmingCategory.ARMED_NIGHT
+    assert state.in_category(ArmingCategory.ARMED) is True
+    assert state.in_category(ArmingCategory.TRIGGERED | ArmingCategory.DISARMED) is False
+
+    assert ArmingState.UNKNOWN.categories == ArmingCategory.NONE
+    assert ArmingState.DISARMING.in_category(ArmingCategory.PENDING) is True
+    assert ArmingState.ALARMING_CARBON_MONOXIDE_PROA7.in_category(ArmingCategory.TRIGGERED)
+
+    # every category predicate agrees with its category
+    for state in ArmingState:
+        assert state.is_armed() == state.in_category(ArmingCategory.ARMED)
+        assert state.is_triggered() == state.in_category(ArmingCategory.TRIGGERED)
+        assert state.is_pending() == state.in_category(ArmingCategory.PENDING)
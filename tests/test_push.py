@@ -0,0 +1,138 @@
+"""Test push updates from the SignalR hub."""
+
+import threading
+import time
+
+import pytest
+from common import create_standin_client
+
+from total_connect_client.const import ArmingState, ArmType
+from total_connect_client.push import PushSubscriber
+from total_connect_client.standin import StandInService
+from total_connect_client.zone import ZoneStatus
+
+LOCATION_ID = 1000001
+
+
+pytestmark = pytest.mark.standin
+
+
+@pytest.fixture(name="service")
+def fixture_service():
+    """Return a stand-in whose hub answers empty polls quickly."""
+    service = StandInService()
+    service.hub.poll_timeout = 0.05
+    return service
+
+
+@pytest.fixture(name="subscriber")
+def fixture_subscriber(service):
+    """Return a connected subscriber that polls and reconnects quickly."""
+    client = create_standin_client(service)
+    subscriber = PushSubscriber(client, poll_interval=0.05, reconnect_delay=0.05)
+    with subscriber:
+        wait_for(lambda: subscriber.connected)
+        yield subscriber
+
+
+def wait_for(predicate, timeout=5.0):
+    """Wait until predicate() is true."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def tests_zone_change(service, subscriber):
+    """Test that a pushed zone change is applied without polling."""
+    location = subscriber.client.locations[LOCATION_ID]
+    polls = service.request_counts["fullStatus"]
+    service.panels[LOCATION_ID].set_zone_status(2, ZoneStatus.FAULT)
+    wait_for(lambda: location.zones[2].is_faulted())
+    assert not location.zones[1].is_faulted()
+    assert service.request_counts["fullStatus"] == polls
+
+
+def tests_poll_after_push(service):
+    """Test that a poll after a push applies the status even if it is unchanged."""
+    client = create_standin_client(service, skip_unchanged=True)
+    location = client.locations[LOCATION_ID]
+    panel = service.panels[LOCATION_ID]
+    faulted = dict(panel.zones[2], ZoneStatus=ZoneStatus.FAULT.value)
+    subscriber = PushSubscriber(client)
+    subscriber._dispatch(
+        "ZoneStatusChanged", [{"LocationID": LOCATION_ID, "Zones": [panel._zone_info(faulted)]}]
+    )
+    assert location.zones[2].is_faulted()
+
+    # the panel has not changed since the last poll
+    location.get_panel_meta_data()
+    assert not location.zones[2].is_faulted()
+
+
+def tests_push_waits_for_load(service):
+    """Test that a pushed change is not applied while a location loads."""
+    client = create_standin_client(service)
+    location = client.locations[LOCATION_ID]
+    panel = service.panels[LOCATION_ID]
+    faulted = dict(panel.zones[2], ZoneStatus=ZoneStatus.FAULT.value)
+    subscriber = PushSubscriber(client)
+    arguments = [{"LocationID": LOCATION_ID, "Zones": [panel._zone_info(faulted)]}]
+    with client._load_lock:
+        thread = threading.Thread(
+            target=subscriber._dispatch, args=("ZoneStatusChanged", arguments)
+        )
+        thread.start()
+        thread.join(0.1)
+        assert not location.zones[2].is_faulted()
+    thread.join()
+    assert location.zones[2].is_faulted()
+
+
+def tests_arming_change(service, subscriber):
+    """Test that a pushed arming change updates the location and its partitions."""
+    updated = []
+    subscriber.on_update = updated.append
+    location = subscriber.client.locations[LOCATION_ID]
+    service.panels[LOCATION_ID].arm(ArmType.AWAY.value, "1234", [])
+    wait_for(lambda: location.arming_state == ArmingState.ARMED_AWAY)
+    assert location.partitions[1].arming_state == ArmingState.ARMED_AWAY
+    assert updated == [location]
+
+
+def tests_unknown_message(service, subscriber):
+    """Test that an unrecognized message for a location polls it."""
+    polls = service.request_counts["fullStatus"]
+    service.hub.publish("SomethingHappened", {"LocationID": LOCATION_ID})
+    service.hub.publish("SomethingHappened", {"LocationID": 42})
+    wait_for(lambda: service.request_counts["fullStatus"] == polls + 1)
+
+
+def tests_fallback_polling(service, subscriber):
+    """Test polling while the hub is down, then reconnecting."""
+    service.set_behavior("negotiate", error_rates={500: 1.0})
+    service.hub.disconnect_all()
+    wait_for(lambda: not subscriber.connected)
+    polls = service.request_counts["fullStatus"]
+    wait_for(lambda: service.request_counts["fullStatus"] >= polls + 2)
+
+    # changes made while disconnected are picked up by polling
+    location = subscriber.client.locations[LOCATION_ID]
+    service.panels[LOCATION_ID].set_zone_status(3, ZoneStatus.FAULT)
+    wait_for(lambda: location.zones[3].is_faulted())
+
+    service.set_behavior("negotiate")
+    wait_for(lambda: subscriber.connected)
+    service.panels[LOCATION_ID].set_zone_status(3, ZoneStatus.NORMAL)
+    wait_for(lambda: not location.zones[3].is_faulted())
+
+
+def tests_stop(service, subscriber):
+    """Test that stopping closes the hub connection."""
+    assert service.hub.connections == 1
+    subscriber.stop()
+    assert service.hub.connections == 0
+    assert not subscriber.connected
+    with pytest.raises(RuntimeError):
+        subscriber.start().start()
+    subscriber.stop()
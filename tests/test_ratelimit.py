@@ -0,0 +1,138 @@
+"""Test client-side rate limiting."""
+
+import email.utils
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from common import create_standin_client
+
+from total_connect_client.client import TotalConnectClient
+from total_connect_client.exceptions import RateLimitedError
+from total_connect_client.ratelimit import (
+    HostRateLimits,
+    RateLimiter,
+    TokenBucket,
+    parse_retry_after,
+)
+from total_connect_client.standin import StandInService
+
+LOCATION_ID = 1000001
+
+
+pytestmark = pytest.mark.standin
+
+
+def tests_parse_retry_after():
+    """Test both forms of Retry-After."""
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("2") == 2
+    assert parse_retry_after("-1") == 0
+    assert parse_retry_after(email.utils.formatdate(time.time() - 60, usegmt=True)) == 0
+    later = parse_retry_after(email.utils.formatdate(time.time() + 60, usegmt=True))
+    assert later is not None and 58 < later <= 60
+
+
+def tests_token_bucket():
+    """Test that a bucket hands out its burst, then paces, and slows down when throttled."""
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+    bucket.throttle(1.0, 0.5)
+    assert bucket.rate == 5
+    # the pause, then the reserved tokens and this one at the lower rate
+    assert bucket.reserve() == pytest.approx(1.6, abs=0.01)
+
+    for _ in range(100):
+        bucket.recover(1)
+    assert bucket.rate == 10
+
+
+def tests_host_limits_shared():
+    """Test that accounts sharing HostRateLimits share the host's bucket."""
+    hosts = HostRateLimits(rate=10, burst=1)
+    first = RateLimiter(rate=100, burst=100, hosts=hosts)
+    second = RateLimiter(rate=100, burst=100, hosts=hosts)
+    assert first.acquire("https://example.com/a") == 0
+    assert hosts.bucket("example.com").reserve() > 0
+    # another host has its own bucket
+    assert second.acquire("https://example.org/a") == 0
+
+    second.throttled("https://example.com/a", None)
+    assert hosts.bucket("example.com").rate == 5
+    assert first.account.rate == 100
+    assert second.account.rate == 50
+
+
+def tests_retry_after():
+    """Test that a 429 pauses the account for Retry-After instead of the retry delay."""
+    service = StandInService()
+    limiter = RateLimiter(rate=100, burst=100)
+    client = create_standin_client(service, rate_limiter=limiter)
+    location = client.locations[LOCATION_ID]
+    client.retry_delay = 60
+    service.set_behavior("fullStatus", error_rates={429: 1.0}, retry_after=0.05)
+
+    start = time.monotonic()
+    with pytest.raises(RateLimitedError):
+        location.get_panel_meta_data()
+    elapsed = time.monotonic() - start
+    attempts = service.request_counts["fullStatus"] - 1
+    assert attempts == TotalConnectClient.MAX_RETRY_ATTEMPTS
+    assert (attempts - 1) * 0.05 <= elapsed < 5
+    assert limiter.account.rate < 100
+
+    service.set_behavior("fullStatus")
+    rate = limiter.account.rate
+    location.get_panel_meta_data()
+    assert limiter.account.rate > rate
+
+
+def tests_reads_coalesced():
+    """Test that the same GET sent from several threads at once is sent once."""
+    service = StandInService()
+    client = create_standin_client(service, rate_limiter=RateLimiter())
+    location = client.locations[LOCATION_ID]
+    service.set_behavior("fullStatus", latency=0.2)
+    with ThreadPoolExecutor(4) as executor:
+        for future in [executor.submit(location.get_panel_meta_data) for _ in range(4)]:
+            future.result()
+    assert service.request_counts["fullStatus"] == 2
+
+    # without a rate limiter every request is sent
+    service = StandInService()
+    client = create_standin_client(service, rate_limiter=None)
+    location = client.locations[LOCATION_ID]
+    service.set_behavior("fullStatus", latency=0.2)
+    with ThreadPoolExecutor(4) as executor:
+        for future in [executor.submit(location.get_panel_meta_data) for _ in range(4)]:
+            future.result()
+    assert service.request_counts["fullStatus"] == 5
+
+
+def tests_warm_up_limited():
+    """Test that the warm-up request of a lazy location waits for the rate limiter."""
+
+    class RecordingLimiter(RateLimiter):
+        """Records the URLs it hands out tokens for."""
+
+        def __init__(self):
+            super().__init__(rate=100, burst=100)
+            self.urls = []
+
+        def acquire(self, url):
+            self.urls.append(url)
+            return super().acquire(url)
+
+    service = StandInService()
+    limiter = RecordingLimiter()
+    client = create_standin_client(service, rate_limiter=limiter, lazy=True)
+    location = client.locations[LOCATION_ID]
+    assert location.zones
+    zone_requests = [url for url in limiter.urls if url == location.zone_details_endpoint]
+    assert len(zone_requests) == service.request_counts["zones"] == 2
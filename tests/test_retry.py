@@ -0,0 +1,67 @@
+"""Test per-endpoint retry profiles and the zone details warm-up."""
+
+import pytest
+from common import create_standin_client
+
+from total_connect_client.exceptions import RetryableTotalConnectError
+from total_connect_client.retry import ZONE_DETAILS_ENDPOINT, RetryBudget, RetryProfile
+from total_connect_client.standin import StandInService
+
+LOCATION_ID = 1000001
+
+
+pytestmark = pytest.mark.standin
+
+
+def tests_delay_before_retry():
+    """Test the delays of a retry profile."""
+    profile = RetryProfile(first_retry_delay=0.5, first_retry_result_codes=(4101,))
+    assert profile.delay_before_retry(1, 4101, 6) == 0.5
+    assert profile.delay_before_retry(2, 4101, 6) == 6
+    assert profile.delay_before_retry(1, -1, 6) == 6
+    assert profile.delay_before_retry(1, None, 6) == 6
+    # never longer than the client's delay
+    assert profile.delay_before_retry(1, 4101, 0) == 0
+
+    assert RetryProfile(delay=2).delay_before_retry(1, None, 6) == 2
+    assert RetryProfile(first_retry_delay=0).delay_before_retry(1, None, 6) == 0
+
+
+def tests_warm_up():
+    """Test that the first-call failure of zone details does not delay startup."""
+    service = StandInService()
+    service.set_behavior("zones", fail_first=1)
+    client = create_standin_client(service, retry_delay=60)
+
+    assert service.request_counts["zones"] == 2
+    assert client.metrics.retries == {}
+    assert len(client.locations[LOCATION_ID].zones) == 8
+
+
+def tests_first_retry_delay():
+    """Test that a first-call failure of zone details is retried after a short delay."""
+    service = StandInService()
+    client = create_standin_client(service, retry_delay=60, load_details=False)
+    client.retry_profiles[ZONE_DETAILS_ENDPOINT] = RetryProfile(
+        first_retry_delay=0, first_retry_result_codes=(4101,)
+    )
+    service.set_behavior("zones", fail_first=1)
+
+    client.locations[LOCATION_ID].get_zone_details()
+    assert service.request_counts["zones"] == 2
+    assert client.metrics.retries == {(ZONE_DETAILS_ENDPOINT, "RetryableTotalConnectError"): 1}
+
+
+def tests_retry_budget():
+    """Test that clients sharing an empty retry budget give up at once."""
+    budget = RetryBudget(rate=0, burst=2)
+    service = StandInService()
+    clients = [create_standin_client(service, retry_budget=budget) for _ in range(2)]
+    service.set_behavior("fullStatus", error_rates={4101: 1.0})
+    with pytest.raises(RetryableTotalConnectError):
+        clients[0].locations[LOCATION_ID].get_panel_meta_data()
+    # one poll as each client starts, then 1 + 2 retries, then 1 with none left
+    with pytest.raises(RetryableTotalConnectError):
+        clients[1].locations[LOCATION_ID].get_panel_meta_data()
+    assert service.request_counts["fullStatus"] == 6
+    assert budget.available == 0
@@ -0,0 +1,97 @@
+"""Test the response schemas."""
+
+from copy import deepcopy
+
+import pytest
+from const import (
+    PANEL_STATUS_DISARMED,
+    REST_RESULT_PARTITIONS_CONFIG,
+    REST_RESULT_PARTITIONS_ZONES,
+    REST_RESULT_SESSION_DETAILS,
+)
+
+from total_connect_client.const import ArmingState
+from total_connect_client.exceptions import PartialResponseError
+from total_connect_client.schema import (
+    FULL_STATUS,
+    PARTITIONS_CONFIG,
+    SESSION_DETAILS_RESPONSE,
+    ZONE,
+    ZONE_DETAILS,
+    Field,
+    PartitionStatus,
+    Schema,
+)
+
+
+def tests_full_status():
+    """Test parsing a fullStatus response."""
+    status = FULL_STATUS.parse(PANEL_STATUS_DISARMED)
+    assert status.arming_state == ArmingState.DISARMED.value
+    assert status.panel_status.partitions[0].partition_id == 1
+    assert status.panel_status.zones is PANEL_STATUS_DISARMED["PanelStatus"]["Zones"]
+    with pytest.raises(AttributeError):
+        status.unknown = 0
+
+
+def tests_full_status_partial():
+    """Test that each missing section of a fullStatus response is found."""
+    for remove, message in (
+        (lambda r: r.pop("PanelStatus"), "no PanelStatus"),
+        (lambda r: r.pop("ArmingState"), "no ArmingState"),
+        (lambda r: r["PanelStatus"].pop("Partitions"), "no Partitions"),
+        (lambda r: r["PanelStatus"]["Partitions"][0].pop("PartitionID"), "no PartitionID"),
+        (lambda r: r["PanelStatus"]["Partitions"][0].pop("ArmingState"), "no ArmingState"),
+        (lambda r: r["PanelStatus"].pop("Zones"), "no Zones"),
+    ):
+        response = deepcopy(PANEL_STATUS_DISARMED)
+        remove(response)
+        with pytest.raises(PartialResponseError, match=message):
+            FULL_STATUS.parse(response)
+
+    with pytest.raises(PartialResponseError, match="no PanelStatus"):
+        FULL_STATUS.parse(None)
+
+
+def tests_partitions_config():
+    """Test parsing a partitions/config response."""
+    (partition,) = PARTITIONS_CONFIG.parse(REST_RESULT_PARTITIONS_CONFIG).partitions
+    assert partition.partition_id == 1
+    assert partition.name == "Partition-01"
+
+    with pytest.raises(PartialResponseError, match="no PartitionDetails"):
+        PARTITIONS_CONFIG.parse({"ResultCode": 0, "Partitions": []})
+
+
+def tests_zones():
+    """Test parsing zone details and a zone."""
+    zones = ZONE_DETAILS.parse(REST_RESULT_PARTITIONS_ZONES).zone_status.zones
+    zone = ZONE.parse(zones[0])
+    assert zone.zone_id == zones[0]["ZoneID"]
+    assert zone.partition == zones[0]["PartitionId"]
+
+    # ZoneInfo spells it PartitionID
+    assert ZONE.parse({"ZoneID": 1, "PartitionID": 2}).partition == 2
+    assert ZONE.parse({"ZoneID": 1}).additional_info is None
+    with pytest.raises(PartialResponseError, match="no ZoneStatus"):
+        ZONE_DETAILS.parse({"ResultCode": 0})
+
+
+def tests_session_details():
+    """Test parsing a sessiondetails response."""
+    details = SESSION_DETAILS_RESPONSE.parse(REST_RESULT_SESSION_DETAILS).session_details
+    assert details.user_info.username
+    assert len(details.locations) == 1
+
+    response = deepcopy(REST_RESULT_SESSION_DETAILS)
+    del response["SessionDetailsResult"]["UserInfo"]["UserFeatureList"]
+    with pytest.raises(PartialResponseError, match="no UserFeatureList"):
+        SESSION_DETAILS_RESPONSE.parse(response)
+
+
+def tests_schema_fields_must_match_record():
+    """Test that a schema must declare the fields of its record in order."""
+    with pytest.raises(TypeError):
+        Schema(
+            PartitionStatus, arming_state=Field("ArmingState"), partition_id=Field("PartitionID")
+        )
@@ -0,0 +1,131 @@
+"""Test sharded polling into shared memory."""
+
+import time
+
+import pytest
+from common import create_standin_client
+from const import LOCATION_INFO_BASIC_NORMAL
+
+from total_connect_client.const import ArmingState, ArmType
+from total_connect_client.location import TotalConnectLocation
+from total_connect_client.sharding import HEADER_SEQUENCE, ShardedPoller, SharedStateView
+from total_connect_client.standin import StandInServer, StandInService
+from total_connect_client.zone import ZoneStatus
+
+LOCATION_ID = 1000001
+ACCOUNTS = [(f"user{number}", "pass", {"default": "1234"}) for number in range(4)]
+
+
+pytestmark = pytest.mark.standin
+
+
+def wait_for(predicate, timeout=30.0):
+    """Wait until predicate() is true."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def tests_view():
+    """Test writing and reading rows of a table."""
+    buffer = memoryview(bytearray(SharedStateView.table_size(2, 2, 4)))
+    view = SharedStateView(buffer, max_locations=2, max_zones=4)
+    assert view.accounts == 2
+    location = TotalConnectLocation(LOCATION_INFO_BASIC_NORMAL, None)
+    assert view.read(1, location.location_id) is None
+
+    view.write(1, 0, location)
+    state = view.read(1, location.location_id)
+    assert state.arming_state == ArmingState.UNKNOWN
+    assert state.zones == {}
+    assert state.polls == 1
+    assert view.location_ids(1) == [location.location_id]
+    assert view.location_ids(0) == []
+    view.count_error(1)
+    assert view.read(1, location.location_id).errors == 1
+    view.release()
+
+
+def tests_partitions_and_zones():
+    """Test that partitions and zones are written, up to the room for them."""
+    service = StandInService(num_zones=3, num_partitions=2)
+    service.panels[LOCATION_ID].set_zone_status(3, ZoneStatus.FAULT)
+    service.panels[LOCATION_ID].arm(ArmType.STAY.value, "1234", ["2"])
+    client = create_standin_client(service)
+    location = client.locations[LOCATION_ID]
+
+    buffer = memoryview(bytearray(SharedStateView.table_size(1, 1, 2, max_partitions=1)))
+    view = SharedStateView(buffer, max_locations=1, max_zones=2, max_partitions=1)
+    view.write(0, 0, location)
+    state = view.read(0, LOCATION_ID)
+    assert state.partitions == {1: ArmingState.DISARMED}
+    assert state.zones == {1: ZoneStatus.NORMAL, 2: ZoneStatus.NORMAL}
+    assert view.partition_arming_state(0, LOCATION_ID, 1) == ArmingState.DISARMED
+    assert view.partition_arming_state(0, LOCATION_ID, 2) is None
+    assert view.zone_status(0, LOCATION_ID, 3) is None
+    view.release()
+
+    buffer = memoryview(bytearray(SharedStateView.table_size(1, 1, 4)))
+    view = SharedStateView(buffer, max_locations=1, max_zones=4)
+    view.write(0, 0, location)
+    assert view.read(0, LOCATION_ID).partitions == {
+        1: ArmingState.DISARMED,
+        2: location.partitions[2].arming_state,
+    }
+    assert view.partition_arming_state(0, LOCATION_ID, 2) == location.partitions[2].arming_state
+    assert view.zone_status(0, LOCATION_ID, 3) == ZoneStatus.FAULT
+    view.release()
+
+
+def tests_half_written_row():
+    """Test that a row left half written by a worker that died is read as unwritten."""
+    buffer = memoryview(bytearray(SharedStateView.table_size(1, 1, 4)))
+    view = SharedStateView(buffer, max_locations=1, max_zones=4, read_timeout=0.05)
+    location = TotalConnectLocation(LOCATION_INFO_BASIC_NORMAL, None)
+    view.write(0, 0, location)
+    table = buffer.cast("q")
+    table[HEADER_SEQUENCE] += 1
+
+    start = time.monotonic()
+    assert view.read(0, location.location_id) is None
+    assert time.monotonic() - start < 5
+
+    table[HEADER_SEQUENCE] += 1
+    assert view.read(0, location.location_id).polls == 1
+    table.release()
+    view.release()
+
+
+def tests_sharded_polling():
+    """Test that changes polled by the workers show up in the parent's view."""
+    service = StandInService(num_zones=4)
+    with (
+        StandInServer(service) as server,
+        ShardedPoller(
+            ACCOUNTS,
+            processes=2,
+            poll_interval=0.05,
+            origin=server.url,
+            client_kwargs={"retry_delay": 0},
+        ) as poller,
+    ):
+        view = poller.view
+        wait_for(lambda: all(view.read(index, LOCATION_ID) for index in range(4)))
+        assert view.arming_state(3, LOCATION_ID) == ArmingState.DISARMED
+        assert view.zone_status(0, LOCATION_ID, 2) == ZoneStatus.NORMAL
+
+        service.panels[LOCATION_ID].set_zone_status(2, ZoneStatus.FAULT)
+        service.panels[LOCATION_ID].arm(ArmType.AWAY.value, "1234", [])
+        wait_for(
+            lambda: all(
+                view.zone_status(index, LOCATION_ID, 2) == ZoneStatus.FAULT
+                and view.arming_state(index, LOCATION_ID) == ArmingState.ARMED_AWAY
+                and view.partition_arming_state(index, LOCATION_ID, 1) == ArmingState.ARMED_AWAY
+                for index in range(4)
+            )
+        )
+        assert view.read(1, LOCATION_ID).polls >= 2
+        poller.stop()
+        assert view.read(2, LOCATION_ID).errors == 0
+    assert service.request_counts["token"] == 4
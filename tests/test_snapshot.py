@@ -0,0 +1,74 @@
+"""Test immutable location snapshots."""
+
+import pytest
+from common import create_standin_client
+
+from total_connect_client.const import ArmingState, ArmType
+from total_connect_client.snapshot import LocationSnapshot
+from total_connect_client.standin import StandInService
+from total_connect_client.zone import ZoneStatus
+
+LOCATION_ID = 1000001
+
+
+pytestmark = pytest.mark.standin
+
+
+@pytest.fixture(name="service")
+def fixture_service():
+    """Return a stand-in with a panel of four zones."""
+    return StandInService(num_zones=4)
+
+
+def tests_published_after_load(service):
+    """Test that a loaded location has a snapshot of its state."""
+    location = create_standin_client(service, {"default": "1234"}).locations[LOCATION_ID]
+    snapshot = location.snapshot
+    assert snapshot.version == 1
+    assert snapshot.arming_state == ArmingState.DISARMED
+    assert snapshot.partitions[1].arming_state == ArmingState.DISARMED
+    assert set(snapshot.zones) == set(location.zones)
+    assert snapshot.zones[2].status == ZoneStatus.NORMAL
+    with pytest.raises(TypeError):
+        snapshot.zones[2] = snapshot.zones[1]  # type: ignore[index]
+
+
+def tests_unchanged_refresh(service):
+    """Test that a refresh that changes nothing keeps the snapshot."""
+    location = create_standin_client(service, {"default": "1234"}).locations[LOCATION_ID]
+    snapshot = location.snapshot
+    location.get_panel_meta_data()
+    assert location.snapshot is snapshot
+
+
+def tests_copy_on_write(service):
+    """Test that a new snapshot copies only the changed zones and leaves the old one alone."""
+    location = create_standin_client(service, {"default": "1234"}).locations[LOCATION_ID]
+    old = location.snapshot
+    service.panels[LOCATION_ID].set_zone_status(2, ZoneStatus.FAULT)
+    location.get_panel_meta_data()
+
+    new = location.snapshot
+    assert new.version == old.version + 1
+    assert new.changed_zones(old) == {2}
+    assert new.zones[2].status == ZoneStatus.FAULT
+    assert new.zones[1] is old.zones[1]
+    assert new.partitions is old.partitions
+    assert new.zones_with_status(ZoneStatus.FAULT) == {2}
+    assert old.zones[2].status == ZoneStatus.NORMAL
+
+    location.arm(ArmType.AWAY)
+    location.get_panel_meta_data()
+    armed = location.snapshot
+    assert armed.arming_state == ArmingState.ARMED_AWAY
+    assert armed.zones is new.zones
+    assert new.arming_state == ArmingState.DISARMED
+
+
+def tests_lazy_location(service):
+    """Test that a lazy location publishes once it is loaded."""
+    location = create_standin_client(service, {"default": "1234"}, lazy=True).locations[LOCATION_ID]
+    assert location.snapshot == LocationSnapshot(LOCATION_ID)
+    assert len(location.zones) == 4
+    assert location.snapshot.version == 1
+    assert len(location.snapshot.zones) == 4
@@ -0,0 +1,173 @@
+"""Test the client against the local stand-in server."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from common import create_standin_client
+
+from total_connect_client.client import TotalConnectClient
+from total_connect_client.const import ArmingState, ArmType
+from total_connect_client.exceptions import AuthenticationError, RetryableTotalConnectError
+from total_connect_client.schema import ZONE
+from total_connect_client.standin import StandInServer, StandInService
+from total_connect_client.zone import ZoneStatus
+
+pytestmark = pytest.mark.standin
+
+
+@pytest.fixture(name="server")
+def fixture_server():
+    """Run a stand-in server with two partitions and twelve zones."""
+    service = StandInService(num_zones=12, num_partitions=2, credentials=("user", "pass"))
+    with StandInServer(service) as server:
+        yield server
+
+
+def tests_load(server):
+    """Test logging in and loading the location."""
+    client = create_standin_client(server, {"default": "1234"})
+    location = client.locations[1000001]
+    assert len(location.zones) == 12
+    assert len(location.partitions) == 2
+    assert location.arming_state == ArmingState.DISARMED
+    assert location.zones[5].is_type_fire()
+    assert not location.zones[5].can_be_bypassed
+    assert location.zones[1].battery_level == 5
+    # keep-alive connections: at most one per detail request sent at once
+    assert server.connections <= 3
+
+
+def tests_bad_password(server):
+    """Test that the stand-in checks the encrypted credentials."""
+    with pytest.raises(AuthenticationError):
+        TotalConnectClient("user", "wrong", transport=server.transport())
+
+
+def tests_arm_disarm(server):
+    """Test arming and disarming change the simulated panel."""
+    location = create_standin_client(server, {"default": "1234"}).locations[1000001]
+    location.arm(ArmType.AWAY)
+    location.get_panel_meta_data()
+    assert location.arming_state == ArmingState.ARMED_AWAY
+    assert location.partitions[2].arming_state == ArmingState.ARMED_AWAY
+
+    location.disarm(partition_id=2)
+    location.get_panel_meta_data()
+    assert location.partitions[1].arming_state == ArmingState.ARMED_AWAY
+    assert location.partitions[2].arming_state == ArmingState.DISARMED
+
+
+def tests_bypass(server):
+    """Test bypassing zones and clearing the bypass."""
+    location = create_standin_client(server, {"default": "1234"}).locations[1000001]
+    location.zone_bypass(1)
+    location.get_panel_meta_data()
+    assert location.zones[1].is_bypassed()
+
+    # the client skips zones that cannot be bypassed
+    location.zone_bypass(5)
+    assert server.service.request_counts["bypass"] == 1
+
+    location.clear_bypass()
+    location.get_panel_meta_data()
+    assert not location.zones[1].is_bypassed()
+
+
+def tests_zone_status(server):
+    """Test that a zone changed on the panel shows up in the client."""
+    location = create_standin_client(server, {"default": "1234"}).locations[1000001]
+    server.service.panels[1000001].set_zone_status(2, ZoneStatus.FAULT)
+    location.get_panel_meta_data()
+    assert location.zones[2].is_faulted()
+    assert location.zones_with_status(ZoneStatus.FAULT) == {2}
+
+
+def tests_fail_first(server):
+    """Test that the client retries ResultCode 4101 from zones/0."""
+    server.service.set_behavior("zones", fail_first=2)
+    client = create_standin_client(server, {"default": "1234"})
+    assert server.service.request_counts["zones"] == 3
+    assert len(client.locations[1000001].zones) == 12
+
+
+def tests_http_errors(server):
+    """Test that the client retries HTTP 500 and gives up after its attempts."""
+    client = create_standin_client(server, {"default": "1234"})
+    server.service.set_behavior("fullStatus", error_rates={500: 1.0})
+    with pytest.raises(RetryableTotalConnectError):
+        client.locations[1000001].get_panel_meta_data()
+    assert server.service.request_counts["fullStatus"] == 1 + client.MAX_RETRY_ATTEMPTS
+
+
+def tests_expired_session(server):
+    """Test that the client logs in again when its token is rejected."""
+    client = create_standin_client(server, {"default": "1234"})
+    server.service.expire_sessions()
+    client.locations[1000001].get_panel_meta_data()
+    assert server.service.request_counts["token"] == 2
+
+
+def tests_fake_transport():
+    """Test the client against the stand-in without a server."""
+    service = StandInService(num_zones=3)
+    client = create_standin_client(service, {"default": "1234"})
+    location = client.locations[1000001]
+    assert len(location.zones) == 3
+    location.arm(ArmType.STAY)
+    location.get_panel_meta_data()
+    assert location.arming_state == ArmingState.ARMED_STAY
+    assert service.request_counts["arm"] == 1
+
+
+def tests_full_status_zone_types():
+    """Test that fullStatus gives each zone's type under the key the client reads."""
+    panel = StandInService(num_zones=4).panels[1000001]
+    for zone_info in panel.full_status()["PanelStatus"]["Zones"]:
+        zone = ZONE.parse(zone_info)
+        assert zone.zone_type_id == panel.zones[zone.zone_id]["ZoneTypeId"]
+
+
+def tests_concurrent_details():
+    """Test that the details of a location are fetched at once and applied in order."""
+    service = StandInService(num_zones=3, num_partitions=2)
+    service.panels[1000001].arm(ArmType.AWAY.value, "1234", [])
+    service.default_behavior.latency = 0.1
+    # the partitions arrive last but are applied first
+    service.set_behavior("partitions", latency=0.2)
+    client = create_standin_client(service)
+    location = client.locations[1000001]
+    assert location.partitions[2].arming_state == ArmingState.ARMED_AWAY
+    assert len(location.zones) == 3
+    # one after another they would take 0.4 seconds
+    assert client.metrics.timings["load_details"] < 0.35
+
+
+def poll_all_at_once(client):
+    """Refresh every location of a client, each in its own thread."""
+    with ThreadPoolExecutor(len(client.locations)) as executor:
+        for future in [
+            executor.submit(location.get_panel_meta_data) for location in client.locations.values()
+        ]:
+            future.result()
+
+
+def tests_concurrent_reauthentication():
+    """Test that threads refused together log in again only once."""
+    service = StandInService(num_locations=4)
+    client = create_standin_client(service)
+    service.expire_sessions()
+    service.set_behavior("fullStatus", latency=0.1)
+    poll_all_at_once(client)
+    assert service.request_counts["token"] == 2
+
+
+def tests_concurrent_token_refresh():
+    """Test that threads finding the token expired together refresh it only once."""
+    service = StandInService(num_locations=4)
+    client = create_standin_client(service)
+    session = client._oauth_session
+    session.token = {**session.token, "expires_at": time.time() - 10}
+    poll_all_at_once(client)
+    assert service.request_counts["token"] == 2
+    assert client._oauth_session is session
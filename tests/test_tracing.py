@@ -0,0 +1,113 @@
+"""Test tracing of API calls."""
+
+import pytest
+from common import create_standin_client
+
+from total_connect_client.exceptions import RetryableTotalConnectError
+from total_connect_client.standin import StandInService
+from total_connect_client.tracing import (
+    ATTR_ATTEMPT,
+    ATTR_ENDPOINT,
+    ATTR_LOCATION_ID,
+    ATTR_RESULT_CODE,
+    NO_OP_TRACER,
+    RecordingTracer,
+)
+
+LOCATION_ID = 1000001
+ZONES = "api/v1/locations/{id}/partitions/zones/{id}"
+
+
+pytestmark = pytest.mark.standin
+
+
+def tests_default():
+    """Test that tracing is off by default."""
+    client = create_standin_client(StandInService())
+    assert client.tracer is NO_OP_TRACER
+
+
+def tests_startup_spans():
+    """Test the spans opened while constructing a client."""
+    tracer = RecordingTracer()
+    create_standin_client(StandInService(num_locations=2), tracer=tracer)
+
+    (authenticate,) = tracer.find("total_connect.authenticate")
+    assert authenticate.parent is None
+    (session,) = tracer.find("total_connect.session_details")
+    (request,) = [
+        span for span in tracer.find("total_connect.http_request") if span.parent is session
+    ]
+    assert request.attributes[ATTR_ENDPOINT] == "api/v3/authentication/sessiondetails"
+    assert request.attributes[ATTR_RESULT_CODE] == 0
+
+    (load_details,) = tracer.find("total_connect.load_details")
+    locations = tracer.find("total_connect.load_location")
+    assert [span.attributes[ATTR_LOCATION_ID] for span in locations] == [1000001, 1000002]
+    assert all(span.parent is load_details for span in locations)
+    requests = [
+        span for span in tracer.find("total_connect.http_request") if span.parent is locations[1]
+    ]
+    assert len(requests) == 3
+    assert all(span.attributes[ATTR_LOCATION_ID] == 1000002 for span in requests)
+    assert all(span.end is not None for span in tracer.spans)
+
+
+def tests_retry_spans():
+    """Test that each attempt of a retried request has its own span."""
+    service = StandInService()
+    # one failure goes to the warm-up request
+    service.set_behavior("zones", fail_first=3)
+    tracer = RecordingTracer()
+    create_standin_client(service, tracer=tracer)
+
+    (request,) = [
+        span
+        for span in tracer.find("total_connect.http_request")
+        if span.attributes[ATTR_ENDPOINT] == ZONES
+    ]
+    attempts = [span for span in tracer.find("total_connect.attempt") if span.parent is request]
+    assert [span.attributes[ATTR_ATTEMPT] for span in attempts] == [1, 2, 3]
+    assert [span.attributes[ATTR_RESULT_CODE] for span in attempts] == [4101, 4101, 0]
+    assert isinstance(attempts[0].exception, RetryableTotalConnectError)
+    assert attempts[2].exception is None
+
+
+def tests_reauthentication_span():
+    """Test that re-authentication shows up inside the request that needed it."""
+    service = StandInService()
+    tracer = RecordingTracer()
+    client = create_standin_client(service, tracer=tracer)
+    service.expire_sessions()
+    tracer.spans.clear()
+
+    client.locations[LOCATION_ID].get_panel_meta_data()
+    (request,) = tracer.find("total_connect.http_request")
+    assert request.attributes[ATTR_LOCATION_ID] == LOCATION_ID
+    (authenticate,) = tracer.find("total_connect.authenticate")
+    assert authenticate.parent is request
+    attempts = [span for span in tracer.find("total_connect.attempt") if span.parent is request]
+    assert [span.attributes[ATTR_ATTEMPT] for span in attempts] == [1, 2]
+    assert attempts[0].end <= authenticate.start <= attempts[1].start
+
+
+def tests_update_spans():
+    """Test that each update step of a poll has a span with its location."""
+    tracer = RecordingTracer()
+    client = create_standin_client(StandInService(num_locations=2), tracer=tracer)
+    client.locations[1000002].get_panel_meta_data()
+
+    for name in (
+        "total_connect.update_status",
+        "total_connect.update_partitions",
+        "total_connect.update_zones",
+    ):
+        spans = tracer.find(name)
+        # one for each location's load, and one for the poll
+        assert [span.attributes[ATTR_LOCATION_ID] for span in spans] == [
+            1000001,
+            1000002,
+            1000002,
+        ]
+        assert spans[0].parent.name == "total_connect.load_location"
+        assert spans[-1].parent is None
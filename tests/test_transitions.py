@@ -0,0 +1,76 @@
+"""Test the per-zone ring buffers of transitions."""
+
+import pytest
+from common import create_standin_client
+
+from total_connect_client.standin import StandInService
+from total_connect_client.transitions import ZoneTransitions
+from total_connect_client.zone import ZoneStatus
+from total_connect_client.zone_table import MISSING
+
+LOCATION_ID = 1000001
+
+
+pytestmark = pytest.mark.standin
+
+
+def tests_ring_buffer():
+    """Test that the buffer keeps the last transitions, oldest first."""
+    transitions = ZoneTransitions(3)
+    assert len(transitions) == 0
+    assert list(transitions.last().ticks) == []
+    assert not transitions.is_last(0, None, None)
+
+    for ticks in range(1, 6):
+        transitions.append(ticks, ticks * 2, None, 5)
+    assert len(transitions) == 3
+    last = transitions.last()
+    assert list(last.ticks) == [3, 4, 5]
+    assert list(last.statuses) == [6, 8, 10]
+    assert list(last.battery_levels) == [MISSING] * 3
+    assert list(last.signal_strengths) == [5] * 3
+    assert list(transitions.last(2).ticks) == [4, 5]
+    assert list(transitions.last(10).ticks) == [3, 4, 5]
+    assert list(transitions.last(0).ticks) == []
+    assert transitions.is_last(10, None, 5)
+    assert not transitions.is_last(10, 1, 5)
+
+    transitions.clear()
+    assert len(transitions) == 0
+    with pytest.raises(ValueError):
+        ZoneTransitions(0)
+
+
+def tests_zone_transitions():
+    """Test that polls record each change of a zone once, stamped with the panel's ticks."""
+    service = StandInService(num_zones=4)
+    client = create_standin_client(service, zone_transitions=3)
+    location = client.locations[LOCATION_ID]
+    zone = location.zones[2]
+    assert zone.transitions is not None
+    assert list(zone.transitions.last().statuses) == [ZoneStatus.NORMAL]
+
+    panel = service.panels[LOCATION_ID]
+    for status in (ZoneStatus.FAULT, ZoneStatus.FAULT, ZoneStatus.NORMAL, ZoneStatus.BYPASSED):
+        panel.set_zone_status(2, status)
+        location.get_panel_meta_data()
+    last = zone.transitions.last()
+    assert list(last.statuses) == [ZoneStatus.FAULT, ZoneStatus.NORMAL, ZoneStatus.BYPASSED]
+    assert last.ticks[-1] == location.last_updated_timestamp_ticks != MISSING
+    # other zones did not change
+    assert len(location.zones[1].transitions) == 1
+
+    # a pushed change did not come with a panel status
+    location._update_zones([dict(panel._zone_info(panel.zones[2]), ZoneStatus=ZoneStatus.FAULT)])
+    assert zone.transitions.last(1).ticks[0] == MISSING
+
+    # reloading the zone details keeps the transitions
+    location.get_zone_details()
+    assert location.zones[2].transitions is zone.transitions
+
+
+def tests_off_by_default():
+    """Test that zones keep no transitions unless asked to."""
+    service = StandInService()
+    client = create_standin_client(service)
+    assert client.locations[LOCATION_ID].zones[1].transitions is None
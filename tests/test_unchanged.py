@@ -0,0 +1,126 @@
+"""Test skipping unchanged panel status responses."""
+
+import pytest
+import requests
+from common import create_standin_client
+
+from total_connect_client.const import ArmingState
+from total_connect_client.standin import StandInService
+from total_connect_client.zone import ZoneStatus
+
+LOCATION_ID = 1000001
+FULL_STATUS = "api/v3/locations/{id}/partitions/fullStatus"
+
+
+pytestmark = pytest.mark.standin
+
+
+def tests_skip_unchanged():
+    """Test that an unchanged response is not applied, and a changed one is."""
+    service = StandInService()
+    client = create_standin_client(service, skip_unchanged=True)
+    location = client.locations[LOCATION_ID]
+
+    # local state that an applied response would overwrite
+    location.arming_state = ArmingState.UNKNOWN
+    location.get_panel_meta_data()
+    assert location.arming_state == ArmingState.UNKNOWN
+    assert service.request_counts["fullStatus"] == 2
+
+    service.panels[LOCATION_ID].set_zone_status(1, ZoneStatus.FAULT)
+    location.get_panel_meta_data()
+    assert location.arming_state == ArmingState.DISARMED
+    assert location.zones[1].is_faulted()
+
+    # unchanged again, but forgotten
+    location.arming_state = ArmingState.UNKNOWN
+    client.forget_fingerprint(location.full_status_endpoint)
+    location.get_panel_meta_data()
+    assert location.arming_state == ArmingState.DISARMED
+
+
+def tests_changed_decoded_once(monkeypatch):
+    """Test that a changed response is decoded once, whatever the log level."""
+    service = StandInService()
+    client = create_standin_client(service, skip_unchanged=True)
+    location = client.locations[LOCATION_ID]
+    decoded = []
+    json = requests.Response.json
+
+    def counting_json(response, **kwargs):
+        decoded.append(response.url)
+        return json(response, **kwargs)
+
+    monkeypatch.setattr(requests.Response, "json", counting_json)
+    service.panels[LOCATION_ID].set_zone_status(1, ZoneStatus.FAULT)
+    location.get_panel_meta_data()
+    assert location.zones[1].is_faulted()
+    assert len(decoded) == 1
+
+
+def tests_default_applies_every_response():
+    """Test that responses are always applied unless skip_unchanged is set."""
+    client = create_standin_client(StandInService())
+    location = client.locations[LOCATION_ID]
+    location.arming_state = ArmingState.UNKNOWN
+    location.get_panel_meta_data()
+    assert location.arming_state == ArmingState.DISARMED
+
+
+def tests_local_change_applies_next_response():
+    """Test that marking a zone bypassed makes the next unchanged response apply."""
+    client = create_standin_client(StandInService(), skip_unchanged=True)
+    location = client.locations[LOCATION_ID]
+    zone = location.zones[1]
+    zone._mark_as_bypassed()
+    assert zone.is_bypassed()
+
+    # the panel does not show the bypass yet
+    location.get_panel_meta_data()
+    assert not zone.is_bypassed()
+
+
+def tests_failed_response_not_skipped():
+    """Test that an error response is never remembered as applied."""
+    service = StandInService()
+    client = create_standin_client(service, skip_unchanged=True)
+    endpoint = client.locations[LOCATION_ID].full_status_endpoint
+    service.set_behavior("fullStatus", error_rates={-4502: 1.0})
+    for _ in range(2):
+        assert client.http_request(endpoint, "GET", if_changed=True)["ResultCode"] == -4502
+
+
+def tests_etag():
+    """Test that a server's ETag is sent back in If-None-Match."""
+    service = StandInService(etags=True)
+    client = create_standin_client(service, skip_unchanged=True)
+    location = client.locations[LOCATION_ID]
+    location.arming_state = ArmingState.UNKNOWN
+    location.get_panel_meta_data()
+
+    assert location.arming_state == ArmingState.UNKNOWN
+    assert client.metrics.requests[(FULL_STATUS, "GET", 304)] == 1
+
+
+def tests_failed_load_applies_status(monkeypatch):
+    """Test that a load that fails after fetching the status applies it when retried."""
+    service = StandInService()
+    client = create_standin_client(service, skip_unchanged=True, lazy=True)
+    location = client.locations[LOCATION_ID]
+    apply_zone_details = type(location)._apply_zone_details
+    calls = []
+
+    def fail_once(self, result):
+        calls.append(result)
+        if len(calls) == 1:
+            raise RuntimeError("cannot apply zone details")
+        apply_zone_details(self, result)
+
+    monkeypatch.setattr(type(location), "_apply_zone_details", fail_once)
+    with pytest.raises(RuntimeError):
+        location.zones  # noqa: B018
+    assert location.arming_state == ArmingState.UNKNOWN
+
+    assert len(location.zones) == 8
+    assert location.arming_state == ArmingState.DISARMED
+    assert location.zones[1].status == ZoneStatus.NORMAL
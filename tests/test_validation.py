@@ -0,0 +1,109 @@
+"""Test per-endpoint response validation."""
+
+from copy import deepcopy
+
+import requests_mock
+from const import (
+    HTTP_RESPONSE_CONFIG,
+    HTTP_RESPONSE_TOKEN,
+    LOCATION_ID,
+    PANEL_STATUS_DISARMED,
+    REST_RESULT_PARTITIONS_CONFIG,
+    REST_RESULT_PARTITIONS_ZONES,
+    REST_RESULT_SESSION_DETAILS,
+    SECURITY_DEVICE_ID,
+)
+from pytest import raises
+
+from total_connect_client import schema
+from total_connect_client.client import TotalConnectClient
+from total_connect_client.const import (
+    AUTH_CONFIG_ENDPOINT,
+    AUTH_TOKEN_ENDPOINT,
+    HTTP_API_SESSION_DETAILS_ENDPOINT,
+    make_http_endpoint,
+)
+from total_connect_client.exceptions import PartialResponseError
+from total_connect_client.validation import (
+    FULL_STATUS_ENDPOINT,
+    RESPONSE_VALIDATORS,
+    parse_response,
+    validate,
+)
+
+FULL_STATUS = make_http_endpoint(f"api/v3/locations/{LOCATION_ID}/partitions/fullStatus")
+PARTITIONS_CONFIG = make_http_endpoint(
+    f"api/v1/locations/{LOCATION_ID}/devices/{SECURITY_DEVICE_ID}/partitions/config"
+)
+ZONE_DETAILS = make_http_endpoint(f"api/v1/locations/{LOCATION_ID}/partitions/zones/0")
+
+
+def tests_validate_only_success():
+    """Test that failed responses are left to raise_for_resultcode()."""
+    validate(RESPONSE_VALIDATORS, FULL_STATUS_ENDPOINT, {"ResultCode": 4101})
+    validate(RESPONSE_VALIDATORS, "api/v1/other", {"ResultCode": 0})
+    with raises(PartialResponseError):
+        validate(RESPONSE_VALIDATORS, FULL_STATUS_ENDPOINT, {"ResultCode": 0})
+    # a missing ResultCode means success
+    with raises(PartialResponseError):
+        validate(RESPONSE_VALIDATORS, FULL_STATUS_ENDPOINT, {})
+
+
+def tests_partial_response_retried():
+    """Test that a partial response retries only its own request."""
+    partial = deepcopy(PANEL_STATUS_DISARMED)
+    del partial["PanelStatus"]["Partitions"]
+
+    with requests_mock.Mocker() as rm:
+        rm.get(AUTH_CONFIG_ENDPOINT, json=HTTP_RESPONSE_CONFIG)
+        rm.post(AUTH_TOKEN_ENDPOINT, json=HTTP_RESPONSE_TOKEN)
+        rm.get(HTTP_API_SESSION_DETAILS_ENDPOINT, json=REST_RESULT_SESSION_DETAILS)
+        rm.get(PARTITIONS_CONFIG, json=REST_RESULT_PARTITIONS_CONFIG)
+        rm.get(ZONE_DETAILS, json=REST_RESULT_PARTITIONS_ZONES)
+        rm.get(FULL_STATUS, response_list=[{"json": partial}, {"json": PANEL_STATUS_DISARMED}])
+
+        client = TotalConnectClient("username", "password", {LOCATION_ID: "1234"}, retry_delay=0)
+        partitions_config_requests = [r for r in rm.request_history if r.url == PARTITIONS_CONFIG]
+
+    assert client.locations[LOCATION_ID].partitions
+    assert len(partitions_config_requests) == 1
+    assert client.metrics.retries == {(FULL_STATUS_ENDPOINT, "PartialResponseError"): 1}
+
+
+def tests_parsed_once(monkeypatch):
+    """Test that the location applies the record the validator parsed."""
+    parse = schema.FULL_STATUS.parse
+    parsed = []
+
+    def counting_parse(response):
+        parsed.append(response)
+        return parse(response)
+
+    monkeypatch.setattr(schema.FULL_STATUS, "parse", counting_parse)
+    monkeypatch.setitem(RESPONSE_VALIDATORS, FULL_STATUS_ENDPOINT, counting_parse)
+
+    with requests_mock.Mocker() as rm:
+        rm.get(AUTH_CONFIG_ENDPOINT, json=HTTP_RESPONSE_CONFIG)
+        rm.post(AUTH_TOKEN_ENDPOINT, json=HTTP_RESPONSE_TOKEN)
+        rm.get(HTTP_API_SESSION_DETAILS_ENDPOINT, json=REST_RESULT_SESSION_DETAILS)
+        rm.get(PARTITIONS_CONFIG, json=REST_RESULT_PARTITIONS_CONFIG)
+        rm.get(ZONE_DETAILS, json=REST_RESULT_PARTITIONS_ZONES)
+        rm.get(FULL_STATUS, json=PANEL_STATUS_DISARMED)
+
+        client = TotalConnectClient("username", "password", {LOCATION_ID: "1234"}, retry_delay=0)
+        client.locations[LOCATION_ID].get_panel_meta_data()
+        full_status_requests = [r for r in rm.request_history if r.url == FULL_STATUS]
+
+    assert len(parsed) == len(full_status_requests) == 2
+
+
+def tests_parse_response():
+    """Test that a record is only reused by the parser that made it."""
+    response = validate(RESPONSE_VALIDATORS, FULL_STATUS_ENDPOINT, PANEL_STATUS_DISARMED)
+    assert response == PANEL_STATUS_DISARMED
+    record = parse_response(response, schema.FULL_STATUS.parse)
+    assert parse_response(response, schema.FULL_STATUS.parse) is record
+    # an unvalidated response is parsed
+    assert parse_response(PANEL_STATUS_DISARMED, schema.FULL_STATUS.parse) is not record
+    with raises(PartialResponseError):
+        parse_response(response, schema.ZONE_DETAILS.parse)
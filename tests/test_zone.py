@@ -17,7 +17,7 @@ from const import (
 
 from total_connect_client.exceptions import TotalConnectError
 from total_connect_client.zone import TotalConnectZone as tcz
-from total_connect_client.zone import ZoneStatus, ZoneType
+from total_connect_client.zone import ZoneCategory, ZoneStatus, ZoneType
 
 ZONE_BYPASSED = {
     "ZoneDescription": "Bypassed",
@@ -395,3 +395,103 @@ def test_bypass():
     zone = tcz(zone_data, location)
     zone.bypass()
     location.zone_bypass.assert_called_once()
+
+
+def test_update_missing_and_null():
+    """Test that missing fields keep their value and null ones clear it."""
+    zone_data = {
+        "ZoneDescription": "MyZone",
+        "PartitionId": 1,
+        "ZoneTypeId": ZoneType.SECURITY,
+        "CanBeBypassed": 1,
+        "ZoneStatus": ZoneStatus.NORMAL,
+        "ZoneID": 1,
+        "Batterylevel": 5,
+        "Signalstrength": 3,
+    }
+    zone = tcz(zone_data, None)
+
+    zone_info = {
+        "ZoneDescription": "MyZone",
+        "PartitionID": 1,
+        "CanBeBypassed": 1,
+        "ZoneStatus": ZoneStatus.FAULT,
+        "ZoneID": 1,
+    }
+    zone._update(zone_info)
+    assert zone.zone_type_id == ZoneType.SECURITY
+    assert zone.battery_level == 5
+    assert zone.signal_strength == 3
+
+    zone._update({**zone_info, "ZoneTypeId": None, "Batterylevel": None, "Signalstrength": None})
+    assert zone.zone_type_id is None
+    assert zone.battery_level is None
+    assert zone.signal_strength is None
+
+
+def test_partition_zero():
+    """Test that a PartitionId of 0 falls back to PartitionID."""
+    zone_data = {
+        "ZoneDescription": "MyZone",
+        "PartitionId": 0,
+        "PartitionID": 2,
+        "ZoneTypeId": ZoneType.SECURITY,
+        "CanBeBypassed": 1,
+        "ZoneStatus": ZoneStatus.NORMAL,
+        "ZoneID": 1,
+    }
+    assert tcz(zone_data, None).partition == 2
+    del zone_data["PartitionID"]
+    assert tcz(zone_data, None).partition == 0
+
+
+def test_unchanged_update():
+    """Test that repeating the last update is skipped, except after a local bypass."""
+    location = Mock()
+    zone = tcz(ZS_NORMAL, location)
+    location._index_zone.reset_mock()
+
+    zone._update(ZS_NORMAL.copy())
+    location._index_zone.assert_not_called()
+
+    # the API does not report a bypass right away, so a repeated update must clear it
+    zone._mark_as_bypassed()
+    assert zone.is_bypassed() is True
+    location._index_zone.reset_mock()
+    zone._update(ZS_NORMAL.copy())
+    assert zone.is_bypassed() is False
+    location._index_zone.assert_called_once_with(zone)
+
+
+def test_categories():
+    """Test zone categories."""
+    zone = tcz(ZONE_BUTTON, None)
+    assert zone.categories == ZoneCategory.SECURITY | ZoneCategory.BUTTON
+    assert zone.in_category(ZoneCategory.BUTTON | ZoneCategory.FIRE) is True
+    assert zone.in_category(ZoneCategory.FIRE) is False
+
+    # a security zone that can be bypassed is not a button
+    zone._update(ZONE_BYPASSED)
+    assert zone.categories == ZoneCategory.SECURITY
+
+    assert tcz(ZONE_SMOKE, None).categories == ZoneCategory.FIRE
+
+
+def test_category_overrides():
+    """Test per-panel category overrides, including for unknown zone types."""
+    overrides = {ZoneType.MONITOR: ZoneCategory.FIRE, 12345: ZoneCategory.KEYPAD}
+
+    zone = tcz(ZONE_STATUS_LYRIC_TEMP, None, overrides)
+    assert zone.is_type_temperature() is False
+    assert zone.is_type_fire() is True
+
+    zone_unknown = {
+        "ZoneDescription": "Unknown",
+        "PartitionId": 1,
+        "ZoneTypeId": 12345,
+        "CanBeBypassed": 0,
+        "ZoneStatus": ZoneStatus.NORMAL,
+        "ZoneID": 1,
+    }
+    assert tcz(zone_unknown, None).categories == ZoneCategory.NONE
+    assert tcz(zone_unknown, None, overrides).is_type_keypad() is True
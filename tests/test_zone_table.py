@@ -0,0 +1,108 @@
+"""Test ZoneTable."""
+
+from unittest.mock import Mock
+
+from common import create_http_client
+from const import LOCATION_ID, REST_RESULT_PARTITIONS_ZONES, REST_RESULT_SESSION_DETAILS
+
+from total_connect_client.location import TotalConnectLocation
+from total_connect_client.zone import ZoneStatus, ZoneType
+from total_connect_client.zone_table import MISSING, ZoneTable
+
+RESULT_LOCATION = REST_RESULT_SESSION_DETAILS["SessionDetailsResult"]["Locations"][0]
+
+
+def _zone(zone_id, status, partition=1, zone_type=ZoneType.SECURITY):
+    return {
+        "ZoneID": zone_id,
+        "ZoneDescription": f"Zone {zone_id}",
+        "PartitionId": partition,
+        "ZoneTypeId": zone_type,
+        "CanBeBypassed": 1,
+        "ZoneStatus": status,
+    }
+
+
+def _location(zones):
+    location = TotalConnectLocation(RESULT_LOCATION, Mock())
+    location._update_zone_details({"ZoneStatus": {"Zones": zones}})
+    return location
+
+
+def tests_status_queries():
+    """Test that status queries match the per-zone predicates."""
+    location = _location(
+        [
+            _zone(1, ZoneStatus.NORMAL),
+            _zone(2, ZoneStatus.FAULT),
+            _zone(3, ZoneStatus.BYPASSED | ZoneStatus.LOW_BATTERY),
+            _zone(4, ZoneStatus.TROUBLE | ZoneStatus.LOW_BATTERY, partition=2),
+            _zone(5, ZoneStatus.TAMPER),
+            _zone(6, ZoneStatus.TRIGGERED, zone_type=ZoneType.FIRE_SMOKE),
+        ]
+    )
+    table = location.get_zone_table()
+    assert len(table) == 6
+
+    zones = location.zones.values()
+    assert table.faulted() == [z.zoneid for z in zones if z.is_faulted()]
+    assert table.bypassed() == [z.zoneid for z in zones if z.is_bypassed()]
+    assert table.low_battery() == [z.zoneid for z in zones if z.is_low_battery()]
+    assert table.tampered() == [z.zoneid for z in zones if z.is_tampered()]
+    assert table.triggered() == [z.zoneid for z in zones if z.is_triggered()]
+
+    assert table.with_all_status(ZoneStatus.BYPASSED | ZoneStatus.LOW_BATTERY) == [3]
+    assert table.in_partition(2) == [4]
+    assert table.of_type(ZoneType.FIRE_SMOKE) == [6]
+
+
+def tests_missing_values():
+    """Test that absent battery and signal values are stored as MISSING."""
+    location = _location([_zone(1, ZoneStatus.NORMAL, zone_type=12345)])
+    table = location.get_zone_table()
+    assert table.battery_levels[0] == MISSING
+    assert table.signal_strengths[0] == MISSING
+    assert table.of_type(12345) == [1]
+
+
+def tests_table_updated_in_place():
+    """Test that the location updates its table in place as zones change."""
+    location = _location(REST_RESULT_PARTITIONS_ZONES["ZoneStatus"]["Zones"])
+    table = location.get_zone_table()
+    assert location.get_zone_table() is table
+
+    location._update_zones([_zone(2, ZoneStatus.FAULT), _zone(99, ZoneStatus.LOW_BATTERY)])
+    assert location.get_zone_table() is table
+    assert table.faulted() == [2]
+    assert table.low_battery() == [99]
+
+    # bypassing a zone changes it without an update
+    location.zones[3]._mark_as_bypassed()
+    assert table.keys_with_status(ZoneStatus.BYPASSED) == [
+        (LOCATION_ID, zone_id) for zone_id, zone in location.zones.items() if zone.is_bypassed()
+    ]
+
+    rebuilt = ZoneTable.from_location(location)
+    for column in ZoneTable.__slots__:
+        assert getattr(table, column) == getattr(rebuilt, column)
+
+
+def tests_client_table():
+    """Test the table aggregated over all locations of a client."""
+    client = create_http_client()
+    table = client.get_zone_table()
+    location = client.locations[LOCATION_ID]
+    assert len(table) == len(location.zones)
+    assert set(table.location_ids) == {LOCATION_ID}
+    assert table.keys_with_status(ZoneStatus.BYPASSED) == [
+        (LOCATION_ID, zone_id) for zone_id, zone in location.zones.items() if zone.is_bypassed()
+    ]
+
+
+def tests_from_tables():
+    """Test concatenating tables."""
+    first = ZoneTable()
+    second = ZoneTable.from_location(_location([_zone(1, ZoneStatus.FAULT)]))
+    combined = ZoneTable.from_tables([first, second, second])
+    assert len(combined) == 2
+    assert combined.faulted() == [1, 1]
@@ -15,7 +15,9 @@ ArmingHelper = client.ArmingHelper
 
 ZoneStatus = zone.ZoneStatus
 ZoneType = zone.ZoneType
+ZoneCategory = zone.ZoneCategory
 ArmingState = const.ArmingState
+ArmingCategory = const.ArmingCategory
 ArmType = const.ArmType
 ResultCode = const._ResultCode
 
@@ -23,7 +25,9 @@ __all__ = [
     "TotalConnectClient",
     "ArmType",
     "ArmingState",
+    "ArmingCategory",
     "ArmingHelper",
     "ZoneType",
     "ZoneStatus",
+    "ZoneCategory",
 ]
@@ -1,28 +1,206 @@
-"""Test your system from the command line."""
+"""Test your system from the command line.
 
+    python3 -m total_connect_client username [password]
+
+logs in, prints what it finds and how long it took.
+
+To find out where the time goes, run refresh cycles and ask for a
+profile, allocation statistics or import times, against your account or
+a local stand-in of the service:
+
+    python3 -m total_connect_client username --cycles 20 --profile
+    python3 -m total_connect_client --standin --zones 64 --cycles 50 --tracemalloc
+"""
+
+import argparse
+import cProfile
 import getpass
+import io
 import logging
+import pstats
+import re
+import subprocess
 import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
 
 from total_connect_client.client import TotalConnectClient
+from total_connect_client.metrics import InMemorySink
+from total_connect_client.standin import StandInServer, StandInService
+
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+class _SamplingSink(InMemorySink):
+    """InMemorySink that also keeps every request latency, for percentiles."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.samples: dict[str, list[float]] = {}
+
+    def record_request(
+        self,
+        endpoint: str,
+        method: str,
+        status: int,
+        seconds: float,
+        bytes_sent: int,
+        bytes_received: int,
+    ) -> None:
+        super().record_request(endpoint, method, status, seconds, bytes_sent, bytes_received)
+        self.samples.setdefault(endpoint, []).append(seconds)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of values, e.g. fraction 0.9 for p90."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * fraction // 1))
+    return ordered[int(rank) - 1]
+
+
+def parse_args(argv: list[str] | None) -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python3 -m total_connect_client",
+        description="Log in to Total Connect and report on the account and client performance.",
+    )
+    parser.add_argument("username", nargs="?", help="Total Connect username")
+    parser.add_argument("password", nargs="?", help="password; asked for if not given")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print the locations")
+
+    profiling = parser.add_argument_group("profiling")
+    profiling.add_argument(
+        "--cycles", type=int, default=0, metavar="N", help="refresh every location N times"
+    )
+    profiling.add_argument(
+        "--profile", action="store_true", help="report the hottest functions (cProfile)"
+    )
+    profiling.add_argument(
+        "--tracemalloc", action="store_true", help="report memory allocation statistics"
+    )
+    profiling.add_argument(
+        "--importtime", action="store_true", help="report the import time of this package"
+    )
+    profiling.add_argument(
+        "--top", type=int, default=15, metavar="N", help="lines in each report (default 15)"
+    )
+
+    standin = parser.add_argument_group("stand-in service")
+    standin.add_argument(
+        "--standin", action="store_true", help="use a local stand-in instead of Total Connect"
+    )
+    standin.add_argument("--locations", type=int, default=1, help="stand-in locations")
+    standin.add_argument("--zones", type=int, default=16, help="stand-in zones per location")
+    standin.add_argument("--latency", type=float, default=0.05, help="stand-in seconds per request")
+
+    args = parser.parse_args(argv)
+    if not args.standin and not args.username:
+        parser.error("a username is required unless --standin is given")
+    return args
+
+
+def import_times(top: int) -> str:
+    """Import this package in a fresh interpreter with -X importtime and summarize."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import total_connect_client"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # "import time:  self [us] | cumulative | imported package"
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            rows.append((int(match[1]), int(match[2]), match[4]))
+    total = next((cumulative for _, cumulative, name in rows if name == "total_connect_client"), 0)
+    lines = [f"import total_connect_client: {total / 1000:.1f} ms", "slowest modules (self ms):"]
+    for self_us, _, name in sorted(rows, reverse=True)[:top]:
+        lines.append(f"  {self_us / 1000:8.1f}  {name}")
+    return "\n".join(lines)
+
+
+def latency_report(sink: _SamplingSink) -> str:
+    """Return per-endpoint request counts and latency percentiles in ms."""
+    header = "".join(f"{'p' + format(fraction * 100, 'g'):>9}" for fraction in PERCENTILES)
+    lines = [f"{'requests':>8}{header}  endpoint"]
+    for endpoint, samples in sorted(sink.samples.items()):
+        values = "".join(f"{percentile(samples, fraction) * 1000:9.1f}" for fraction in PERCENTILES)
+        lines.append(f"{len(samples):8}{values}  {endpoint}")
+    retries = ", ".join(f"{cause} {count}" for cause, count in sink.snapshot()["retries"].items())
+    lines.append(f"retries: {retries or 'none'}; re-authentications: {sink.reauthentications}")
+    return "\n".join(lines)
+
+
+def allocation_report(snapshot: tracemalloc.Snapshot, peak: int, top: int) -> str:
+    """Return the peak traced memory and the top allocation sites."""
+    lines = [f"peak traced memory: {peak / 1024:.1f} KiB", "top allocation sites:"]
+    for statistic in snapshot.statistics("lineno")[:top]:
+        lines.append(f"  {statistic}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the command line interface."""
+    args = parse_args(argv)
+    logging.basicConfig(filename="test.log", level=logging.DEBUG)
+
+    if args.importtime:
+        print(import_times(args.top), end="\n\n")
+
+    with ExitStack() as stack:
+        transport = None
+        username, password = args.username, args.password
+        if args.standin:
+            service = StandInService(num_locations=args.locations, num_zones=args.zones)
+            service.default_behavior.latency = args.latency
+            server = stack.enter_context(StandInServer(service))
+            transport = server.transport()
+            username = username or "stand-in"
+            password = password or "stand-in"
+        elif password is None:
+            password = getpass.getpass()
 
-logging.basicConfig(filename="test.log", level=logging.DEBUG)
+        sink = _SamplingSink()
+        profile = cProfile.Profile() if args.profile else None
+        if args.tracemalloc:
+            tracemalloc.start()
+        if profile:
+            profile.enable()
 
-if len(sys.argv) < 2 or len(sys.argv) > 3:
-    print("usage:  python3 -m total_connect_client username [password]\n")
-    sys.exit(1)
+        client = TotalConnectClient(username, password, transport=transport, metrics=sink)
+        start = time.perf_counter()
+        for _ in range(args.cycles):
+            for location in client.locations.values():
+                location.get_panel_meta_data()
+        elapsed = time.perf_counter() - start
 
+        if profile:
+            profile.disable()
+        if args.tracemalloc:
+            allocations = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
 
-USERNAME = sys.argv[1]
-if len(sys.argv) == 2:
-    PASSWORD = getpass.getpass()
-else:
-    PASSWORD = sys.argv[2]
+        if not args.quiet:
+            print(client)
+        print(f"Function run times:\n{client.times_as_string()}")
 
-TC = TotalConnectClient(USERNAME, PASSWORD)
+        if args.cycles:
+            polls = args.cycles * len(client.locations)
+            print(f"{polls} refreshes in {elapsed:.3f} s: {polls / elapsed:.1f} refreshes/s\n")
+            print(latency_report(sink), end="\n\n")
+        if profile:
+            out = io.StringIO()
+            pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(args.top)
+            print(out.getvalue())
+        if args.tracemalloc:
+            print(allocation_report(allocations, peak, args.top), end="\n\n")
 
-print(TC)
+        client.log_out()
+    return 0
 
-print(f"Function run times:\n{TC.times_as_string()}")
 
-TC.log_out()
+if __name__ == "__main__":
+    sys.exit(main())
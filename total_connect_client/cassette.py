@@ -0,0 +1,219 @@
+"""Recording and replaying Total Connect API traffic.
+
+RecordingTransport passes a client's requests on to another transport
+and keeps each request and response in a Cassette, with credentials,
+tokens and usercodes redacted. Save the cassette to a file, and later
+replay it with ReplayTransport, with the original timing or scaled:
+
+    recorder = RecordingTransport()
+    client = TotalConnectClient(username, password, usercodes, transport=recorder)
+    ...
+    recorder.cassette.save("session.json.gz")
+
+    replay = ReplayTransport(Cassette.load("session.json.gz"), time_scale=0)
+    client = TotalConnectClient("user", "password", usercodes, transport=replay)
+
+This reproduces problems seen in the field, such as the first-call 4101
+from the zone details endpoint (see docs/REST_NOTES.md), with real
+payload shapes and without a connection to the service.
+"""
+
+import gzip
+import json
+import threading
+import time
+import urllib.parse
+from collections import deque
+from collections.abc import Iterable
+from typing import Any, Final, cast
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from .const import endpoint_template
+from .transport import json_response
+
+REDACTED: Final[str] = "REDACTED"
+
+# keys whose values are replaced by REDACTED, in form data, queries and JSON bodies
+REDACTED_KEYS: Final[frozenset[str]] = frozenset(
+    {
+        "username",
+        "password",
+        "Username",
+        "Password",
+        "userCode",
+        "UserCode",
+        "usercode",
+        "access_token",
+        "refresh_token",
+    }
+)
+
+# response headers kept in the cassette
+_KEPT_HEADERS: Final[tuple[str, ...]] = ("Content-Type", "Retry-After")
+
+CASSETTE_VERSION: Final[int] = 1
+
+
+def redact(value: Any, keys: Iterable[str] = REDACTED_KEYS) -> Any:
+    """Return a copy of JSON-like data with the values of the given keys redacted."""
+    keys = keys if isinstance(keys, frozenset) else frozenset(keys)
+    if isinstance(value, dict):
+        return {key: REDACTED if key in keys else redact(item, keys) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item, keys) for item in value]
+    return value
+
+
+class Cassette:
+    """A recorded sequence of requests and responses.
+
+    Each interaction is a dict with the request method, url and form,
+    the response status, headers and body, and the seconds it took.
+    Bodies are kept as decoded JSON where possible.
+    """
+
+    def __init__(self, interactions: list[dict[str, Any]] | None = None) -> None:
+        """Initialize with the given interactions, or none."""
+        self.interactions: list[dict[str, Any]] = interactions or []
+
+    def __len__(self) -> int:
+        """Return the number of interactions."""
+        return len(self.interactions)
+
+    def save(self, path: str) -> None:
+        """Write the cassette as JSON, compressed if path ends with .gz."""
+        data = json.dumps(
+            {"version": CASSETTE_VERSION, "interactions": self.interactions},
+            separators=(",", ":"),
+        ).encode()
+        if path.endswith(".gz"):
+            data = gzip.compress(data)
+        with open(path, "wb") as file:
+            file.write(data)
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        """Read a cassette written by save()."""
+        with open(path, "rb") as file:
+            data = file.read()
+        if path.endswith(".gz"):
+            data = gzip.decompress(data)
+        document = json.loads(data)
+        if document.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"unsupported cassette version {document.get('version')}")
+        return cls(document["interactions"])
+
+
+class RecordingTransport(BaseAdapter):
+    """Send requests through another transport and record them in a Cassette."""
+
+    def __init__(
+        self,
+        transport: BaseAdapter | None = None,
+        cassette: Cassette | None = None,
+        redacted_keys: Iterable[str] = REDACTED_KEYS,
+    ) -> None:
+        """Initialize.
+
+        transport sends the requests; by default it is a plain HTTPAdapter.
+        Values of redacted_keys are not recorded.
+        """
+        super().__init__()
+        self.transport: BaseAdapter = transport or HTTPAdapter()
+        self.cassette: Cassette = cassette or Cassette()
+        self.redacted_keys: frozenset[str] = frozenset(redacted_keys)
+        self._lock = threading.Lock()
+
+    def send(  # type: ignore[override]
+        self, request: PreparedRequest, **kwargs: Any
+    ) -> Response:
+        """Send the request and record the interaction."""
+        start = time.perf_counter()
+        response = self.transport.send(request, **kwargs)
+        seconds = time.perf_counter() - start
+        interaction = {
+            "method": request.method,
+            "url": self._redact_url(request.url or ""),
+            "form": self._form(request.body),
+            "status": response.status_code,
+            "headers": {
+                key: response.headers[key] for key in _KEPT_HEADERS if key in response.headers
+            },
+            "body": self._body(response),
+            "seconds": round(seconds, 6),
+        }
+        with self._lock:
+            self.cassette.interactions.append(interaction)
+        return response
+
+    def close(self) -> None:
+        """Close the underlying transport."""
+        self.transport.close()
+
+    def _redact_url(self, url: str) -> str:
+        parts = urllib.parse.urlsplit(url)
+        if not parts.query:
+            return url
+        query = [
+            (key, REDACTED if key in self.redacted_keys else value)
+            for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        ]
+        return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
+
+    def _form(self, body: str | bytes | None) -> dict[str, Any] | None:
+        if not body:
+            return None
+        text = body.decode() if isinstance(body, bytes) else body
+        form = dict(urllib.parse.parse_qsl(text, keep_blank_values=True))
+        return cast(dict[str, Any], redact(form, self.redacted_keys))
+
+    def _body(self, response: Response) -> Any:
+        try:
+            body = response.json()
+        except ValueError:
+            return response.text
+        return redact(body, self.redacted_keys)
+
+
+class ReplayTransport(BaseAdapter):
+    """Answer requests from a Cassette instead of the network.
+
+    Requests are matched to recorded responses by method and endpoint
+    (see const.endpoint_template()), in the order they were recorded.
+    When the recorded responses for an endpoint run out, the last one is
+    repeated, so a short recording can drive a long polling benchmark.
+    Each response is delayed by its recorded duration times time_scale;
+    0 replays without delay.
+    """
+
+    def __init__(self, cassette: Cassette, time_scale: float = 1.0) -> None:
+        """Initialize with the cassette to replay."""
+        super().__init__()
+        self.time_scale: float = time_scale
+        self._queues: dict[tuple[str, str], deque[dict[str, Any]]] = {}
+        for interaction in cassette.interactions:
+            key = (interaction["method"], endpoint_template(interaction["url"]))
+            self._queues.setdefault(key, deque()).append(interaction)
+        self._lock = threading.Lock()
+
+    def send(  # type: ignore[override]
+        self, request: PreparedRequest, **kwargs: Any
+    ) -> Response:
+        """Return the next recorded response for this endpoint."""
+        key = (request.method or "", endpoint_template(request.url or ""))
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                return json_response(request, 404, {"Message": f"not recorded: {key}"})
+            interaction = queue.popleft() if len(queue) > 1 else queue[0]
+        delay = interaction["seconds"] * self.time_scale
+        if delay > 0:
+            time.sleep(delay)
+        return json_response(
+            request, interaction["status"], interaction["body"], interaction["headers"]
+        )
+
+    def close(self) -> None:
+        """Nothing to clean up."""
@@ -10,11 +10,16 @@ for location in client.locations:
 """
 
 import base64
+import contextvars
+import hashlib
 import json
 import logging
+import re
+import threading
 import time
 from collections.abc import Callable
-from typing import Any, cast
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Final, Literal, cast, overload
 
 import requests
 import requests.adapters
@@ -30,6 +35,7 @@ from .const import (
     HTTP_API_SESSION_DETAILS_ENDPOINT,
     ArmType,
     _ResultCode,
+    endpoint_template,
 )
 from .exceptions import (
     AuthenticationError,
@@ -37,19 +43,70 @@ from .exceptions import (
     FailedToBypassZone,
     FeatureNotSupportedError,
     InvalidSessionError,
+    RateLimitedError,
     RetryableTotalConnectError,
     ServiceUnavailable,
     TotalConnectError,
     UsercodeInvalid,
     UsercodeUnavailable,
 )
+from .flags import FlagTable, parse_flags
+from .history import HistoryStore
 from .location import TotalConnectLocation
+from .metrics import InMemorySink, MetricsSink
+from .ratelimit import RateLimiter, parse_retry_after
+from .retry import RETRY_PROFILES, RetryBudget, RetryProfile
+from .schema import SESSION_DETAILS_RESPONSE
+from .tracing import (
+    ATTR_ATTEMPT,
+    ATTR_ENDPOINT,
+    ATTR_LOCATION_ID,
+    ATTR_METHOD,
+    ATTR_RESULT_CODE,
+    NO_OP_TRACER,
+    Tracer,
+)
 from .user import TotalConnectUser
+from .validation import RESPONSE_VALIDATORS, ResponseValidator, parse_response, validate
+from .zone_table import ZoneTable
 
 DEFAULT_USERCODE = "-1"
 
 LOGGER = logging.getLogger(__name__)
 
+_LOCATION_IN_PATH = re.compile(r"/locations/(\d+)/")
+
+# returned by _do_http_request() for a response equal to the last one applied
+_UNCHANGED: Final[dict[str, Any]] = {}
+
+
+def _fingerprint_key(endpoint: str, params: dict[str, Any] | None) -> Any:
+    """Return the key of a request's fingerprint: its URL and query parameters."""
+    return (endpoint, tuple(sorted(params.items()))) if params else endpoint
+
+
+class _SerializedRefreshSession(OAuth2Session):
+    """An OAuth2Session whose token is refreshed by one thread at a time.
+
+    When requests in several threads find the token expired together,
+    the first refreshes it and the others use the new token.
+    """
+
+    def __init__(self, lock: threading.RLock, **kwargs: Any) -> None:
+        """Initialize; lock serializes refreshes, and is shared with logins."""
+        super().__init__(**kwargs)
+        self._refresh_lock = lock
+
+    def refresh_token(  # type: ignore[override]
+        self, token_url: str, refresh_token: str | None = None, **kwargs: Any
+    ) -> Any:
+        """Refresh the token, unless another thread did while this one waited."""
+        expired = self.token
+        with self._refresh_lock:
+            if self.token is not expired:
+                return self.token
+            return super().refresh_token(token_url, refresh_token, **kwargs)
+
 
 class TotalConnectClient:
     """Client for Total Connect."""
@@ -59,6 +116,13 @@ class TotalConnectClient:
     RETRY_ON_HTTP_STATUS_CODES = [429, 500, 502, 503, 504]
     # HTTP status codes indicating server issue
 
+    @classmethod
+    def retry_statuses(cls, rate_limited: bool) -> list[int]:
+        """Return the statuses the transport retries; a rate limiter handles 429 itself."""
+        if rate_limited:
+            return [code for code in cls.RETRY_ON_HTTP_STATUS_CODES if code != 429]
+        return cls.RETRY_ON_HTTP_STATUS_CODES
+
     def __init__(  # pylint: disable=too-many-arguments
         self,
         username: str,
@@ -67,52 +131,115 @@ class TotalConnectClient:
         auto_bypass_battery: bool = False,
         retry_delay: int = 6,  # seconds between retries
         load_details: bool = True,
+        transport: requests.adapters.BaseAdapter | None = None,
+        metrics: MetricsSink | None = None,
+        tracer: Tracer | None = None,
+        skip_unchanged: bool = False,
+        lazy: bool = False,
+        retry_budget: RetryBudget | None = None,
+        rate_limiter: RateLimiter | None = None,
+        history: HistoryStore | None = None,
+        zone_transitions: int = 0,
     ) -> None:
-        """Initialize."""
-        self.times = {}
+        """Initialize.
+
+        transport replaces the requests transport adapter for all HTTPS
+        requests, including authentication; see the transport module.
+        metrics receives instrumentation; by default it is kept in an
+        InMemorySink (see the metrics module).
+        tracer opens spans around API calls; see the tracing module.
+        If skip_unchanged is true, a panel status response that is byte for
+        byte the one applied last is neither decoded nor applied again; see
+        http_request().
+        If lazy is true, the constructor sends no requests and load_details
+        is ignored. The client logs in on its first request, gets the
+        locations the first time self.locations is read, and loads the
+        details of each location the first time its partitions or zones are
+        read.
+        retry_budget limits the retries of temporary failures, usually across
+        many clients; see the retry module.
+        rate_limiter paces the API requests and slows down when the service
+        answers 429; see the ratelimit module.
+        history records the changes of the locations; see the history
+        module. zone_transitions is the number of transitions to keep in
+        memory for each zone; see the transitions module.
+        """
         self.time_start = time.time()
+        self.metrics: MetricsSink = InMemorySink() if metrics is None else metrics
+        self.tracer: Tracer = NO_OP_TRACER if tracer is None else tracer
 
         self.username: str = username
         self.password: str = password
         self.usercodes = usercodes or {}
         self.auto_bypass_low_battery: bool = auto_bypass_battery
         self.retry_delay: int = retry_delay
+        self.retry_profiles: dict[str, RetryProfile] = dict(RETRY_PROFILES)
+        self.retry_budget: RetryBudget | None = retry_budget
+        self.rate_limiter: RateLimiter | None = rate_limiter
+        self.history: HistoryStore | None = history
+        self.zone_transitions: int = zone_transitions
+        # GETs in flight, when coalescing them for the rate limiter
+        self._reads: dict[Any, Future[dict[str, Any] | None]] = {}
+        self._reads_lock = threading.Lock()
+        self.response_validators: dict[str, ResponseValidator] = dict(RESPONSE_VALIDATORS)
+        self.skip_unchanged: bool = skip_unchanged
+        # fingerprints and ETags of the last applied response, by request
+        self._fingerprints: dict[Any, bytes] = {}
+        self._etags: dict[Any, str] = {}
 
         self._logged_in: bool = False
         self._oauth_session: OAuth2Session | None = None
+        # held while logging in or refreshing the token; see _SerializedRefreshSession
+        self._auth_lock = threading.RLock()
         self._oauth_client: LegacyApplicationClient | None = None
         self._invalid_credentials: bool = False
         self._client_id: str = ""
         self._app_id: str = ""
         self._app_version: str = ""
         self._key_pem: str = ""
+        self._transport: requests.adapters.BaseAdapter | None = transport
 
         self._raw_http_session = requests.Session()
         self._raw_http_session.mount(
             "https://",
-            requests.adapters.HTTPAdapter(
+            transport
+            or requests.adapters.HTTPAdapter(
                 max_retries=requests.adapters.Retry(
-                    total=self.MAX_RETRY_ATTEMPTS, status_forcelist=self.RETRY_ON_HTTP_STATUS_CODES
+                    total=self.MAX_RETRY_ATTEMPTS,
+                    status_forcelist=self.retry_statuses(rate_limiter is not None),
                 )
             ),
         )
+        self._raw_http_session.hooks["response"].append(self._record_response)
 
-        self._module_flags: dict[str, str] = {}
+        self._module_flags: FlagTable = parse_flags(None)
         self._user: TotalConnectUser | None = None
         self._locations: dict[int, TotalConnectLocation] = {}
         self._location_details: dict[int, bool] = {}
+        self._warm_ups: dict[int, threading.Thread] = {}
+        self.lazy: bool = lazy
+        self._session_pending: bool = True
+        # held while the session or the details of a location load
+        self._load_lock = threading.RLock()
+        self._loading: set[int] = set()
+
+        if not lazy:
+            self.authenticate()
+            self._start_session()
 
-        self.authenticate()
-        self._get_session_details()
-
-        if load_details:
-            self.load_details()
+            if load_details:
+                start_time = time.time()
+                self._start_warm_ups()
+                self.load_details()
+                self.metrics.record_timing("load_details", time.time() - start_time)
 
-        self.times["__init__"] = time.time() - self.time_start
+        self.metrics.record_timing("__init__", time.time() - self.time_start)
 
     @property
     def locations(self) -> dict[int, TotalConnectLocation]:
         """Public access for locations."""
+        if self._session_pending:
+            self._start_session()
         return self._locations
 
     def __str__(self) -> str:  # pragma: no cover
@@ -138,15 +265,38 @@ class TotalConnectClient:
 
         return data + locations
 
+    @property
+    def times(self) -> dict[str, float]:
+        """Return a copy of the duration in seconds of each step recorded so far.
+
+        Deprecated: use self.metrics instead. This is empty unless the
+        metrics are kept in an InMemorySink.
+        """
+        if isinstance(self.metrics, InMemorySink):
+            return dict(self.metrics.timings)
+        return {}
+
     def times_as_string(self) -> str:
         """Return a string with times."""
-        self.times["total running time"] = time.time() - self.time_start
+        times = {**self.times, "total running time": time.time() - self.time_start}
         msg = "total-connect-client time info (seconds):\n"
-        for key, value in self.times.items():
+        for key, value in times.items():
             msg = msg + f"  {key}: {value}\n"
 
         return msg
 
+    def _record_response(self, response: requests.Response, *args: Any, **kwargs: Any) -> None:
+        """Report an HTTP response to the metrics sink; a requests response hook."""
+        request = response.request
+        self.metrics.record_request(
+            endpoint_template(request.url or ""),
+            request.method or "",
+            response.status_code,
+            response.elapsed.total_seconds(),
+            len(request.body or b""),
+            len(response.content or b""),
+        )
+
     def _raise_for_retry(self, response: dict[str, Any]) -> None:
         """Determine which responses should be retried in request()."""
         rc = _ResultCode.from_response(response)
@@ -196,76 +346,206 @@ class TotalConnectClient:
         do_request: Callable[[], dict[str, Any]],
         request_description: str,
         attempts_remaining: int = MAX_RETRY_ATTEMPTS,
+        endpoint: str = "",
     ) -> dict[str, Any]:
         """Call a given request function and handle retries for temporary errors and authentication
-        problems."""
+        problems.
+
+        endpoint is the endpoint_template() of the request, used in metrics and
+        to find its retry profile and response validator."""
         is_first_request = attempts_remaining == self.MAX_RETRY_ATTEMPTS
         attempts_remaining -= 1
+        attempt = self.MAX_RETRY_ATTEMPTS - attempts_remaining
+        attributes = {ATTR_ENDPOINT: endpoint, ATTR_ATTEMPT: attempt}
+        session = self._oauth_session
 
         try:
             LOGGER.debug(f"sending API request {request_description}")
-            response = do_request()
-            self._raise_for_retry(response)
+            with self.tracer.start_as_current_span(
+                "total_connect.attempt", attributes=attributes
+            ) as span:
+                response = do_request()
+                if response is _UNCHANGED:
+                    return response
+                if "ResultCode" in response:
+                    span.set_attribute(ATTR_RESULT_CODE, response["ResultCode"])
+                self._raise_for_retry(response)
+                response = validate(self.response_validators, endpoint, response)
             return response
         # To retry an exception that could be raised during the
         # request, add it to an except block here, depending on what
         # you want to have happen. The first block just retries and
         # logs. The second block causes reauthentication.
         except RetryableTotalConnectError as err:
-            if attempts_remaining <= 0:
+            if attempts_remaining <= 0 or not self._may_retry(endpoint):
                 raise
+            self.metrics.record_retry(endpoint, type(err).__name__)
             msg = f"{self.username} {request_description} {err.args[0]} on response"
             if is_first_request:
                 LOGGER.info(f"{msg}: {attempts_remaining} retries remaining")
             else:
                 LOGGER.debug(f"{msg}: {attempts_remaining} retries remaining")
-            time.sleep(self.retry_delay)
+            time.sleep(self._retry_delay_after(endpoint, attempt, err))
         except requests.RequestException as err:
-            if attempts_remaining <= 0:
+            if attempts_remaining <= 0 or not self._may_retry(endpoint):
                 raise ServiceUnavailable(
                     f"Error connecting to Total Connect service: {err}"
                 ) from err
+            self.metrics.record_retry(endpoint, "RequestException")
             LOGGER.debug(
                 f"Error connecting to Total Connect service: {attempts_remaining} retries remaining"
             )
-            time.sleep(self.retry_delay)
+            time.sleep(self._retry_delay_after(endpoint, attempt, err))
         except (OAuth2Error, InvalidSessionError, ValueError) as err:
             LOGGER.debug(
                 f"Invalid session during request.  Attempts remaining: {attempts_remaining}. Error: {err}"
             )
             if attempts_remaining <= 0:
                 raise ServiceUnavailable(f"Invalid Session after multiple retries: {err}") from err
+            self.metrics.record_retry(endpoint, "InvalidSessionError")
+            self.metrics.record_reauthentication()
             LOGGER.info(f"re-authenticating: {attempts_remaining} retries remaining")
-            self.authenticate()
+            self._reauthenticate(session)
 
-        return self._request_with_retries(do_request, request_description, attempts_remaining)
+        return self._request_with_retries(
+            do_request, request_description, attempts_remaining, endpoint
+        )
 
+    def _may_retry(self, endpoint: str) -> bool:
+        """Return whether the retry budget, if any, allows another retry."""
+        if self.retry_budget is None or self.retry_budget.try_spend():
+            return True
+        LOGGER.info(f"{self.username} not retrying {endpoint}: retry budget exhausted")
+        return False
+
+    def _retry_delay_after(self, endpoint: str, attempt: int, err: Exception) -> float:
+        """Return seconds to wait after a failed attempt, following retry_profiles."""
+        if isinstance(err, RateLimitedError) and self.rate_limiter is not None:
+            # the rate limiter holds the retry back as long as needed
+            return 0
+        profile = self.retry_profiles.get(endpoint)
+        if profile is None:
+            return self.retry_delay
+        response = err.args[1] if len(err.args) > 1 and isinstance(err.args[1], dict) else {}
+        return profile.delay_before_retry(attempt, response.get("ResultCode"), self.retry_delay)
+
+    @overload
     def http_request(
         self,
         endpoint: str,
         method: str,
         params: dict[str, Any] | None = None,
         data: dict[str, Any] | None = None,
-    ) -> dict[str, Any]:
+        if_changed: Literal[False] = False,
+    ) -> dict[str, Any]: ...
+
+    @overload
+    def http_request(
+        self,
+        endpoint: str,
+        method: str,
+        params: dict[str, Any] | None = None,
+        data: dict[str, Any] | None = None,
+        *,
+        if_changed: bool,
+    ) -> dict[str, Any] | None: ...
+
+    def http_request(
+        self,
+        endpoint: str,
+        method: str,
+        params: dict[str, Any] | None = None,
+        data: dict[str, Any] | None = None,
+        if_changed: bool = False,
+    ) -> dict[str, Any] | None:
         """Send an HTTP request to a Web API endpoint
 
         method is the HTTP method, e.g. 'GET', 'POST', 'PUT', 'DELETE'
         params is a dictionary defining the query parameters to add to the endpoint URL (usually with GET)
         data is a dictionary defining the query parameter to encode in the request body (usually with POST/PUT)
+
+        If if_changed is true, return None without decoding the response if
+        its body has the same fingerprint as the last successful response to
+        the same request, or if the server answers 304 to If-None-Match with
+        its ETag. A caller that fails to apply the returned response must
+        call forget_fingerprint() so the next one is not skipped.
+
+        With a rate_limiter, a GET sent while the same GET is waiting or in
+        flight in another thread gets the same result instead of being sent.
         """
         LOGGER.debug(
             f"\n----- http_request -----\n\tendpoint: {endpoint}\n\tmethod: {method}\n\tparams: {params}\n\tdata: {data}\n----- end request -----"
         )
+        if self._oauth_session is None and self.lazy:
+            self.authenticate()
+        if self.rate_limiter is None or method != "GET" or data:
+            return self._send_http_request(endpoint, method, params, data, if_changed)
+
+        read = (_fingerprint_key(endpoint, params), if_changed)
+        with self._reads_lock:
+            pending = self._reads.get(read)
+            leader = pending is None
+            if pending is None:
+                pending = self._reads[read] = Future()
+        if not leader:
+            LOGGER.debug(f"{method} {endpoint}: waiting for the same request in flight")
+            return pending.result()
+        try:
+            result = self._send_http_request(endpoint, method, params, data, if_changed)
+        except BaseException as err:
+            pending.set_exception(err)
+            raise
+        else:
+            pending.set_result(result)
+        finally:
+            with self._reads_lock:
+                del self._reads[read]
+        return result
+
+    def _send_http_request(
+        self,
+        endpoint: str,
+        method: str,
+        params: dict[str, Any] | None,
+        data: dict[str, Any] | None,
+        if_changed: bool,
+    ) -> dict[str, Any] | None:
+        """Send an HTTP request; see http_request()."""
+        key = _fingerprint_key(endpoint, params) if if_changed else None
+        received: dict[str, Any] = {}
 
         def _do_http_request() -> dict[str, Any]:
             if self._oauth_session is None:
                 raise TotalConnectError("OAuth session not initialized")
+            etag = self._etags.get(key) if if_changed else None
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(endpoint)
             response = self._oauth_session.request(
-                method=method, url=endpoint, params=params, data=data
-            )
-            LOGGER.debug(
-                f"\n----- http response -----\n\tok: {response.ok}\n\tstatus code: {response.status_code}\n\tJSON: {response.json()}\n----- end response -----"
+                method=method,
+                url=endpoint,
+                params=params,
+                data=data,
+                headers={"If-None-Match": etag} if etag else None,
             )
+            if self.rate_limiter is not None:
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    self.rate_limiter.throttled(endpoint, retry_after)
+                    raise RateLimitedError(f"Too many requests; Retry-After: {retry_after}")
+                self.rate_limiter.succeeded(endpoint)
+            if if_changed:
+                if response.status_code == 304:
+                    return _UNCHANGED
+                fingerprint = hashlib.blake2b(response.content, digest_size=16).digest()
+                if fingerprint == self._fingerprints.get(key):
+                    return _UNCHANGED
+                received["fingerprint"] = fingerprint
+                received["etag"] = response.headers.get("ETag")
+            if LOGGER.isEnabledFor(logging.DEBUG):
+                # the body is decoded once, below; log it as text
+                LOGGER.debug(
+                    f"\n----- http response -----\n\tok: {response.ok}\n\tstatus code: {response.status_code}\n\tbody: {response.text}\n----- end response -----"
+                )
             if not response.ok:
                 LOGGER.debug(
                     f"Received HTTP error code {response.status_code} with response:",
@@ -280,10 +560,42 @@ class TotalConnectClient:
                     raise RetryableTotalConnectError(
                         f"Server temporarily unavailable. Status code: {response.status_code}"
                     )
-            return cast(dict[str, Any], response.json())
-
+            result = cast(dict[str, Any], response.json())
+            result_code = result.get("ResultCode") if isinstance(result, dict) else None
+            if isinstance(result_code, int):
+                self.metrics.record_result_code(template, result_code)
+            return result
+
+        template = endpoint_template(endpoint)
+        attributes: dict[str, Any] = {ATTR_ENDPOINT: template, ATTR_METHOD: method}
+        location = _LOCATION_IN_PATH.search(endpoint)
+        if location:
+            attributes[ATTR_LOCATION_ID] = int(location[1])
         args = {**(params or {}), **(data or {})}
-        return self._request_with_retries(_do_http_request, f"{method} {endpoint} ({args})")
+        with self.tracer.start_as_current_span(
+            "total_connect.http_request", attributes=attributes
+        ) as span:
+            result = self._request_with_retries(
+                _do_http_request, f"{method} {endpoint} ({args})", endpoint=template
+            )
+            if result is _UNCHANGED:
+                LOGGER.debug(f"{method} {endpoint}: unchanged since last applied")
+                return None
+            if "ResultCode" in result:
+                span.set_attribute(ATTR_RESULT_CODE, result["ResultCode"])
+        if received and _ResultCode.from_response(result) == _ResultCode.SUCCESS:
+            self._fingerprints[key] = received["fingerprint"]
+            if received["etag"]:
+                self._etags[key] = received["etag"]
+            else:
+                self._etags.pop(key, None)
+        return result
+
+    def forget_fingerprint(self, endpoint: str, params: dict[str, Any] | None = None) -> None:
+        """Make the next http_request(if_changed=True) of this request return its response."""
+        key = _fingerprint_key(endpoint, params)
+        self._fingerprints.pop(key, None)
+        self._etags.pop(key, None)
 
     def _encrypt_credential(self, credential: str) -> str:
         # Load the key from the PEM file
@@ -311,11 +623,24 @@ class TotalConnectClient:
                 f"not authenticating: password already failed for user {self.username}"
             )
 
-        self._get_configuration()
-        self._request_token()
+        with self._auth_lock, self.tracer.start_as_current_span("total_connect.authenticate"):
+            self._get_configuration()
+            self._request_token()
 
         LOGGER.info(f"{self.username} authenticated")
-        self.times["authenticate"] = time.time() - start_time
+        self.metrics.record_timing("authenticate", time.time() - start_time)
+
+    def _reauthenticate(self, stale: OAuth2Session | None) -> None:
+        """Log in again after a request on the stale session was refused.
+
+        Other threads may have seen the same session refused at the same
+        time; only the first logs in, and the others use its new session.
+        """
+        with self._auth_lock:
+            if self._oauth_session is stale:
+                self.authenticate()
+            else:
+                LOGGER.debug(f"{self.username} already re-authenticated by another thread")
 
     def _get_configuration(self) -> None:
         """Retrieve application configuration for TotalConnect REST API."""
@@ -331,7 +656,11 @@ class TotalConnectClient:
             except (KeyError, IndexError, ValueError) as err:
                 raise ServiceUnavailable(f"Unexpected configuration response: {err}") from err
 
-        config = self._request_with_retries(_do_request, f"GET {AUTH_CONFIG_ENDPOINT}")
+        config = self._request_with_retries(
+            _do_request,
+            f"GET {AUTH_CONFIG_ENDPOINT}",
+            endpoint=endpoint_template(AUTH_CONFIG_ENDPOINT),
+        )
 
         try:
             key = config["AppConfig"][0]["tc2APIKey"]
@@ -356,15 +685,19 @@ class TotalConnectClient:
             LOGGER.debug("Session token was auto-refreshed")
 
         self._oauth_client = LegacyApplicationClient(client_id=self._client_id)
-        self._oauth_session = OAuth2Session(
+        session = _SerializedRefreshSession(
+            self._auth_lock,
             client_id=self._client_id,
             client=self._oauth_client,
             auto_refresh_url=AUTH_TOKEN_ENDPOINT,
             auto_refresh_kwargs={"client_id": self._client_id},
             token_updater=token_updater,
         )
+        session.hooks["response"].append(self._record_response)
+        if self._transport is not None:
+            session.mount("https://", self._transport)
         try:
-            self._oauth_session.fetch_token(
+            session.fetch_token(
                 token_url=AUTH_TOKEN_ENDPOINT,
                 username=self._encrypt_credential(self.username),
                 password=self._encrypt_credential(self.password),
@@ -377,38 +710,51 @@ class TotalConnectClient:
                 self._invalid_credentials = True
                 self._logged_in = False
                 raise
+        # published only once it has a token, for requests in other threads
+        self._oauth_session = session
         self._logged_in = True
 
+    def _start_session(self) -> None:
+        """Get the session details and locations, unless already done."""
+        with self._load_lock:
+            if not self._session_pending:
+                return
+            start_time = time.time()
+            self._get_session_details()
+            self._session_pending = False
+            self.metrics.record_timing("session details", time.time() - start_time)
+
     def _get_session_details(self) -> None:
         """Load session and location details.  This could take a long time."""
-        response = self.http_request(
-            endpoint=HTTP_API_SESSION_DETAILS_ENDPOINT,
-            method="GET",
-            params={"appId": self._app_id, "appVersion": self._app_version},
-        )["SessionDetailsResult"]
+        with self.tracer.start_as_current_span("total_connect.session_details"):
+            response = self.http_request(
+                endpoint=HTTP_API_SESSION_DETAILS_ENDPOINT,
+                method="GET",
+                params={"appId": self._app_id, "appVersion": self._app_version},
+            )
+            details = parse_response(response, SESSION_DETAILS_RESPONSE.parse).session_details
 
-        self._module_flags = dict(x.split("=") for x in response["ModuleFlags"].split(","))
-        self._user = TotalConnectUser(response["UserInfo"])
+            self._module_flags = parse_flags(details.module_flags)
+            self._user = TotalConnectUser(details.user_info)
 
-        self._make_locations(response)
+            self._make_locations(details.locations or [])
         if not self._locations:
-            raise TotalConnectError("no locations found", response)
+            raise TotalConnectError("no locations found", response["SessionDetailsResult"])
 
     def load_details(self, retries: int = 5) -> None:
         """Load details for all locations."""
         retry = False
-        for location_id, location in self._locations.items():
-            if not self._location_details[location_id]:
-                try:
-                    location.get_partition_details()
-                    location.get_zone_details()
-                    location.get_panel_meta_data()
-                    self._location_details[location_id] = True
-                except Exception:
-                    LOGGER.debug(
-                        f"exception during initial fetch of {location_id}: retries remaining {retries}"
-                    )
-                    retry = True
+        locations = self.locations
+        with self.tracer.start_as_current_span("total_connect.load_details"):
+            for location_id in locations:
+                if not self._location_details[location_id]:
+                    try:
+                        self._load_location(location_id)
+                    except Exception:
+                        LOGGER.debug(
+                            f"exception during initial fetch of {location_id}: retries remaining {retries}"
+                        )
+                        retry = True
 
         if retry:
             if retries > 0:
@@ -416,6 +762,106 @@ class TotalConnectClient:
             else:
                 LOGGER.warning("Could not load details for all locations.")
 
+    def _load_location(self, location_id: int) -> None:
+        """Load the partitions, zones and status of a location, unless already done.
+
+        The three requests are sent at once, and the responses are applied
+        in order: zones and status refer to the partitions. The location's
+        own partitions and zones can be read while it loads.
+        """
+        with self._load_lock:
+            if self._location_details[location_id] or location_id in self._loading:
+                return
+            location = self._locations[location_id]
+            self._loading.add(location_id)
+            try:
+                with (
+                    self.tracer.start_as_current_span(
+                        "total_connect.load_location",
+                        attributes={ATTR_LOCATION_ID: location_id},
+                    ),
+                    ThreadPoolExecutor(2, f"total-connect-load-{location_id}") as executor,
+                ):
+                    # copy the context so spans in the workers nest in this one
+                    zones = executor.submit(
+                        contextvars.copy_context().run, self._fetch_zone_details, location_id
+                    )
+                    status = executor.submit(
+                        contextvars.copy_context().run, location._fetch_panel_meta_data
+                    )
+                    location._apply_partition_details(location._fetch_partition_details())
+                    location._apply_zone_details(zones.result())
+                    location._apply_panel_meta_data(status.result())
+                    location._publish_snapshot()
+            except Exception:
+                # the status may have been fetched but not applied; the next
+                # load must apply it rather than skip it as unchanged
+                location._forget_panel_status()
+                raise
+            finally:
+                self._loading.discard(location_id)
+            self._location_details[location_id] = True
+            location._details_pending = False
+
+    def _fetch_zone_details(self, location_id: int) -> dict[str, Any]:
+        """Request the zone details of a location once its warm-up is done."""
+        self._finish_warm_up(location_id)
+        return self._locations[location_id]._fetch_zone_details()
+
+    def _load_location_on_access(self, location_id: int) -> None:
+        """Load a location of a lazy client the first time its details are read."""
+        start_time = time.time()
+        with self._load_lock:
+            if self._location_details[location_id] or location_id in self._loading:
+                return
+            self._start_warm_ups(location_id)
+            self._load_location(location_id)
+        self.metrics.record_timing("load_location", time.time() - start_time)
+
+    def _start_warm_ups(self, only: int | None = None) -> None:
+        """Send the first zone details request of each location in the background.
+
+        It fails with CONNECTION_ERROR the first time, every time (see
+        docs/REST_NOTES.md). Sending it while the partition details load
+        means the real request later succeeds at once. If only is given,
+        just for that location.
+        """
+        for location_id, location in self._locations.items():
+            if only is not None and location_id != only:
+                continue
+            if not self._location_details[location_id] and location_id not in self._warm_ups:
+                thread = threading.Thread(
+                    target=self._warm_up,
+                    args=(location.zone_details_endpoint,),
+                    name=f"total-connect-warm-up-{location_id}",
+                    daemon=True,
+                )
+                self._warm_ups[location_id] = thread
+                thread.start()
+
+    def _warm_up(self, endpoint: str) -> None:
+        """Send one request to endpoint and ignore the outcome, but for rate limiting."""
+        try:
+            if self._oauth_session is None:
+                return
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(endpoint)
+            response = self._oauth_session.get(endpoint, timeout=self.TIMEOUT)
+            if self.rate_limiter is not None:
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    self.rate_limiter.throttled(endpoint, retry_after)
+                else:
+                    self.rate_limiter.succeeded(endpoint)
+        except Exception as err:  # the real request will be retried if needed
+            LOGGER.debug(f"warm-up request to {endpoint} failed: {err}")
+
+    def _finish_warm_up(self, location_id: int) -> None:
+        """Wait for the warm-up request of a location, if it has one."""
+        thread = self._warm_ups.pop(location_id, None)
+        if thread is not None:
+            thread.join(self.TIMEOUT)
+
     def is_logged_in(self) -> bool:
         """Return true if the client is logged in to Total Connect."""
         return self._logged_in
@@ -443,13 +889,25 @@ class TotalConnectClient:
         """
         return len(self.locations)
 
-    def _make_locations(self, response: dict[str, Any]) -> None:
+    def get_zone_table(self) -> ZoneTable:
+        """Return a ZoneTable with the zones of every location.
+
+        Rows carry their location ID, so use ZoneTable.keys_with_status()
+        to identify zones across locations.
+        """
+        return ZoneTable.from_tables(
+            location.get_zone_table() for location in self.locations.values()
+        )
+
+    def _make_locations(self, locations: list[dict[str, Any]]) -> None:
         """Create dict mapping LocationID to TotalConnectLocation."""
-        for locationinfo in response.get("Locations") or []:
+        for locationinfo in locations:
             location_id = locationinfo["LocationID"]
             location = TotalConnectLocation(locationinfo, self)
 
             location.auto_bypass_low_battery = self.auto_bypass_low_battery
+            location.zone_transitions = self.zone_transitions
+            location.tracer = self.tracer
 
             # set the usercode for the location
             usercode = (
@@ -463,6 +921,7 @@ class TotalConnectClient:
                 LOGGER.debug(f"no usercode for location {location_id}")
                 location.usercode = DEFAULT_USERCODE
 
+            location._details_pending = self.lazy
             self._locations[location_id] = location
             self._location_details[location_id] = False
 
@@ -1,7 +1,9 @@
 """Total Connect Client constants."""
 
+import re
 import urllib.parse
-from enum import Enum
+from enum import Enum, IntFlag
+from functools import lru_cache
 from typing import Any, Final
 
 from .exceptions import BadResultCodeError
@@ -53,96 +55,164 @@ class ArmingState(Enum):
 
     UNKNOWN = 0
 
+    # bitmask of ArmingCategory values, set for each member below the class
+    _categories: int
+
+    @property
+    def categories(self) -> "ArmingCategory":
+        """Return the categories this state belongs to."""
+        return ArmingCategory(self._categories)
+
+    def in_category(self, category: "ArmingCategory") -> bool:
+        """Return True if the state is in any of the given categories."""
+        return self._categories & category.value != 0
+
     def is_arming(self) -> bool:
         """Return true if the system is in the process of arming."""
-        return self == ArmingState.ARMING
+        return self._categories & _ARMING != 0
 
     def is_disarming(self) -> bool:
         """Return true if the system is in the process of disarming."""
-        return self == ArmingState.DISARMING
+        return self._categories & _DISARMING != 0
 
     def is_pending(self) -> bool:
         """Return true if the system is pending an action."""
-        return self.is_disarming() or self.is_arming()
+        return self._categories & _PENDING != 0
 
     def is_disarmed(self) -> bool:
         """Return True if the system is disarmed."""
-        return self in (
-            ArmingState.DISARMED,
-            ArmingState.DISARMED_BYPASS,
-            ArmingState.DISARMED_ZONE_FAULTED,
-        )
+        return self._categories & _DISARMED != 0
 
     def is_armed_away(self) -> bool:
         """Return True if the system is armed away in any way."""
-        return self in (
-            ArmingState.ARMED_AWAY,
-            ArmingState.ARMED_AWAY_BYPASS,
-            ArmingState.ARMED_AWAY_INSTANT,
-            ArmingState.ARMED_AWAY_INSTANT_BYPASS,
-        )
+        return self._categories & _ARMED_AWAY != 0
 
     def is_armed_custom_bypass(self) -> bool:
         """Return True if the system is armed custom bypass in any way."""
-        return self == ArmingState.ARMED_CUSTOM_BYPASS
+        return self._categories & _ARMED_CUSTOM_BYPASS != 0
 
     def is_armed_home(self) -> bool:
         """Return True if the system is armed home/stay in any way."""
-        return self in (
-            ArmingState.ARMED_STAY,
-            ArmingState.ARMED_STAY_PROA7,
-            ArmingState.ARMED_STAY_BYPASS,
-            ArmingState.ARMED_STAY_BYPASS_PROA7,
-            ArmingState.ARMED_STAY_INSTANT,
-            ArmingState.ARMED_STAY_INSTANT_PROA7,
-            ArmingState.ARMED_STAY_INSTANT_BYPASS,
-            ArmingState.ARMED_STAY_INSTANT_BYPASS_PROA7,
-            ArmingState.ARMED_STAY_NIGHT,
-            ArmingState.ARMED_STAY_NIGHT_BYPASS_PROA7,
-            ArmingState.ARMED_STAY_NIGHT_INSTANT_PROA7,
-            ArmingState.ARMED_STAY_NIGHT_INSTANT_BYPASS_PROA7,
-            ArmingState.ARMED_STAY_OTHER,
-        )
+        return self._categories & _ARMED_HOME != 0
 
     def is_armed_night(self) -> bool:
         """Return True if the system is armed night in any way."""
-        return self in (
-            ArmingState.ARMED_STAY_NIGHT,
-            ArmingState.ARMED_STAY_NIGHT_BYPASS_PROA7,
-            ArmingState.ARMED_STAY_NIGHT_INSTANT_PROA7,
-            ArmingState.ARMED_STAY_NIGHT_INSTANT_BYPASS_PROA7,
-            # per #240 STAY_INSTANT and STAY_INSTANT_BYPASS are actually Night
-            ArmingState.ARMED_STAY_INSTANT,
-            ArmingState.ARMED_STAY_INSTANT_BYPASS,
-        )
+        return self._categories & _ARMED_NIGHT != 0
 
     def is_armed(self) -> bool:
         """Return True if the system is armed in any way."""
-        return (
-            self.is_armed_away()
-            or self.is_armed_home()
-            or self.is_armed_night()  # noqa: W504
-            or self.is_armed_custom_bypass()
-        )
+        return self._categories & _ARMED != 0
 
     def is_triggered_police(self) -> bool:
         """Return True if the system is triggered for police or medical."""
-        return self == ArmingState.ALARMING
+        return self._categories & _TRIGGERED_POLICE != 0
 
     def is_triggered_fire(self) -> bool:
         """Return True if the system is triggered for fire or smoke."""
-        return self == ArmingState.ALARMING_FIRE_SMOKE
+        return self._categories & _TRIGGERED_FIRE != 0
 
     def is_triggered_gas(self) -> bool:
         """Return True if the system is triggered for carbon monoxide."""
-        return self in (
-            ArmingState.ALARMING_CARBON_MONOXIDE,
-            ArmingState.ALARMING_CARBON_MONOXIDE_PROA7,
-        )
+        return self._categories & _TRIGGERED_GAS != 0
 
     def is_triggered(self) -> bool:
         """Return True if the system is triggered in any way."""
-        return self.is_triggered_fire() or self.is_triggered_gas() or self.is_triggered_police()
+        return self._categories & _TRIGGERED != 0
+
+
+class ArmingCategory(IntFlag):
+    """Categories of ArmingState, used by the ArmingState predicates.
+
+    A state can be in more than one category, e.g. ARMED_STAY_NIGHT is
+    both ARMED_HOME and ARMED_NIGHT.
+    """
+
+    NONE = 0
+    DISARMED = 1
+    ARMED_AWAY = 2
+    ARMED_HOME = 4
+    ARMED_NIGHT = 8
+    ARMED_CUSTOM_BYPASS = 16
+    TRIGGERED_POLICE = 32
+    TRIGGERED_FIRE = 64
+    TRIGGERED_GAS = 128
+    ARMING = 256
+    DISARMING = 512
+
+    ARMED = ARMED_AWAY | ARMED_HOME | ARMED_NIGHT | ARMED_CUSTOM_BYPASS
+    TRIGGERED = TRIGGERED_POLICE | TRIGGERED_FIRE | TRIGGERED_GAS
+    PENDING = ARMING | DISARMING
+
+
+ARMING_STATE_CATEGORIES: Final[dict[ArmingCategory, tuple[ArmingState, ...]]] = {
+    ArmingCategory.DISARMED: (
+        ArmingState.DISARMED,
+        ArmingState.DISARMED_BYPASS,
+        ArmingState.DISARMED_ZONE_FAULTED,
+    ),
+    ArmingCategory.ARMED_AWAY: (
+        ArmingState.ARMED_AWAY,
+        ArmingState.ARMED_AWAY_BYPASS,
+        ArmingState.ARMED_AWAY_INSTANT,
+        ArmingState.ARMED_AWAY_INSTANT_BYPASS,
+    ),
+    ArmingCategory.ARMED_HOME: (
+        ArmingState.ARMED_STAY,
+        ArmingState.ARMED_STAY_PROA7,
+        ArmingState.ARMED_STAY_BYPASS,
+        ArmingState.ARMED_STAY_BYPASS_PROA7,
+        ArmingState.ARMED_STAY_INSTANT,
+        ArmingState.ARMED_STAY_INSTANT_PROA7,
+        ArmingState.ARMED_STAY_INSTANT_BYPASS,
+        ArmingState.ARMED_STAY_INSTANT_BYPASS_PROA7,
+        ArmingState.ARMED_STAY_NIGHT,
+        ArmingState.ARMED_STAY_NIGHT_BYPASS_PROA7,
+        ArmingState.ARMED_STAY_NIGHT_INSTANT_PROA7,
+        ArmingState.ARMED_STAY_NIGHT_INSTANT_BYPASS_PROA7,
+        ArmingState.ARMED_STAY_OTHER,
+    ),
+    ArmingCategory.ARMED_NIGHT: (
+        ArmingState.ARMED_STAY_NIGHT,
+        ArmingState.ARMED_STAY_NIGHT_BYPASS_PROA7,
+        ArmingState.ARMED_STAY_NIGHT_INSTANT_PROA7,
+        ArmingState.ARMED_STAY_NIGHT_INSTANT_BYPASS_PROA7,
+        # per #240 STAY_INSTANT and STAY_INSTANT_BYPASS are actually Night
+        ArmingState.ARMED_STAY_INSTANT,
+        ArmingState.ARMED_STAY_INSTANT_BYPASS,
+    ),
+    ArmingCategory.ARMED_CUSTOM_BYPASS: (ArmingState.ARMED_CUSTOM_BYPASS,),
+    ArmingCategory.TRIGGERED_POLICE: (ArmingState.ALARMING,),
+    ArmingCategory.TRIGGERED_FIRE: (ArmingState.ALARMING_FIRE_SMOKE,),
+    ArmingCategory.TRIGGERED_GAS: (
+        ArmingState.ALARMING_CARBON_MONOXIDE,
+        ArmingState.ALARMING_CARBON_MONOXIDE_PROA7,
+    ),
+    ArmingCategory.ARMING: (ArmingState.ARMING,),
+    ArmingCategory.DISARMING: (ArmingState.DISARMING,),
+}
+
+# compile the table into a bitmask on each member, so the predicates are a bit test
+for _state in ArmingState:
+    _state._categories = 0
+for _category, _states in ARMING_STATE_CATEGORIES.items():
+    for _state in _states:
+        _state._categories |= _category.value
+del _state, _category, _states
+
+# plain ints, because a bit test against an IntFlag member is much slower
+_DISARMED: Final[int] = ArmingCategory.DISARMED.value
+_ARMED_AWAY: Final[int] = ArmingCategory.ARMED_AWAY.value
+_ARMED_HOME: Final[int] = ArmingCategory.ARMED_HOME.value
+_ARMED_NIGHT: Final[int] = ArmingCategory.ARMED_NIGHT.value
+_ARMED_CUSTOM_BYPASS: Final[int] = ArmingCategory.ARMED_CUSTOM_BYPASS.value
+_ARMED: Final[int] = ArmingCategory.ARMED.value
+_TRIGGERED_POLICE: Final[int] = ArmingCategory.TRIGGERED_POLICE.value
+_TRIGGERED_FIRE: Final[int] = ArmingCategory.TRIGGERED_FIRE.value
+_TRIGGERED_GAS: Final[int] = ArmingCategory.TRIGGERED_GAS.value
+_TRIGGERED: Final[int] = ArmingCategory.TRIGGERED.value
+_ARMING: Final[int] = ArmingCategory.ARMING.value
+_DISARMING: Final[int] = ArmingCategory.DISARMING.value
+_PENDING: Final[int] = ArmingCategory.PENDING.value
 
 
 class _ResultCode(Enum):
@@ -213,7 +283,28 @@ def make_http_endpoint(path: str) -> str:
     return urllib.parse.urljoin(HTTP_API_ENDPOINT_BASE, path)
 
 
+_HTTP_API_PATH: Final[str] = urllib.parse.urlsplit(HTTP_API_ENDPOINT_BASE).path
+_NUMERIC_SEGMENT: Final = re.compile(r"(?<=/)\d+(?=/|$)")
+
+
+@lru_cache(maxsize=256)
+def endpoint_template(url: str) -> str:
+    """Return the path of an endpoint URL with its numeric IDs replaced by {id}.
+
+    For example, the fullStatus URL of any location gives
+    'api/v3/locations/{id}/partitions/fullStatus'. Use it to group
+    requests to the same endpoint, e.g. in metrics.
+    """
+    path = urllib.parse.urlsplit(url).path
+    if path.startswith(_HTTP_API_PATH):
+        path = path[len(_HTTP_API_PATH) - 1 :]
+    return _NUMERIC_SEGMENT.sub("{id}", path).lstrip("/")
+
+
 HTTP_API_SESSION_DETAILS_ENDPOINT: Final[str] = make_http_endpoint(
     "api/v3/authentication/sessiondetails"
 )
 HTTP_API_LOGOUT: Final[str] = make_http_endpoint("api/v3/authentication/logout")
+
+# from SignalrHubUrl in the interfaceSchema config (see docs/REST_NOTES.md)
+SIGNALR_HUB_URL: Final[str] = "https://rs.alarmnet.com/TC2HubService/SignalRHub"
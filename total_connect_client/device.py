@@ -4,6 +4,7 @@ import logging
 from typing import Any, Final
 
 from .const import PROJECT_URL
+from .flags import FlagTable, parse_flags
 
 LOGGER: Final = logging.getLogger(__name__)
 
@@ -40,14 +41,8 @@ class TotalConnectDevice:
         self._video_info: dict[str, Any] = {}
         self._unicorn_info: dict[str, Any] = {}
 
-        flags = info.get("DeviceFlags")
-        if not flags:
-            self.flags = {}
-        else:
-            self.flags = dict(x.split("=") for x in flags.split(","))
-
-        self._panel_type: int = int(self.flags.get("PanelType", 0))
-        self._panel_variant: int = int(self.flags.get("PanelVariant", 0))
+        # shared with other devices and parsed on first access
+        self.flags: FlagTable = parse_flags(info.get("DeviceFlags"))
 
     def __str__(self) -> str:  # pragma: no cover
         """Return a string that is printable."""
@@ -124,6 +119,19 @@ class TotalConnectDevice:
         if data:
             self._unicorn_info = data
 
+    @property
+    def _panel_type(self) -> int:
+        return int(self.flags.get("PanelType", 0))
+
+    @property
+    def _panel_variant(self) -> int:
+        return int(self.flags.get("PanelVariant", 0))
+
+    @property
+    def model_key(self) -> tuple[int, int, int]:
+        """Return the (DeviceClassID, PanelType, PanelVariant) key used by MODEL_LOOKUP."""
+        return (self.class_id, self._panel_type, self._panel_variant)
+
     def model_info(self) -> tuple[str, str]:
         """Return device model and ID.
 
@@ -132,7 +140,7 @@ class TotalConnectDevice:
 
         """
         try:
-            model, model_id = MODEL_LOOKUP[(self.class_id, self._panel_type, self._panel_variant)]
+            model, model_id = MODEL_LOOKUP[self.model_key]
         except KeyError:
             LOGGER.warning(
                 f"Unknown TotalConnect model info: (DeviceClassID {self.class_id}, "
@@ -36,6 +36,10 @@ class PartialResponseError(RetryableTotalConnectError):
     """
 
 
+class RateLimitedError(RetryableTotalConnectError):
+    """The service answered 429 Too Many Requests."""
+
+
 class UsercodeInvalid(TotalConnectError):
     """The provided usercode is invalid."""
 
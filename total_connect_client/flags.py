@@ -0,0 +1,82 @@
+"""Parsing of Total Connect flag strings.
+
+Several API objects describe features as a "key=value,key=value" string:
+ModuleFlags and UserFeatureList in the session details, and
+LocationModuleFlags and DeviceFlags for each location and device.
+Many of these strings are long and identical across devices and
+accounts, and most of their entries are never read.
+
+parse_flags() returns a read-only FlagTable that is parsed on first
+access and shared by every object with the same flag string.
+"""
+
+import sys
+from collections.abc import Iterator, Mapping
+from functools import lru_cache
+from typing import Final
+
+# distinct flag strings remembered by parse_flags()
+MAX_SHARED_FLAG_TABLES: Final[int] = 4096
+
+
+class FlagTable(Mapping[str, str]):
+    """Read-only mapping of flag names to values, parsed lazily.
+
+    Do not create instances of this class yourself; use parse_flags().
+    """
+
+    __slots__ = ("_raw", "_parsed")
+
+    def __init__(self, raw: str) -> None:
+        """Initialize from the raw flag string, without parsing it."""
+        self._raw: str = raw
+        self._parsed: dict[str, str] | None = None
+
+    @property
+    def raw(self) -> str:
+        """Return the flag string as received from the API."""
+        return self._raw
+
+    def _table(self) -> dict[str, str]:
+        if self._parsed is None:
+            self._parsed = _parse(self._raw)
+        return self._parsed
+
+    def __getitem__(self, key: str) -> str:
+        """Return the value of a flag."""
+        return self._table()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the flag names."""
+        return iter(self._table())
+
+    def __len__(self) -> int:
+        """Return the number of flags."""
+        return len(self._table())
+
+    def __repr__(self) -> str:
+        """Return a representation of the flags."""
+        return f"FlagTable({self._raw!r})"
+
+
+@lru_cache(maxsize=MAX_SHARED_FLAG_TABLES)
+def parse_flags(raw: str | None) -> FlagTable:
+    """Return the FlagTable for a "key=value,key=value" string.
+
+    Identical strings share one FlagTable, so each distinct string is
+    parsed at most once. None or an empty string gives an empty table.
+    """
+    return FlagTable(raw or "")
+
+
+def _parse(raw: str) -> dict[str, str]:
+    """Parse a flag string, interning names and values.
+
+    Entries with an empty name are skipped. A value may contain '='.
+    """
+    table: dict[str, str] = {}
+    for entry in raw.split(","):
+        key, _, value = entry.partition("=")
+        if key:
+            table[sys.intern(key)] = sys.intern(value)
+    return table
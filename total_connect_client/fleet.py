@@ -0,0 +1,382 @@
+"""Many Total Connect accounts in one process.
+
+TotalConnectFleet polls any number of accounts with a fixed pool of
+worker threads instead of a thread and sleep loop per client:
+
+    fleet = TotalConnectFleet(poll_interval=30, workers=16)
+    for username, password, usercodes in accounts:
+        fleet.add_account(username, password, usercodes)
+    with fleet:
+        while True:
+            event = fleet.get_event()
+            ...
+
+The accounts share one transport (so one connection pool), one metrics
+sink, one RetryBudget (see retry.py) and one HostRateLimits, and each
+has a RateLimiter of account_rate requests per second (see
+ratelimit.py). Their clients are lazy and
+skip unchanged panel status, so an idle account costs a small client
+object and one fullStatus request per poll, with no decoding when
+nothing changed. A scheduler thread hands each account to a worker when
+its poll is due; an account is never polled by two workers at once.
+
+Logins are limited to max_logins at a time, so starting thousands of
+accounts does not log them all in together. FleetAccount.refresh() asks
+for an early poll, but no account is polled more often than every
+min_poll_interval seconds.
+
+Changes of location arming state and zone status seen by any poll are
+put on one queue as FleetEvents, as are errors. The first poll of an
+account loads it and reports no changes.
+"""
+
+import heapq
+import logging
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Final
+
+import requests.adapters
+
+from .client import TotalConnectClient
+from .const import ArmingState
+from .exceptions import TotalConnectError
+from .location import TotalConnectLocation
+from .metrics import InMemorySink, MetricsSink
+from .ratelimit import HostRateLimits, RateLimiter
+from .retry import RetryBudget
+from .zone import ZoneStatus
+
+LOGGER: Final = logging.getLogger(__name__)
+
+EVENT_ARMING_STATE: Final[str] = "arming_state"
+EVENT_ZONE_STATUS: Final[str] = "zone_status"
+EVENT_ERROR: Final[str] = "error"
+
+# arming state and zone statuses of a location, compared between polls
+_LocationState = tuple[ArmingState, dict[int, ZoneStatus]]
+
+
+@dataclass(slots=True)
+class FleetEvent:
+    """A change seen by a poll, or an error.
+
+    For EVENT_ARMING_STATE old and new are ArmingStates; for
+    EVENT_ZONE_STATUS they are the ZoneStatus of zone_id (old is None for
+    a new zone); for EVENT_ERROR new is the exception.
+    """
+
+    kind: str
+    username: str
+    location_id: int | None = None
+    zone_id: int | None = None
+    old: Any = None
+    new: Any = None
+
+
+class FleetAccount:
+    """A handle on one account of a fleet."""
+
+    __slots__ = (
+        "fleet",
+        "username",
+        "_password",
+        "usercodes",
+        "polls",
+        "_client",
+        "_states",
+        "_last_poll",
+        "_schedule_token",
+        "_busy",
+        "_refresh_requested",
+    )
+
+    def __init__(
+        self,
+        fleet: "TotalConnectFleet",
+        username: str,
+        password: str,
+        usercodes: dict[str, str] | None,
+    ) -> None:
+        """Initialize. Nothing is sent until the first poll."""
+        self.fleet: TotalConnectFleet = fleet
+        self.username: str = username
+        self._password: str = password
+        self.usercodes: dict[str, str] | None = usercodes
+        self.polls: int = 0
+        self._client: TotalConnectClient | None = None
+        self._states: dict[int, _LocationState] | None = None
+        self._last_poll: float = float("-inf")
+        self._schedule_token: int = 0
+        self._busy: bool = False
+        self._refresh_requested: bool = False
+
+    def __repr__(self) -> str:
+        """Return a short description, without the password."""
+        return f"<FleetAccount {self.username} polls={self.polls}>"
+
+    @property
+    def client(self) -> TotalConnectClient:
+        """Return the account's client, creating it on first use."""
+        if self._client is None:
+            self._client = self.fleet._make_client(self.username, self._password, self.usercodes)
+        return self._client
+
+    @property
+    def locations(self) -> dict[int, TotalConnectLocation]:
+        """Return the account's locations, logging in if needed."""
+        return self.client.locations
+
+    def refresh(self) -> None:
+        """Poll the account soon, e.g. after arming it."""
+        self.fleet._refresh(self)
+
+
+def _location_state(location: TotalConnectLocation) -> _LocationState:
+    # reading the zones first loads a location that is not loaded yet
+    zones = {zone_id: zone.status for zone_id, zone in location.zones.items()}
+    return location.arming_state, zones
+
+
+class TotalConnectFleet:
+    """Polls many accounts on shared resources and reports their changes.
+
+    Use it as a context manager, or call start() and stop().
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        poll_interval: float = 30.0,
+        workers: int = 8,
+        min_poll_interval: float = 5.0,
+        max_logins: int = 4,
+        retry_budget: RetryBudget | None = None,
+        transport: requests.adapters.BaseAdapter | None = None,
+        metrics: MetricsSink | None = None,
+        retry_delay: int = 6,
+        rate_limits: HostRateLimits | None = None,
+        account_rate: float = 1.0,
+    ) -> None:
+        """Initialize.
+
+        workers is the number of threads that poll. retry_budget defaults to
+        one retry per second with bursts of 20, shared by all accounts.
+        transport defaults to an HTTPAdapter whose connection pool has a
+        connection per worker. retry_delay is passed to each client.
+        rate_limits defaults to 20 requests per second per host, shared by
+        all accounts; each account may also send account_rate requests per
+        second.
+        """
+        self.poll_interval: float = poll_interval
+        self.workers: int = workers
+        self.min_poll_interval: float = min_poll_interval
+        self.retry_budget: RetryBudget = retry_budget or RetryBudget(rate=1.0, burst=20)
+        self.transport: requests.adapters.BaseAdapter = transport or requests.adapters.HTTPAdapter(
+            pool_maxsize=workers,
+            max_retries=requests.adapters.Retry(
+                total=TotalConnectClient.MAX_RETRY_ATTEMPTS,
+                status_forcelist=TotalConnectClient.retry_statuses(rate_limited=True),
+            ),
+        )
+        self.metrics: MetricsSink = InMemorySink() if metrics is None else metrics
+        self.retry_delay: int = retry_delay
+        self.rate_limits: HostRateLimits = rate_limits or HostRateLimits()
+        self.account_rate: float = account_rate
+        self.events: queue.Queue[FleetEvent] = queue.Queue()
+        self.accounts: dict[str, FleetAccount] = {}
+        self._logins = threading.BoundedSemaphore(max_logins)
+        # (due time, sequence, schedule token, account); stale tokens are skipped
+        self._schedule: list[tuple[float, int, int, FleetAccount]] = []
+        self._sequence: int = 0
+        self._condition = threading.Condition()
+        self._stopping: bool = False
+        self._thread: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._random = random.Random()
+
+    def __enter__(self) -> "TotalConnectFleet":
+        """Start polling."""
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop polling."""
+        self.stop()
+
+    def add_account(
+        self, username: str, password: str, usercodes: dict[str, str] | None = None
+    ) -> FleetAccount:
+        """Add an account; its first poll is at a random time within poll_interval."""
+        with self._condition:
+            if username in self.accounts:
+                raise ValueError(f"account {username} is already in the fleet")
+            account = FleetAccount(self, username, password, usercodes)
+            self.accounts[username] = account
+            self._push(account, time.monotonic() + self._random.uniform(0, self.poll_interval))
+        return account
+
+    def remove_account(self, username: str) -> None:
+        """Stop polling an account."""
+        with self._condition:
+            account = self.accounts.pop(username)
+            account._schedule_token += 1
+
+    def get_event(self, timeout: float | None = None) -> FleetEvent | None:
+        """Return the next event, or None if there is none within timeout seconds."""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def start(self) -> "TotalConnectFleet":
+        """Start the scheduler and the workers."""
+        if self._thread is not None:
+            raise RuntimeError("fleet is already running")
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(self.workers, "total-connect-fleet")
+        self._thread = threading.Thread(
+            target=self._run, name="total-connect-fleet-scheduler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop scheduling polls and wait for the polls in progress.
+
+        Polls that were due but not started are made when the fleet starts again.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        with self._condition:
+            # the polls still busy were cancelled: schedule them for the next start
+            now = time.monotonic()
+            for account in self.accounts.values():
+                if account._busy:
+                    account._busy = False
+                    self._push(account, now)
+
+    def poll(self, account: FleetAccount) -> list[FleetEvent]:
+        """Poll one account now, in this thread, and return and queue its events."""
+        events: list[FleetEvent] = []
+        try:
+            if account._states is None:
+                with self._logins:
+                    account._states = {
+                        location_id: _location_state(location)
+                        for location_id, location in account.locations.items()
+                    }
+            else:
+                for location_id, location in account.locations.items():
+                    location.get_panel_meta_data()
+                    state = _location_state(location)
+                    old = account._states.get(location_id)
+                    if old is not None:
+                        events.extend(_changes(account.username, location_id, old, state))
+                    account._states[location_id] = state
+        except TotalConnectError as err:
+            LOGGER.warning(f"polling {account.username} failed: {err}")
+            events.append(FleetEvent(EVENT_ERROR, account.username, new=err))
+        account.polls += 1
+        for event in events:
+            self.events.put(event)
+        return events
+
+    def _make_client(
+        self, username: str, password: str, usercodes: dict[str, str] | None
+    ) -> TotalConnectClient:
+        return TotalConnectClient(
+            username,
+            password,
+            usercodes,
+            retry_delay=self.retry_delay,
+            transport=self.transport,
+            metrics=self.metrics,
+            skip_unchanged=True,
+            lazy=True,
+            retry_budget=self.retry_budget,
+            rate_limiter=RateLimiter(self.account_rate, hosts=self.rate_limits),
+        )
+
+    def _push(self, account: FleetAccount, due: float) -> None:
+        """Schedule the next poll of account; call with the condition held."""
+        account._schedule_token += 1
+        self._sequence += 1
+        heapq.heappush(self._schedule, (due, self._sequence, account._schedule_token, account))
+        self._condition.notify()
+
+    def _refresh(self, account: FleetAccount) -> None:
+        with self._condition:
+            if self.accounts.get(account.username) is not account:
+                return
+            if account._busy:
+                account._refresh_requested = True
+            else:
+                self._push(account, account._last_poll + self.min_poll_interval)
+
+    def _run(self) -> None:
+        with self._condition:
+            while not self._stopping:
+                if not self._schedule:
+                    self._condition.wait()
+                    continue
+                due, _, token, account = self._schedule[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._schedule)
+                if token != account._schedule_token or account._busy:
+                    continue
+                account._busy = True
+                assert self._executor is not None
+                self._executor.submit(self._poll_scheduled, account)
+
+    def _poll_scheduled(self, account: FleetAccount) -> None:
+        start = time.monotonic()
+        try:
+            self.poll(account)
+        except Exception:  # keep the worker and the account's schedule alive
+            LOGGER.exception(f"unexpected error polling {account.username}")
+        with self._condition:
+            account._busy = False
+            account._last_poll = start
+            if self.accounts.get(account.username) is not account:
+                return
+            due = start + self.poll_interval
+            if account._refresh_requested:
+                account._refresh_requested = False
+                due = start + self.min_poll_interval
+            self._push(account, due)
+
+
+def _changes(
+    username: str, location_id: int, old: _LocationState, new: _LocationState
+) -> list[FleetEvent]:
+    """Return the events for the changes from old to new state of a location."""
+    events = []
+    if old[0] != new[0]:
+        events.append(FleetEvent(EVENT_ARMING_STATE, username, location_id, None, old[0], new[0]))
+    old_zones = old[1]
+    for zone_id, status in new[1].items():
+        if old_zones.get(zone_id) != status:
+            events.append(
+                FleetEvent(
+                    EVENT_ZONE_STATUS,
+                    username,
+                    location_id,
+                    zone_id,
+                    old_zones.get(zone_id),
+                    status,
+                )
+            )
+    return events
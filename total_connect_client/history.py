@@ -0,0 +1,318 @@
+"""A persistent history of zone and arming state changes.
+
+A HistoryStore given to TotalConnectClient(history=...) records each
+change its locations publish (see snapshot.py) in a SQLite file: zone
+status changes (faults, bypasses, low battery and the rest of the
+ZoneStatus bits), partition arming state changes and location arming
+state changes. The state found when a location is first loaded is not
+a change and is not recorded.
+
+    with HistoryStore("history.db") as history:
+        client = TotalConnectClient(username, password, history=history)
+        ...
+        history.events(location_id, zone_id=3, start=time.time() - 86400)
+
+Recording only puts the changes on a queue, so polling never waits on
+the disk. A writer thread collects them for up to flush_interval seconds
+or until it has batch_size of them, and inserts each batch in one
+transaction. It also deletes events older than retention seconds every
+prune_interval seconds. Queries open their own connection and see what
+has been written; call flush() first to include what is still queued.
+
+Changes recorded while the writer is not running, or while max_queued
+of them are already waiting for it, are dropped with a warning.
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final
+
+if TYPE_CHECKING:
+    from .snapshot import LocationSnapshot
+
+LOGGER: Final = logging.getLogger(__name__)
+
+EVENT_ZONE_STATUS: Final[str] = "zone_status"
+EVENT_PARTITION_ARMING_STATE: Final[str] = "partition_arming_state"
+EVENT_ARMING_STATE: Final[str] = "arming_state"
+
+_SCHEMA: Final[tuple[str, ...]] = (
+    "CREATE TABLE IF NOT EXISTS events ("
+    " time REAL NOT NULL,"
+    " location_id INTEGER NOT NULL,"
+    " kind TEXT NOT NULL,"
+    " zone_id INTEGER,"
+    " partition_id INTEGER,"
+    " old INTEGER,"
+    " new INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS events_by_location ON events (location_id, time)",
+    "CREATE INDEX IF NOT EXISTS events_by_zone ON events (location_id, zone_id, time)",
+    "CREATE INDEX IF NOT EXISTS events_by_time ON events (time)",
+)
+_COLUMNS: Final[str] = "time, location_id, kind, zone_id, partition_id, old, new"
+
+# a write that is still waiting for a lock fails after this many seconds
+_BUSY_TIMEOUT: Final[float] = 30.0
+
+
+@dataclass(slots=True)
+class HistoryEvent:
+    """A recorded change.
+
+    old and new are the ZoneStatus value of zone_id for EVENT_ZONE_STATUS,
+    or ArmingState values for the arming state of partition_id or of the
+    location.
+    """
+
+    time: float
+    location_id: int
+    kind: str
+    zone_id: int | None
+    partition_id: int | None
+    old: int | None
+    new: int
+
+
+class HistoryStore:
+    """Records changes of locations in SQLite from a writer thread.
+
+    Use it as a context manager, or call start() and close().
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        path: str,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        retention: float | None = 90 * 86400,
+        prune_interval: float = 3600.0,
+        max_queued: int = 100_000,
+    ) -> None:
+        """Initialize and create the tables in the file at path if needed.
+
+        retention is in seconds; None keeps events forever.
+        """
+        self.path: str = path
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.retention: float | None = retention
+        self.prune_interval: float = prune_interval
+        self._queue: queue.Queue[HistoryEvent | None] = queue.Queue(max_queued)
+        self._thread: threading.Thread | None = None
+        # whether a dropped event has been logged since the writer started
+        self._drop_reported: bool = False
+        with self._connect() as connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+        connection.close()
+
+    def __enter__(self) -> "HistoryStore":
+        """Start the writer."""
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Write what is queued and stop the writer."""
+        self.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT)
+
+    def start(self) -> "HistoryStore":
+        """Start the writer thread."""
+        if self._thread is not None:
+            raise RuntimeError("history store is already running")
+        self._drop_reported = False
+        self._thread = threading.Thread(target=self._run, name="total-connect-history", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Write what is queued and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def flush(self) -> None:
+        """Wait until everything recorded so far has been written."""
+        if self._thread is None:
+            raise RuntimeError("history store is not running")
+        self._queue.join()
+
+    def record(self, event: HistoryEvent) -> None:
+        """Queue an event to be written, or drop it if it cannot be."""
+        if self._thread is None:
+            self._drop(event, "the history store is not running")
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._drop(event, f"{self._queue.maxsize} events are waiting to be written")
+
+    def _drop(self, event: HistoryEvent, reason: str) -> None:
+        """Log a dropped event: the first as a warning, the rest for debugging."""
+        if self._drop_reported:
+            LOGGER.debug(f"dropped {event}: {reason}")
+            return
+        LOGGER.warning(f"dropping history events for {self.path}: {reason}")
+        self._drop_reported = True
+
+    def record_changes(self, old: "LocationSnapshot", new: "LocationSnapshot") -> None:
+        """Queue the changes from one snapshot of a location to the next."""
+        now = time.time()
+        location_id = new.location_id
+        if old.arming_state != new.arming_state:
+            self.record(
+                HistoryEvent(
+                    now,
+                    location_id,
+                    EVENT_ARMING_STATE,
+                    None,
+                    None,
+                    old.arming_state.value,
+                    new.arming_state.value,
+                )
+            )
+        if new.partitions is not old.partitions:
+            for partition_id, partition in new.partitions.items():
+                was = old.partitions.get(partition_id)
+                if was is not None and was.arming_state != partition.arming_state:
+                    self.record(
+                        HistoryEvent(
+                            now,
+                            location_id,
+                            EVENT_PARTITION_ARMING_STATE,
+                            None,
+                            partition_id,
+                            was.arming_state.value,
+                            partition.arming_state.value,
+                        )
+                    )
+        if new.zones is old.zones:
+            return
+        for zone_id in new.changed_zones(old):
+            zone_was = old.zones.get(zone_id)
+            status = new.zones[zone_id].status
+            # a zone that is new, or changed in something else, has no status change
+            if zone_was is not None and zone_was.status != status:
+                self.record(
+                    HistoryEvent(
+                        now,
+                        location_id,
+                        EVENT_ZONE_STATUS,
+                        zone_id,
+                        None,
+                        int(zone_was.status),
+                        int(status),
+                    )
+                )
+
+    def events(  # pylint: disable=too-many-arguments
+        self,
+        location_id: int,
+        zone_id: int | None = None,
+        kind: str | None = None,
+        start: float | None = None,
+        end: float | None = None,
+        limit: int | None = None,
+    ) -> list[HistoryEvent]:
+        """Return the events of a location, oldest first.
+
+        zone_id and kind select only those events. start and end are
+        times as from time.time(); start is included and end is not.
+        """
+        where = ["location_id = ?"]
+        args: list[Any] = [location_id]
+        for column, operator, value in (
+            ("zone_id", "=", zone_id),
+            ("kind", "=", kind),
+            ("time", ">=", start),
+            ("time", "<", end),
+        ):
+            if value is not None:
+                where.append(f"{column} {operator} ?")
+                args.append(value)
+        sql = f"SELECT {_COLUMNS} FROM events WHERE {' AND '.join(where)} ORDER BY time, rowid"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        connection = self._connect()
+        try:
+            return [HistoryEvent(*row) for row in connection.execute(sql, args)]
+        finally:
+            connection.close()
+
+    def prune(self, now: float | None = None) -> int:
+        """Delete the events older than retention; return how many were deleted."""
+        if self.retention is None:
+            return 0
+        cutoff = (time.time() if now is None else now) - self.retention
+        connection = self._connect()
+        try:
+            with connection:
+                return connection.execute("DELETE FROM events WHERE time < ?", (cutoff,)).rowcount
+        finally:
+            connection.close()
+
+    def _run(self) -> None:
+        connection = self._connect()
+        next_prune = time.monotonic()
+        try:
+            stopping = False
+            while not stopping:
+                if time.monotonic() >= next_prune:
+                    next_prune = time.monotonic() + self.prune_interval
+                    try:
+                        pruned = self.prune()
+                    except sqlite3.Error as err:
+                        LOGGER.warning(f"pruning history in {self.path} failed: {err}")
+                    else:
+                        if pruned:
+                            LOGGER.debug(f"pruned {pruned} events from {self.path}")
+                batch, stopping = self._next_batch(min(self.flush_interval, self.prune_interval))
+                if batch:
+                    self._write(connection, batch)
+                for _ in range(len(batch) + stopping):
+                    self._queue.task_done()
+        finally:
+            connection.close()
+
+    def _next_batch(self, timeout: float) -> tuple[list[HistoryEvent], bool]:
+        """Wait up to timeout for events; return them and whether close() was called."""
+        batch: list[HistoryEvent] = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < self.batch_size:
+            try:
+                event = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if event is None:
+                return batch, True
+            batch.append(event)
+        return batch, False
+
+    def _write(self, connection: sqlite3.Connection, batch: list[HistoryEvent]) -> None:
+        try:
+            with connection:
+                connection.executemany(
+                    f"INSERT INTO events ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            event.time,
+                            event.location_id,
+                            event.kind,
+                            event.zone_id,
+                            event.partition_id,
+                            event.old,
+                            event.new,
+                        )
+                        for event in batch
+                    ],
+                )
+        except sqlite3.Error as err:
+            LOGGER.error(f"could not write {len(batch)} events to {self.path}: {err}")
@@ -1,18 +1,39 @@
 """Total Connect Location."""
 
 import logging
+from contextlib import AbstractContextManager
 from typing import TYPE_CHECKING, Any, Final
 
-from .const import PROJECT_URL, ArmingState, ArmType, _ResultCode, make_http_endpoint
+from .const import (
+    PROJECT_URL,
+    ArmingCategory,
+    ArmingState,
+    ArmType,
+    _ResultCode,
+    make_http_endpoint,
+)
 from .device import TotalConnectDevice
 from .exceptions import (
     FailedToBypassZone,
     FeatureNotSupportedError,
-    PartialResponseError,
     TotalConnectError,
 )
+from .flags import FlagTable, parse_flags
 from .partition import TotalConnectPartition
-from .zone import TotalConnectZone, ZoneStatus
+from .schema import (
+    FULL_STATUS,
+    PARTITION_STATUS,
+    PARTITIONS_CONFIG,
+    ZONE_DETAILS,
+    FullStatus,
+    PartitionStatus,
+)
+from .snapshot import LocationSnapshot
+from .tracing import ATTR_LOCATION_ID, NO_OP_TRACER, Span, Tracer
+from .transitions import ZoneTransitions
+from .validation import parse_response
+from .zone import PANEL_ZONE_CATEGORIES, TotalConnectZone, ZoneCategory, ZoneStatus, ZoneType
+from .zone_table import ZoneTable
 
 if TYPE_CHECKING:
     from .client import TotalConnectClient
@@ -21,6 +42,14 @@ DEFAULT_USERCODE: Final[str] = "-1"
 
 LOGGER: Final = logging.getLogger(__name__)
 
+# each single-bit ZoneStatus and ZoneCategory gets its own index of zone IDs
+_INDEXED_STATUS_BITS: Final[tuple[int, ...]] = tuple(
+    int(status) for status in ZoneStatus if status and status != ZoneStatus.KNOWN
+)
+_INDEXED_CATEGORY_BITS: Final[tuple[int, ...]] = tuple(
+    category.value for category in ZoneCategory if category
+)
+
 
 class TotalConnectLocation:
     """TotalConnectLocation class."""
@@ -30,9 +59,7 @@ class TotalConnectLocation:
         self.location_id: int = location_info_basic["LocationID"]
         self.location_name: str = location_info_basic["LocationName"]
         self._photo_url: str = location_info_basic["PhotoURL"]
-        self._module_flags: dict[str, str] = dict(
-            x.split("=") for x in location_info_basic["LocationModuleFlags"].split(",")
-        )
+        self._module_flags: FlagTable = parse_flags(location_info_basic["LocationModuleFlags"])
         self.security_device_id: str = location_info_basic["SecurityDeviceID"]
         self.parent: TotalConnectClient = parent
         self.ac_loss: bool | None = None
@@ -41,13 +68,35 @@ class TotalConnectLocation:
         self.last_updated_timestamp_ticks: int | None = None
         self.configuration_sequence_number: int | None = None
         self.arming_state: ArmingState = ArmingState.UNKNOWN
-        self.partitions: dict[int, TotalConnectPartition] = {}
+        self._partitions: dict[int, TotalConnectPartition] = {}
         self._partition_list: list[int] = []
-        self.zones: dict[int, TotalConnectZone] = {}
+        self._zones: dict[int, TotalConnectZone] = {}
+        # set by a lazy client until the partitions and zones are first loaded
+        self._details_pending: bool = False
         self.usercode: str = DEFAULT_USERCODE
         self.auto_bypass_low_battery: bool = False
+        # traces the update steps; set by the client to its tracer
+        self.tracer: Tracer = NO_OP_TRACER
+        # the capacity of each zone's ZoneTransitions; 0 keeps none
+        self.zone_transitions: int = 0
+        # the ticks of the panel status being applied, which stamp zone transitions
+        self._status_ticks: int | None = None
         self._sync_job_id: str | None = None
         self._sync_job_state: int = 0
+        self._zone_table: ZoneTable | None = None
+        # the row of each zone in _zone_table
+        self._zone_table_rows: dict[int, int] = {}
+        # indexes of zone IDs, maintained by _index_zone() as zones update
+        self._indexed_status: dict[int, int] = {}
+        self._zones_by_status: dict[int, set[int]] = {bit: set() for bit in _INDEXED_STATUS_BITS}
+        self._indexed_categories: dict[int, int] = {}
+        self._zones_by_category: dict[int, set[int]] = {
+            bit: set() for bit in _INDEXED_CATEGORY_BITS
+        }
+        self._bypassable_zones: set[int] = set()
+        # published by _publish_snapshot(); zones updated since go in _changed_zones
+        self._snapshot: LocationSnapshot = LocationSnapshot(self.location_id)
+        self._changed_zones: set[int] = set()
 
         dib = location_info_basic.get("DeviceList") or []
         tcdevs = [TotalConnectDevice(d) for d in dib]
@@ -55,6 +104,47 @@ class TotalConnectLocation:
             tcdev.deviceid: tcdev for tcdev in tcdevs if tcdev.deviceid is not None
         }
 
+        panel = self.devices.get(self.security_device_id)
+        self._zone_category_overrides: dict[ZoneType | int, ZoneCategory] | None = (
+            PANEL_ZONE_CATEGORIES.get(panel.model_key) if panel else None
+        )
+
+    @property
+    def partitions(self) -> dict[int, TotalConnectPartition]:
+        """Partitions by partition ID."""
+        self._load_details_on_access()
+        return self._partitions
+
+    @property
+    def zones(self) -> dict[int, TotalConnectZone]:
+        """Zones by zone ID."""
+        self._load_details_on_access()
+        return self._zones
+
+    def _load_details_on_access(self) -> None:
+        """Load the partitions and zones if a lazy client has not yet; see zones."""
+        if self._details_pending:
+            self.parent._load_location_on_access(self.location_id)
+
+    @property
+    def snapshot(self) -> LocationSnapshot:
+        """The state as of the last refresh, which no later update changes.
+
+        Unlike the attributes of the location, a snapshot can be read while
+        another thread refreshes the location. See the snapshot module.
+        """
+        return self._snapshot
+
+    def _publish_snapshot(self) -> None:
+        """Make the current state the snapshot, if it changed, and record the changes."""
+        changed, self._changed_zones = self._changed_zones, set()
+        old = self._snapshot
+        self._snapshot = old.following(self, changed)
+        history = self.parent.history
+        # the first snapshot is the state as loaded, not a change
+        if history is not None and self._snapshot is not old and old.version:
+            history.record_changes(old, self._snapshot)
+
     def __str__(self) -> str:  # pragma: no cover
         """Return a text string that is printable."""
         data = (
@@ -87,28 +177,66 @@ class TotalConnectLocation:
 
         return data + devices + partitions + zones
 
+    @property
+    def full_status_endpoint(self) -> str:
+        """Return the URL of the panel status of this location."""
+        return make_http_endpoint(f"api/v3/locations/{self.location_id}/partitions/fullStatus")
+
     def get_panel_meta_data(self) -> None:
-        """Get all meta data about the alarm panel."""
-        result = self.parent.http_request(
-            endpoint=make_http_endpoint(
-                f"api/v3/locations/{self.location_id}/partitions/fullStatus"
-            ),
-            method="GET",
+        """Get all meta data about the alarm panel.
+
+        If the client skips unchanged responses and the panel status is the
+        same as last time, nothing is updated.
+        """
+        self._apply_panel_meta_data(self._fetch_panel_meta_data())
+        self._publish_snapshot()
+
+    def _fetch_panel_meta_data(self) -> dict[str, Any] | None:
+        """Request the panel status; None if it is unchanged and need not be applied."""
+        return self.parent.http_request(
+            endpoint=self.full_status_endpoint, method="GET", if_changed=self.parent.skip_unchanged
         )
-        self.parent.raise_for_resultcode(result)
 
-        self._update_status(result)
-        self._update_partitions(result["PanelStatus"]["Partitions"])
-        self._update_zones(result["PanelStatus"]["Zones"])
+    def _apply_panel_meta_data(self, result: dict[str, Any] | None) -> None:
+        """Update from the result of _fetch_panel_meta_data()."""
+        if result is None:
+            return
+        try:
+            self.parent.raise_for_resultcode(result)
+
+            status = parse_response(result, FULL_STATUS.parse)
+            self._status_ticks = status.panel_status.last_updated_timestamp_ticks
+            try:
+                self._apply_status(status, result)
+                self._apply_partitions(status.panel_status.partitions)
+                self._update_zones(status.panel_status.zones)
+            finally:
+                self._status_ticks = None
+        except Exception:
+            self.parent.forget_fingerprint(self.full_status_endpoint)
+            raise
+
+    def _forget_panel_status(self) -> None:
+        """Apply the next panel status even if it is unchanged, after a local change."""
+        self.parent.forget_fingerprint(self.full_status_endpoint)
+
+    @property
+    def zone_details_endpoint(self) -> str:
+        """Return the URL of the zone details of this location."""
+        # 0 is the ListIdentifierID, whatever that might be
+        return make_http_endpoint(f"api/v1/locations/{self.location_id}/partitions/zones/0")
 
     def get_zone_details(self) -> None:
         """Get Zone details."""
-        # 0 is the ListIdentifierID, whatever that might be
-        result = self.parent.http_request(
-            endpoint=make_http_endpoint(f"api/v1/locations/{self.location_id}/partitions/zones/0"),
-            method="GET",
-        )
+        self._apply_zone_details(self._fetch_zone_details())
+        self._publish_snapshot()
 
+    def _fetch_zone_details(self) -> dict[str, Any]:
+        """Request the zone details."""
+        return self.parent.http_request(endpoint=self.zone_details_endpoint, method="GET")
+
+    def _apply_zone_details(self, result: dict[str, Any]) -> None:
+        """Update from the result of _fetch_zone_details()."""
         try:
             self.parent.raise_for_resultcode(result)
             self._update_zone_details(result)
@@ -120,12 +248,20 @@ class TotalConnectLocation:
 
     def get_partition_details(self) -> None:
         """Get partition details for this location."""
-        result = self.parent.http_request(
+        self._apply_partition_details(self._fetch_partition_details())
+        self._publish_snapshot()
+
+    def _fetch_partition_details(self) -> dict[str, Any]:
+        """Request the partition details."""
+        return self.parent.http_request(
             endpoint=make_http_endpoint(
                 f"api/v1/locations/{self.location_id}/devices/{self.security_device_id}/partitions/config"
             ),
             method="GET",
         )
+
+    def _apply_partition_details(self, result: dict[str, Any]) -> None:
+        """Create the partitions from the result of _fetch_partition_details()."""
         try:
             self.parent.raise_for_resultcode(result)
         except TotalConnectError:
@@ -138,12 +274,8 @@ class TotalConnectLocation:
             )
             raise
 
-        partition_details = (result or {}).get("Partitions")
-        if not partition_details:
-            raise PartialResponseError("no PartitionDetails", result)
-
         new_partition_list = []
-        for partition in partition_details:
+        for partition in parse_response(result, PARTITIONS_CONFIG.parse).partitions:
             new_partition = TotalConnectPartition(partition, self)
             self.partitions[new_partition.partitionid] = new_partition
             new_partition_list.append(new_partition.partitionid)
@@ -278,15 +410,15 @@ class TotalConnectLocation:
 
     def zone_bypass_all(self) -> None:
         """Bypass all faulted zones."""
+        self._load_details_on_access()
         bypassable_faulted_zones = []
-        for zone_id, zone in self.zones.items():
-            if zone.is_faulted():
-                if not zone.can_be_bypassed:
-                    LOGGER.warning(
-                        f"Zone {zone_id} ({zone.description}) is faulted but cannot be bypassed"
-                    )
-                    continue
-                bypassable_faulted_zones.append(zone_id)
+        for zone_id in sorted(self._zones_by_status[ZoneStatus.FAULT]):
+            if zone_id not in self._bypassable_zones:
+                LOGGER.warning(
+                    f"Zone {zone_id} ({self.zones[zone_id].description}) is faulted but cannot be bypassed"
+                )
+                continue
+            bypassable_faulted_zones.append(zone_id)
 
         self._bypass_zones(bypassable_faulted_zones)
 
@@ -303,7 +435,7 @@ class TotalConnectLocation:
             if not zone:
                 LOGGER.warning(f"Zone {zone_id} not found, skipping bypass")
                 continue
-            if not zone.can_be_bypassed:
+            if zone_id not in self._bypassable_zones:
                 LOGGER.warning(f"Zone {zone_id} ({zone.description}) cannot be bypassed")
                 continue
             valid_zones.append(zone_id)
@@ -333,12 +465,8 @@ class TotalConnectLocation:
 
     def clear_bypass(self) -> None:
         """Clear all bypassed zones."""
-        bypassed_zones = []
-        for zone_id, zone in self.zones.items():
-            if zone.is_bypassed():
-                bypassed_zones.append(zone_id)
-
-        if not bypassed_zones:
+        self._load_details_on_access()
+        if not self._zones_by_status[ZoneStatus.BYPASSED]:
             LOGGER.info("Clear bypass request stopped because no zones are bypassed")
             return
 
@@ -352,6 +480,87 @@ class TotalConnectLocation:
 
         self.parent.raise_for_resultcode(result)
 
+    def zones_with_status(self, mask: ZoneStatus) -> set[int]:
+        """Return IDs of zones with any of the status bits in mask.
+
+        Uses the status indexes, so the cost depends on the number of
+        matching zones rather than the number of zones at the location.
+        """
+        self._load_details_on_access()
+        found: set[int] = set()
+        for bit, zone_ids in self._zones_by_status.items():
+            if mask & bit:
+                found |= zone_ids
+        return found
+
+    def bypassable_zones(self) -> set[int]:
+        """Return IDs of zones that can be bypassed."""
+        self._load_details_on_access()
+        return set(self._bypassable_zones)
+
+    def zones_in_category(self, category: ZoneCategory) -> set[int]:
+        """Return IDs of zones in any of the given categories.
+
+        Like zones_with_status(), this uses indexes rather than a scan.
+        """
+        self._load_details_on_access()
+        found: set[int] = set()
+        for bit, zone_ids in self._zones_by_category.items():
+            if category & bit:
+                found |= zone_ids
+        return found
+
+    def button_zones(self) -> set[int]:
+        """Return IDs of zones that are buttons (see TotalConnectZone.is_type_button)."""
+        return self.zones_in_category(ZoneCategory.BUTTON)
+
+    def security_zones(self) -> set[int]:
+        """Return IDs of security zones (see TotalConnectZone.is_type_security)."""
+        return self.zones_in_category(ZoneCategory.SECURITY)
+
+    def partitions_in_category(self, category: ArmingCategory) -> list[int]:
+        """Return IDs of partitions whose arming state is in any of the given categories."""
+        return [
+            partition_id
+            for partition_id, partition in self.partitions.items()
+            if partition.arming_state.in_category(category)
+        ]
+
+    def _index_zone(self, zone: TotalConnectZone) -> None:
+        """Update the zone indexes after a zone has been created or updated.
+
+        Called by TotalConnectZone, so only changed status bits are touched.
+        """
+        zone_id = zone.zoneid
+        self._changed_zones.add(zone_id)
+        table = self._zone_table
+        if table is not None:
+            row = self._zone_table_rows.get(zone_id)
+            if row is None:
+                self._zone_table_rows[zone_id] = len(table)
+                table.add_zone(self.location_id, zone)
+            else:
+                table.set_zone(row, zone)
+        _reindex(self._zones_by_status, self._indexed_status, zone_id, int(zone.status))
+        _reindex(self._zones_by_category, self._indexed_categories, zone_id, zone._categories)
+        if zone.can_be_bypassed:
+            self._bypassable_zones.add(zone_id)
+        else:
+            self._bypassable_zones.discard(zone_id)
+
+    def get_zone_table(self) -> ZoneTable:
+        """Return a columnar ZoneTable of this location's zones.
+
+        The table is built on first use and then kept up to date in place:
+        the row of a zone is rewritten when it changes. Copy it with
+        ZoneTable.from_tables([table]) to keep the state at one time.
+        """
+        if self._zone_table is None:
+            table = ZoneTable.from_location(self)
+            self._zone_table_rows = {zone_id: row for row, zone_id in enumerate(table.zone_ids)}
+            self._zone_table = table
+        return self._zone_table
+
     def zone_status(self, zone_id: int) -> ZoneStatus:
         """Get status of a zone."""
         zone = self.zones.get(zone_id)
@@ -374,7 +583,8 @@ class TotalConnectLocation:
         ZoneStatusInfoWithPartitionId provides additional info for setting up zones.
         If we used TotalConnectZone._update() it would overwrite missing data with None.
         """
-        zone_info = result["ZoneStatus"]["Zones"]
+        zone_info = parse_response(result, ZONE_DETAILS.parse).zone_status.zones
+        self._zone_table = None
         if not zone_info:
             LOGGER.warning(
                 "No zones found when starting TotalConnect. Try to sync your panel using the TotalConnect app or website."
@@ -382,26 +592,43 @@ class TotalConnectLocation:
             LOGGER.debug(f"_update_zone_details result: {result}")
         else:
             for zonedata in zone_info:
-                self.zones[zonedata["ZoneID"]] = TotalConnectZone(zonedata, self)
+                self.zones[zonedata["ZoneID"]] = self._new_zone(zonedata)
+
+    def _new_zone(self, zonedata: dict[str, Any]) -> TotalConnectZone:
+        """Create a zone, keeping the transitions of the zone it replaces."""
+        old = self._zones.get(zonedata["ZoneID"])
+        transitions = old.transitions if old is not None else None
+        if transitions is None and self.zone_transitions:
+            transitions = ZoneTransitions(self.zone_transitions)
+        return TotalConnectZone(zonedata, self, self._zone_category_overrides, transitions)
+
+    def _span(self, name: str) -> AbstractContextManager[Span]:
+        """Open a span of an update step of this location."""
+        return self.tracer.start_as_current_span(
+            name, attributes={ATTR_LOCATION_ID: self.location_id}
+        )
 
     def _update_status(self, result: dict[str, Any]) -> None:
-        """Update from result."""
-        data = (result or {}).get("PanelStatus")
-        if not data:
-            raise PartialResponseError("no PanelStatus", result)
-
-        self.ac_loss = data.get("IsInACLoss")
-        self.low_battery = data.get("IsInLowBattery")
-        self.cover_tampered = data.get("IsCoverTampered")
-        self.last_updated_timestamp_ticks = data.get("LastUpdatedTimestampTicks")
-        self.configuration_sequence_number = data.get("ConfigurationSequenceNumber")
-
-        # TODO: new resposne structure has a lot more data than we use here
-        # and some fields are provided twice...are we using the right tones?
-
-        astate = result.get("ArmingState")
-        if not astate:
-            raise PartialResponseError("no ArmingState", result)
+        """Update from a fullStatus result."""
+        self._apply_status(parse_response(result, FULL_STATUS.parse), result)
+
+    def _apply_status(self, status: FullStatus, result: dict[str, Any]) -> None:
+        """Update from a parsed fullStatus result."""
+        with self._span("total_connect.update_status"):
+            panel_status = status.panel_status
+            self.ac_loss = panel_status.ac_loss
+            self.low_battery = panel_status.low_battery
+            self.cover_tampered = panel_status.cover_tampered
+            self.last_updated_timestamp_ticks = panel_status.last_updated_timestamp_ticks
+            self.configuration_sequence_number = panel_status.configuration_sequence_number
+
+            # TODO: new resposne structure has a lot more data than we use here
+            # and some fields are provided twice...are we using the right tones?
+
+            self._apply_arming_state(status.arming_state, result)
+
+    def _apply_arming_state(self, astate: int, result: dict[str, Any]) -> None:
+        """Update the location ArmingState; result is logged if it is unknown."""
         try:
             self.arming_state = ArmingState(astate)
         except ValueError:
@@ -412,34 +639,37 @@ class TotalConnectLocation:
 
     def _update_partitions(self, partitions: list[dict[str, Any]]) -> None:
         """Update partition info from Partitions."""
-        # loop through partitions and update
         # NOTE: do not use keys because they don't line up with PartitionID
-        for partition in partitions:
-            if "PartitionID" not in partition:
-                raise PartialResponseError("no PartitionID", partitions)
-            partition_id = int(partition["PartitionID"])
-            if partition_id in self.partitions:
-                self.partitions[partition_id]._update(partition)
-            else:
-                LOGGER.warning(f"Update provided for unknown partion {partition_id}")
+        self._apply_partitions(tuple(map(PARTITION_STATUS.parse, partitions)))
+
+    def _apply_partitions(self, partitions: tuple[PartitionStatus, ...]) -> None:
+        """Update partition info from parsed Partitions."""
+        with self._span("total_connect.update_partitions"):
+            for partition in partitions:
+                partition_id = partition.partition_id
+                if partition_id in self.partitions:
+                    self.partitions[partition_id]._apply(partition)
+                else:
+                    LOGGER.warning(f"Update provided for unknown partion {partition_id}")
 
     def _update_zones(self, zones: list[dict[str, Any]]) -> None:
         """Update zone info from Zones."""
-        if not zones:
-            LOGGER.error("no zones found: sync your panel using TotalConnect app or website")
-            raise TotalConnectError("no zones found: panel sync required")
-
-        for zonedata in zones:
-            zone_id = int(zonedata["ZoneID"])
-            zone = self.zones.get(zone_id)
-            if zone:
-                zone._update(zonedata)
-            else:
-                zone = TotalConnectZone(zonedata, self)
-                self.zones[zone_id] = zone
-
-            if zone.is_low_battery() and zone.can_be_bypassed and self.auto_bypass_low_battery:
-                self.zone_bypass(zone_id)
+        with self._span("total_connect.update_zones"):
+            if not zones:
+                LOGGER.error("no zones found: sync your panel using TotalConnect app or website")
+                raise TotalConnectError("no zones found: panel sync required")
+
+            for zonedata in zones:
+                zone_id = int(zonedata["ZoneID"])
+                zone = self.zones.get(zone_id)
+                if zone:
+                    zone._update(zonedata)
+                else:
+                    zone = self._new_zone(zonedata)
+                    self.zones[zone_id] = zone
+
+                if zone.is_low_battery() and zone.can_be_bypassed and self.auto_bypass_low_battery:
+                    self.zone_bypass(zone_id)
 
     def sync_panel(self) -> None:
         """Syncronize the panel with the TotalConnect server."""
@@ -535,3 +765,20 @@ class TotalConnectLocation:
         LOGGER.debug(f"trigger result:\n{result}")
         self.parent.raise_for_resultcode(result)
         LOGGER.info(f"Triggered alarm at {self.location_id}")
+
+
+def _reindex(index: dict[int, set[int]], indexed: dict[int, int], item: int, bits: int) -> None:
+    """Move item between the per-bit sets of index for the bits that changed.
+
+    indexed holds the bits each item was last indexed with.
+    """
+    changed = bits ^ indexed.get(item, 0)
+    if not changed:
+        return
+    for bit, members in index.items():
+        if changed & bit:
+            if bits & bit:
+                members.add(item)
+            else:
+                members.discard(item)
+    indexed[item] = bits
@@ -0,0 +1,285 @@
+"""Instrumentation for TotalConnectClient.
+
+The client reports what it does to a MetricsSink: every HTTP response,
+the ResultCode of every API response, each retry and its cause, each
+re-authentication, and how long larger steps such as authenticate took.
+
+The default sink, InMemorySink, keeps counters and latency histograms.
+snapshot() returns them as plain data, copy() as another InMemorySink,
+and prometheus_text() formats them in the Prometheus text exposition
+format. To send the data elsewhere, pass your own sink to
+TotalConnectClient(metrics=...).
+
+Endpoints are identified by const.endpoint_template(), so requests for
+different locations are counted together.
+"""
+
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Final, Protocol
+
+# upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS: Final[tuple[float, ...]] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class MetricsSink(Protocol):
+    """Receives instrumentation from TotalConnectClient.
+
+    Methods may be called from several threads, and should be quick since
+    they run inline with requests.
+    """
+
+    def record_request(
+        self,
+        endpoint: str,
+        method: str,
+        status: int,
+        seconds: float,
+        bytes_sent: int,
+        bytes_received: int,
+    ) -> None:
+        """Record an HTTP response."""
+
+    def record_result_code(self, endpoint: str, result_code: int) -> None:
+        """Record the ResultCode of an API response."""
+
+    def record_retry(self, endpoint: str, cause: str) -> None:
+        """Record that a request will be retried; cause is an exception class name."""
+
+    def record_reauthentication(self) -> None:
+        """Record that the client is authenticating again after losing its session."""
+
+    def record_timing(self, name: str, seconds: float) -> None:
+        """Record how long a step of the client took, e.g. 'authenticate'."""
+
+
+class Histogram:
+    """Counts of observed values in the buckets given by their upper bounds."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize an empty histogram; the last bucket is unbounded."""
+        self.bounds: tuple[float, ...] = bounds
+        self.counts: list[int] = [0] * (len(bounds) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        """Add a value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def copy(self) -> "Histogram":
+        """Return a histogram with the same counts."""
+        histogram = Histogram(self.bounds)
+        histogram.counts = self.counts.copy()
+        histogram.sum = self.sum
+        histogram.count = self.count
+        return histogram
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return (upper bound, count of values <= bound), ending with infinity."""
+        result = []
+        total = 0
+        for bound, count in zip((*self.bounds, float("inf")), self.counts, strict=True):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class InMemorySink:
+    """Keeps metrics in memory. This is the default sink."""
+
+    def __init__(self) -> None:
+        """Initialize with no data."""
+        self.requests: Counter[tuple[str, str, int]] = Counter()  # endpoint, method, status
+        self.latency: dict[str, Histogram] = {}
+        self.bytes_sent: Counter[str] = Counter()
+        self.bytes_received: Counter[str] = Counter()
+        self.result_codes: Counter[tuple[str, int]] = Counter()
+        self.retries: Counter[tuple[str, str]] = Counter()  # endpoint, cause
+        self.reauthentications: int = 0
+        self.timings: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record_request(
+        self,
+        endpoint: str,
+        method: str,
+        status: int,
+        seconds: float,
+        bytes_sent: int,
+        bytes_received: int,
+    ) -> None:
+        """Record an HTTP response."""
+        with self._lock:
+            self.requests[(endpoint, method, status)] += 1
+            histogram = self.latency.get(endpoint)
+            if histogram is None:
+                histogram = self.latency[endpoint] = Histogram()
+            histogram.observe(seconds)
+            self.bytes_sent[endpoint] += bytes_sent
+            self.bytes_received[endpoint] += bytes_received
+
+    def record_result_code(self, endpoint: str, result_code: int) -> None:
+        """Record the ResultCode of an API response."""
+        with self._lock:
+            self.result_codes[(endpoint, result_code)] += 1
+
+    def record_retry(self, endpoint: str, cause: str) -> None:
+        """Record that a request will be retried."""
+        with self._lock:
+            self.retries[(endpoint, cause)] += 1
+
+    def record_reauthentication(self) -> None:
+        """Record a re-authentication."""
+        with self._lock:
+            self.reauthentications += 1
+
+    def record_timing(self, name: str, seconds: float) -> None:
+        """Record the duration of a step, replacing any earlier one."""
+        with self._lock:
+            self.timings[name] = seconds
+
+    def copy(self) -> "InMemorySink":
+        """Return a consistent copy of the metrics, which is not updated."""
+        sink = InMemorySink()
+        with self._lock:
+            sink.requests = self.requests.copy()
+            sink.latency = {
+                endpoint: histogram.copy() for endpoint, histogram in self.latency.items()
+            }
+            sink.bytes_sent = self.bytes_sent.copy()
+            sink.bytes_received = self.bytes_received.copy()
+            sink.result_codes = self.result_codes.copy()
+            sink.retries = self.retries.copy()
+            sink.reauthentications = self.reauthentications
+            sink.timings = dict(self.timings)
+        return sink
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a copy of the metrics as plain data, e.g. for JSON.
+
+        Requests are grouped by endpoint; latency buckets are cumulative
+        and keyed by their upper bound.
+        """
+        with self._lock:
+            endpoints: dict[str, dict[str, Any]] = {}
+            for (endpoint, method, status), count in self.requests.items():
+                data = endpoints.setdefault(endpoint, _empty_endpoint())
+                data["requests"] += count
+                data["methods"][method] = data["methods"].get(method, 0) + count
+                data["statuses"][status] = data["statuses"].get(status, 0) + count
+            for endpoint, histogram in self.latency.items():
+                endpoints[endpoint]["latency"] = {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": dict(histogram.cumulative()),
+                }
+                endpoints[endpoint]["bytes_sent"] = self.bytes_sent[endpoint]
+                endpoints[endpoint]["bytes_received"] = self.bytes_received[endpoint]
+            for (endpoint, code), count in self.result_codes.items():
+                endpoints.setdefault(endpoint, _empty_endpoint())["result_codes"][code] = count
+            retries: Counter[str] = Counter()
+            for (endpoint, cause), count in self.retries.items():
+                endpoints.setdefault(endpoint, _empty_endpoint())["retries"][cause] = count
+                retries[cause] += count
+            return {
+                "endpoints": endpoints,
+                "retries": dict(retries),
+                "reauthentications": self.reauthentications,
+                "timings": dict(self.timings),
+            }
+
+
+def _empty_endpoint() -> dict[str, Any]:
+    return {
+        "requests": 0,
+        "methods": {},
+        "statuses": {},
+        "latency": None,
+        "bytes_sent": 0,
+        "bytes_received": 0,
+        "result_codes": {},
+        "retries": {},
+    }
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: object) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def prometheus_text(sink: InMemorySink, prefix: str = "total_connect") -> str:
+    """Return the metrics of sink in the Prometheus text exposition format.
+
+    The metrics are copied first, so they are consistent with each other
+    while requests go on recording.
+    """
+    lines: list[str] = []
+
+    def family(name: str, kind: str, description: str) -> str:
+        full_name = f"{prefix}_{name}"
+        lines.append(f"# HELP {full_name} {description}")
+        lines.append(f"# TYPE {full_name} {kind}")
+        return full_name
+
+    sink = sink.copy()
+    name = family("requests_total", "counter", "HTTP requests by endpoint and status.")
+    for (endpoint, method, status), count in sorted(sink.requests.items()):
+        lines.append(f"{name}{_labels(endpoint=endpoint, method=method, status=status)} {count}")
+
+    name = family("request_duration_seconds", "histogram", "HTTP request latency.")
+    for endpoint, histogram in sorted(sink.latency.items()):
+        for bound, count in histogram.cumulative():
+            labels = _labels(endpoint=endpoint, le=_bound(bound))
+            lines.append(f"{name}_bucket{labels} {count}")
+        lines.append(f"{name}_sum{_labels(endpoint=endpoint)} {histogram.sum!r}")
+        lines.append(f"{name}_count{_labels(endpoint=endpoint)} {histogram.count}")
+
+    name = family("sent_bytes_total", "counter", "Request body bytes sent.")
+    for endpoint, count in sorted(sink.bytes_sent.items()):
+        lines.append(f"{name}{_labels(endpoint=endpoint)} {count}")
+
+    name = family("received_bytes_total", "counter", "Response body bytes received.")
+    for endpoint, count in sorted(sink.bytes_received.items()):
+        lines.append(f"{name}{_labels(endpoint=endpoint)} {count}")
+
+    name = family("result_codes_total", "counter", "API responses by ResultCode.")
+    for (endpoint, code), count in sorted(sink.result_codes.items()):
+        lines.append(f"{name}{_labels(endpoint=endpoint, code=code)} {count}")
+
+    name = family("retries_total", "counter", "Retried requests by cause.")
+    for (endpoint, cause), count in sorted(sink.retries.items()):
+        lines.append(f"{name}{_labels(endpoint=endpoint, cause=cause)} {count}")
+
+    name = family("reauthentications_total", "counter", "Re-authentications.")
+    lines.append(f"{name} {sink.reauthentications}")
+
+    name = family("step_duration_seconds", "gauge", "Duration of the last run of a step.")
+    for step, seconds in sorted(sink.timings.items()):
+        lines.append(f"{name}{_labels(step=step)} {seconds!r}")
+
+    return "\n".join(lines) + "\n"
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Any, Final
 
 from .const import PROJECT_URL, ArmingState, ArmType
 from .exceptions import PartialResponseError, TotalConnectError
+from .schema import PARTITION_DETAILS, PartitionDetails, PartitionStatus
 
 if TYPE_CHECKING:
     from .location import TotalConnectLocation
@@ -15,23 +16,22 @@ LOGGER: Final = logging.getLogger(__name__)
 class TotalConnectPartition:
     """Partition class for Total Connect."""
 
-    def __init__(self, details: dict[str, Any], parent: "TotalConnectLocation"):
-        """Initialize Partition based on PartitionDetails."""
+    def __init__(self, details: dict[str, Any] | PartitionDetails, parent: "TotalConnectLocation"):
+        """Initialize Partition based on PartitionDetails, parsed or not."""
+        if not isinstance(details, PartitionDetails):
+            details = PARTITION_DETAILS.parse(details)
         self.parent: TotalConnectLocation = parent
-        partition_id = details.get("PartitionID")
-        if partition_id is None:
-            raise TotalConnectError("PartitionID is required")
-        self.partitionid: int = partition_id
-        self.name: str | None = details.get("PartitionName")
-        self.is_stay_armed: bool | None = details.get("IsStayArmed")
-        self.is_fire_enabled: bool | None = details.get("IsFireEnabled")
-        self.is_common_enabled: bool | None = details.get("IsCommonEnabled")
-        self.is_locked: bool | None = details.get("IsLocked")
-        self.is_new_partition: bool | None = details.get("IsNewPartition")
-        self.is_night_stay_enabled: bool | None = details.get("IsNightStayEnabled")
-        self.exit_delay_timer: int | None = details.get("ExitDelayTimer")
-        self.arming_state: ArmingState  # Set by _update()
-        self._update(details)
+        self.partitionid: int = details.partition_id
+        self.name: str | None = details.name
+        self.is_stay_armed: bool | None = details.is_stay_armed
+        self.is_fire_enabled: bool | None = details.is_fire_enabled
+        self.is_common_enabled: bool | None = details.is_common_enabled
+        self.is_locked: bool | None = details.is_locked
+        self.is_new_partition: bool | None = details.is_new_partition
+        self.is_night_stay_enabled: bool | None = details.is_night_stay_enabled
+        self.exit_delay_timer: int | None = details.exit_delay_timer
+        self.arming_state: ArmingState  # Set by _apply()
+        self._apply(details)
 
     def __str__(self) -> str:  # pragma: no cover
         """Return a string that is printable."""
@@ -59,6 +59,14 @@ class TotalConnectPartition:
         astate = (info or {}).get("ArmingState")
         if astate is None:
             raise PartialResponseError("no ArmingState")
+        self._apply_arming_state(astate, info)
+
+    def _apply(self, info: PartitionStatus | PartitionDetails) -> None:
+        """Update partition state from parsed partition data."""
+        self._apply_arming_state(info.arming_state, info)
+
+    def _apply_arming_state(self, astate: int, info: object) -> None:
+        """Set the arming state from its raw value."""
         try:
             self.arming_state = ArmingState(astate)
         except ValueError:
@@ -0,0 +1,259 @@
+"""Push updates from the Total Connect SignalR hub.
+
+PushSubscriber keeps a connection to the hub (SIGNALR_HUB_URL, the
+SignalrHubUrl of the interfaceSchema config) in a background thread and
+applies the messages it receives to the client's locations, so state
+changes arrive in well under a second instead of at the next poll:
+
+    with PushSubscriber(client, on_update=refresh_entities):
+        ...
+
+It uses the SignalR long polling transport with the JSON hub protocol,
+over the client's authenticated requests session, so it needs no
+WebSocket library. While the hub cannot be reached it polls every
+location with get_panel_meta_data() every poll_interval seconds and
+tries to connect again every reconnect_delay seconds. Each time it
+connects it polls once, to pick up changes made while it was away.
+
+The hub messages are not documented. The handlers assume invocations
+whose argument has a LocationID and the same zone and partition objects
+as fullStatus (see MESSAGE_HANDLERS); an unrecognized invocation for a
+location triggers a poll of that location. Replace entries of
+PushSubscriber.handlers to map other messages.
+
+Handlers and on_update run on the subscriber's thread. Handlers hold
+the client's lock on loading locations, so a message is not applied
+while the location it changes is being loaded.
+"""
+
+import json
+import logging
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, Final
+
+import requests
+
+from .const import SIGNALR_HUB_URL
+from .exceptions import TotalConnectError
+
+if TYPE_CHECKING:
+    from .client import TotalConnectClient
+    from .location import TotalConnectLocation
+
+LOGGER: Final = logging.getLogger(__name__)
+
+# applies the argument of a hub invocation to its location
+MessageHandler = Callable[["TotalConnectLocation", dict[str, Any]], None]
+
+# SignalR record separator, which ends each message of the JSON hub protocol
+RECORD_SEPARATOR: Final[str] = "\x1e"
+
+_HANDSHAKE: Final[str] = json.dumps({"protocol": "json", "version": 1}) + RECORD_SEPARATOR
+
+# SignalR message types
+_INVOCATION: Final[int] = 1
+_PING: Final[int] = 6
+_CLOSE: Final[int] = 7
+
+
+def _zone_status_changed(location: "TotalConnectLocation", message: dict[str, Any]) -> None:
+    location._update_zones(message["Zones"])
+
+
+def _partition_status_changed(location: "TotalConnectLocation", message: dict[str, Any]) -> None:
+    location._update_partitions(message["Partitions"])
+    if message.get("ArmingState") is not None:
+        location._apply_arming_state(message["ArmingState"], message)
+
+
+MESSAGE_HANDLERS: Final[dict[str, MessageHandler]] = {
+    "ZoneStatusChanged": _zone_status_changed,
+    "PartitionStatusChanged": _partition_status_changed,
+}
+
+
+class _Disconnected(Exception):
+    """The hub ended the connection."""
+
+
+class PushSubscriber:
+    """Applies state pushed by the SignalR hub, polling while it is unavailable.
+
+    Use it as a context manager, or call start() and stop().
+    """
+
+    def __init__(
+        self,
+        client: "TotalConnectClient",
+        hub_url: str = SIGNALR_HUB_URL,
+        poll_interval: float = 30.0,
+        reconnect_delay: float = 5.0,
+        long_poll_timeout: float = 120.0,
+        on_update: Callable[["TotalConnectLocation"], None] | None = None,
+    ) -> None:
+        """Initialize.
+
+        on_update is called with a location after a message or poll has
+        updated it. long_poll_timeout is the read timeout of each poll of
+        the hub, which answers sooner when it has nothing to send.
+        """
+        self.client: TotalConnectClient = client
+        self.hub_url: str = hub_url
+        self.poll_interval: float = poll_interval
+        self.reconnect_delay: float = reconnect_delay
+        self.long_poll_timeout: float = long_poll_timeout
+        self.on_update: Callable[[TotalConnectLocation], None] | None = on_update
+        self.handlers: dict[str, MessageHandler] = dict(MESSAGE_HANDLERS)
+        self.connected: bool = False
+        self._connection_url: str | None = None
+        self._next_poll: float = 0.0
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "PushSubscriber":
+        """Start the subscriber."""
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop the subscriber."""
+        self.stop()
+
+    def start(self) -> "PushSubscriber":
+        """Start receiving updates in a background thread."""
+        if self._thread is not None:
+            raise RuntimeError("push subscriber is already running")
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="total-connect-push", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Close the connection and wait for the background thread to end."""
+        self._stopping.set()
+        url = self._connection_url
+        if url is not None:
+            try:
+                self._session().delete(url, timeout=self.client.TIMEOUT)
+            except (requests.RequestException, TotalConnectError) as err:
+                LOGGER.debug(f"closing the hub connection failed: {err}")
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _session(self) -> requests.Session:
+        session = self.client._oauth_session
+        if session is None:
+            raise TotalConnectError("the client is not authenticated")
+        return session
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._connect()
+                self._receive()
+            except _Disconnected:
+                LOGGER.info("the SignalR hub closed the connection")
+            except (requests.RequestException, TotalConnectError, ValueError) as err:
+                LOGGER.warning(f"push updates unavailable, polling instead: {err}")
+            self.connected = False
+            self._connection_url = None
+            if self._stopping.is_set():
+                break
+            if time.monotonic() >= self._next_poll:
+                self._poll_locations()
+            self._stopping.wait(self.reconnect_delay)
+
+    def _connect(self) -> None:
+        """Negotiate a long polling connection and complete the handshake."""
+        session = self._session()
+        response = session.post(
+            f"{self.hub_url}/negotiate?negotiateVersion=1", timeout=self.client.TIMEOUT
+        )
+        response.raise_for_status()
+        negotiated = response.json()
+        token = negotiated.get("connectionToken") or negotiated.get("connectionId")
+        if not token:
+            raise TotalConnectError(f"SignalR negotiate failed: {negotiated}")
+        url = f"{self.hub_url}?id={urllib.parse.quote(token)}"
+        self._connection_url = url
+        session.post(url, data=_HANDSHAKE, timeout=self.client.TIMEOUT).raise_for_status()
+
+    def _read(self) -> list[dict[str, Any]]:
+        """Wait for the next messages from the hub, which may be none."""
+        assert self._connection_url is not None
+        response = self._session().get(self._connection_url, timeout=self.long_poll_timeout)
+        if response.status_code == 204:
+            raise _Disconnected
+        response.raise_for_status()
+        return [json.loads(frame) for frame in response.text.split(RECORD_SEPARATOR) if frame]
+
+    def _receive(self) -> None:
+        """Apply messages until the connection ends."""
+        while not self._stopping.is_set():
+            for frame in self._read():
+                kind = frame.get("type")
+                if kind is None:
+                    self._handshake_done(frame)
+                elif kind == _INVOCATION:
+                    self._dispatch(frame.get("target"), frame.get("arguments") or [])
+                elif kind == _CLOSE:
+                    raise _Disconnected
+                elif kind != _PING:
+                    LOGGER.debug(f"ignoring SignalR message {frame}")
+
+    def _handshake_done(self, frame: dict[str, Any]) -> None:
+        if frame.get("error"):
+            raise TotalConnectError(f"SignalR handshake failed: {frame['error']}")
+        self._poll_locations()
+        self.connected = True
+        LOGGER.info(f"receiving push updates from {self.hub_url}")
+
+    def _dispatch(self, target: str | None, arguments: list[Any]) -> None:
+        """Apply one invocation to the location it names."""
+        message = arguments[0] if arguments and isinstance(arguments[0], dict) else {}
+        location = self.client.locations.get(message.get("LocationID"))  # type: ignore[arg-type]
+        if location is None:
+            LOGGER.debug(f"ignoring {target} for no known location: {arguments}")
+            return
+        handler = self.handlers.get(target or "")
+        if handler is None:
+            LOGGER.debug(f"polling location {location.location_id} after {target}")
+            self._poll(location)
+            return
+        # loading the location changes the same zones and partitions
+        with self.client._load_lock:
+            try:
+                handler(location, message)
+            except (TotalConnectError, KeyError, TypeError, ValueError) as err:
+                LOGGER.warning(f"cannot apply {target} to location {location.location_id}: {err}")
+                applied = False
+            else:
+                # the next poll may return the status from before this change
+                location._forget_panel_status()
+                location._publish_snapshot()
+                applied = True
+        if not applied:
+            self._poll(location)
+            return
+        self._updated(location)
+
+    def _poll_locations(self) -> None:
+        """Refresh every location from the API."""
+        self._next_poll = time.monotonic() + self.poll_interval
+        for location in list(self.client.locations.values()):
+            self._poll(location)
+
+    def _poll(self, location: "TotalConnectLocation") -> None:
+        try:
+            location.get_panel_meta_data()
+        except TotalConnectError as err:
+            LOGGER.warning(f"polling location {location.location_id} failed: {err}")
+            return
+        self._updated(location)
+
+    def _updated(self, location: "TotalConnectLocation") -> None:
+        if self.on_update is not None:
+            self.on_update(location)
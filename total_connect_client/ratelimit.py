@@ -0,0 +1,169 @@
+"""Client-side rate limiting of API requests.
+
+A RateLimiter passed to TotalConnectClient(rate_limiter=...) makes each
+API request take a token from the account's bucket, and from its host's
+bucket if the limiter has HostRateLimits, which are usually shared by
+every account in a process (see fleet.py). A request that finds a
+bucket empty waits for its turn rather than being sent and rejected.
+
+When the service answers 429 Too Many Requests, the account's bucket
+pauses for its Retry-After (or default_pause seconds if it sends none),
+and the rates of both buckets are cut by the backoff factor. Each later
+success raises them by recovery requests per second, up to the
+configured rates, so the client settles just under the service's limit
+instead of going in and out of it.
+
+A client with a rate limiter also coalesces reads: a GET sent while the
+same GET is already waiting or in flight shares its response.
+"""
+
+import email.utils
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timezone
+from typing import Final
+
+# the rate is never cut below this fraction of the configured rate
+_MIN_RATE_FRACTION: Final[float] = 0.05
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the seconds to wait given by a Retry-After header, or None.
+
+    The header is either a number of seconds or an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """A token bucket whose rate adapts to throttling.
+
+    Tokens can be reserved ahead, so callers wait in the order they came.
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        """Initialize full: burst tokens, refilled at rate per second."""
+        self.max_rate: float = rate
+        self.rate: float = rate
+        self.burst: float = burst
+        self._tokens: float = burst
+        self._updated: float = time.monotonic()
+        self._paused_until: float = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            # tokens are added again once the pause is over
+            wait = max(0.0, self._paused_until - now)
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+            return wait
+
+    def throttle(self, pause: float, backoff: float) -> None:
+        """Stop handing out tokens for pause seconds and cut the rate by backoff."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + pause)
+            self.rate = max(self.max_rate * _MIN_RATE_FRACTION, self.rate * backoff)
+            # tokens saved up before the throttling do not count
+            self._tokens = min(self._tokens, 0.0)
+
+    def recover(self, step: float) -> None:
+        """Raise the rate by step, up to the configured rate."""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + step)
+
+    def _refill(self, now: float) -> None:
+        if now > self._paused_until:
+            start = max(self._updated, self._paused_until)
+            self._tokens = min(self.burst, self._tokens + (now - start) * self.rate)
+        self._updated = now
+
+
+class HostRateLimits:
+    """A TokenBucket per host, to share between RateLimiters."""
+
+    def __init__(self, rate: float = 20.0, burst: float = 40.0) -> None:
+        """Initialize; each host gets rate requests per second with bursts of burst."""
+        self.rate: float = rate
+        self.burst: float = burst
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str) -> TokenBucket:
+        """Return the bucket of a host."""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+
+class RateLimiter:
+    """Paces the requests of one account, and of its hosts if given HostRateLimits."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        rate: float = 1.0,
+        burst: float = 10.0,
+        hosts: HostRateLimits | None = None,
+        backoff: float = 0.5,
+        recovery: float = 0.05,
+        default_pause: float = 5.0,
+    ) -> None:
+        """Initialize.
+
+        rate is requests per second, with bursts of up to burst requests.
+        After a 429 the rates are multiplied by backoff; each success then
+        adds recovery to them. default_pause is the pause after a 429
+        without Retry-After.
+        """
+        self.account: TokenBucket = TokenBucket(rate, burst)
+        self.hosts: HostRateLimits | None = hosts
+        self.backoff: float = backoff
+        self.recovery: float = recovery
+        self.default_pause: float = default_pause
+
+    def _buckets(self, url: str) -> list[TokenBucket]:
+        if self.hosts is None:
+            return [self.account]
+        return [self.account, self.hosts.bucket(urllib.parse.urlsplit(url).netloc)]
+
+    def acquire(self, url: str) -> float:
+        """Wait until a request to url may be sent; return the seconds waited."""
+        wait = max(bucket.reserve() for bucket in self._buckets(url))
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def throttled(self, url: str, retry_after: float | None) -> None:
+        """Slow down after the service answered a request to url with 429."""
+        pause = self.default_pause if retry_after is None else retry_after
+        self.account.throttle(pause, self.backoff)
+        for bucket in self._buckets(url)[1:]:
+            # other accounts on the host slow down, but need not wait
+            bucket.throttle(0.0, self.backoff)
+
+    def succeeded(self, url: str) -> None:
+        """Speed back up after a request to url was not throttled."""
+        for bucket in self._buckets(url):
+            bucket.recover(self.recovery)
@@ -0,0 +1,108 @@
+"""Per-endpoint retry timing.
+
+TotalConnectClient waits retry_delay seconds before retrying a request.
+Some endpoints fail in known ways that call for different timing, so
+TotalConnectClient.retry_profiles maps endpoint templates (see
+const.endpoint_template()) to a RetryProfile that overrides the delay.
+It starts as a copy of RETRY_PROFILES.
+
+Clients that share a RetryBudget also share a limit on how often they
+retry at all.
+"""
+
+import threading
+import time
+from collections.abc import Collection
+from typing import Final
+
+from .const import _ResultCode
+
+
+class RetryProfile:
+    """How long to wait before retrying requests to one endpoint."""
+
+    __slots__ = ("delay", "first_retry_delay", "first_retry_result_codes")
+
+    def __init__(
+        self,
+        delay: float | None = None,
+        first_retry_delay: float | None = None,
+        first_retry_result_codes: Collection[int] = (),
+    ) -> None:
+        """Initialize.
+
+        delay replaces the client's retry_delay; None keeps it.
+        first_retry_delay is used instead before the first retry, for
+        endpoints with a known warm-up failure. If first_retry_result_codes
+        is given, only when the first attempt failed with one of them.
+        """
+        self.delay: float | None = delay
+        self.first_retry_delay: float | None = first_retry_delay
+        self.first_retry_result_codes: frozenset[int] = frozenset(first_retry_result_codes)
+
+    def delay_before_retry(self, attempt: int, result_code: int | None, default: float) -> float:
+        """Return seconds to wait after the given failed attempt (1 for the first).
+
+        result_code is the ResultCode of the failed response, if it had one.
+        default is the client's retry_delay. The first retry never waits
+        longer than the later ones.
+        """
+        delay = default if self.delay is None else self.delay
+        if (
+            attempt == 1
+            and self.first_retry_delay is not None
+            and (not self.first_retry_result_codes or result_code in self.first_retry_result_codes)
+        ):
+            return min(self.first_retry_delay, delay)
+        return delay
+
+
+class RetryBudget:
+    """Retries shared by the clients given it, refilled at a steady rate.
+
+    A client with a budget (TotalConnectClient(retry_budget=...)) spends
+    one retry from it before retrying a temporary failure, and gives up
+    at once when it is empty. During an outage this keeps many clients
+    from all sleeping in retry loops and retrying together.
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        """Initialize full: burst retries, refilled at rate per second."""
+        self.rate: float = rate
+        self.burst: float = burst
+        self._available: float = burst
+        self._updated: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> float:
+        """Return the number of retries that may be made now."""
+        with self._lock:
+            self._refill()
+            return self._available
+
+    def try_spend(self) -> bool:
+        """Spend one retry and return True, or return False if there is none."""
+        with self._lock:
+            self._refill()
+            if self._available < 1:
+                return False
+            self._available -= 1
+            return True
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._available = min(self.burst, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+# zone details fail with CONNECTION_ERROR on the first call, and the first
+# retry succeeds (see docs/REST_NOTES.md), so don't wait the full retry_delay
+ZONE_DETAILS_ENDPOINT: Final[str] = "api/v1/locations/{id}/partitions/zones/{id}"
+
+RETRY_PROFILES: Final[dict[str, RetryProfile]] = {
+    ZONE_DETAILS_ENDPOINT: RetryProfile(
+        first_retry_delay=1.0,
+        first_retry_result_codes=(_ResultCode.CONNECTION_ERROR.value,),
+    ),
+}
@@ -0,0 +1,343 @@
+"""Declarative schemas for Total Connect API payloads.
+
+A Schema maps the fields of a record class to keys of a JSON object.
+When the schema is created it is compiled into a parse function that
+reads only the declared keys, checks the required ones and builds the
+record, so the rest of the code works with typed attributes instead of
+chains of dict.get() calls:
+
+    status = FULL_STATUS.parse(response)
+    status.panel_status.partitions[0].arming_state
+
+A required field that is missing (or None, or an empty section) raises
+PartialResponseError, so this module is the one place that knows which
+parts of a response are always supposed to be there. validation.py runs
+the same parsers on each response inside the client's retry loop.
+
+Records are slotted dataclasses; treat them as read-only. (Frozen
+dataclasses take several times longer to create.) Zones are left as
+the decoded JSON objects in the records of whole responses, because
+TotalConnectZone skips unchanged zones before parsing them with ZONE.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Final, Generic, TypeVar
+
+from .exceptions import PartialResponseError
+
+R = TypeVar("R")
+
+_EMPTY: Final[dict[str, Any]] = {}
+
+
+class Field:
+    """How to read one record field from a JSON object."""
+
+    __slots__ = ("key", "alternate", "required", "nonempty", "schema", "many", "convert", "message")
+
+    def __init__(
+        self,
+        key: str,
+        *,
+        alternate: str | None = None,
+        required: bool = False,
+        nonempty: bool = False,
+        schema: "Schema[Any] | None" = None,
+        many: bool = False,
+        convert: Callable[[Any], Any] | None = None,
+        message: str | None = None,
+    ) -> None:
+        """Initialize.
+
+        alternate is read if key is missing or false (such as 0), for payloads
+        that spell it two ways.
+        A required field raises PartialResponseError(message) if it is missing
+        or None, and a nonempty one also if it is empty. A field with a schema
+        is parsed with it, or each item with it if many is set; a field with
+        neither is kept as is, after convert if given.
+        """
+        self.key = key
+        self.alternate = alternate
+        self.required = required
+        self.nonempty = nonempty
+        self.schema = schema
+        self.many = many
+        self.convert = convert
+        self.message = message or f"no {key}"
+
+
+class Schema(Generic[R]):
+    """Compiles Fields into a parse function that returns a record."""
+
+    def __init__(self, record: Callable[..., R], **fields_by_name: Field) -> None:
+        """Initialize with the record class and a Field for each of its fields."""
+        if is_dataclass(record):
+            names = [field.name for field in fields(record)]
+            if names != list(fields_by_name):
+                raise TypeError(f"fields {list(fields_by_name)} do not match {record}: {names}")
+        self.record = record
+        self.fields: dict[str, Field] = fields_by_name
+        self.parse: Callable[[Any], R] = self._compile()
+
+    def _compile(self) -> Callable[[Any], R]:
+        """Return a function that parses a JSON object into a record.
+
+        It is generated as Python source, like dataclasses and namedtuple do,
+        so parsing costs one local lookup per field rather than a loop over
+        the Field objects.
+        """
+        namespace: dict[str, Any] = {
+            "_EMPTY": _EMPTY,
+            "_record": self.record,
+            "PartialResponseError": PartialResponseError,
+        }
+        lines = ["def parse(data):", "    get = (data or _EMPTY).get"]
+        for number, (name, field) in enumerate(self.fields.items()):
+            value = f"_{name}"
+            lines.append(f"    {value} = get({field.key!r})")
+            if field.alternate:
+                lines.append(f"    if not {value}:")
+                lines.append(f"        {value} = get({field.alternate!r})")
+            check = f"not {value}" if field.nonempty else f"{value} is None"
+            if field.required:
+                namespace[f"_message{number}"] = field.message
+                lines.append(f"    if {check}:")
+                lines.append(f"        raise PartialResponseError(_message{number}, data)")
+            if field.schema is not None:
+                namespace[f"_parse{number}"] = field.schema.parse
+                parsed = (
+                    f"tuple(map(_parse{number}, {value}))"
+                    if field.many
+                    else f"_parse{number}({value})"
+                )
+                default = "()" if field.many else "None"
+                lines.append(f"    {value} = {parsed} if {value} else {default}")
+            elif field.convert is not None:
+                namespace[f"_convert{number}"] = field.convert
+                lines.append(f"    if {value} is not None:")
+                lines.append(f"        {value} = _convert{number}({value})")
+        arguments = ", ".join(f"_{name}" for name in self.fields)
+        lines.append(f"    return _record({arguments})")
+        exec("\n".join(lines), namespace)
+        return namespace["parse"]  # type: ignore[no-any-return]
+
+
+@dataclass(slots=True)
+class PartitionStatus:
+    """A partition in PanelStatus."""
+
+    partition_id: int
+    arming_state: int
+
+
+@dataclass(slots=True)
+class PanelStatus:
+    """PanelStatus of a fullStatus response."""
+
+    ac_loss: bool | None
+    low_battery: bool | None
+    cover_tampered: bool | None
+    last_updated_timestamp_ticks: int | None
+    configuration_sequence_number: int | None
+    partitions: tuple[PartitionStatus, ...]
+    zones: list[dict[str, Any]]
+
+
+@dataclass(slots=True)
+class FullStatus:
+    """A fullStatus response."""
+
+    panel_status: PanelStatus
+    arming_state: int
+
+
+@dataclass(slots=True)
+class ZoneAdditionalInfo:
+    """zoneAdditionalInfo of a zone in ZoneStatus."""
+
+    sensor_serial_number: str | None
+    loop_number: int | None
+    response_type: str | None
+    alarm_report_state: str | None
+    supervision_type: str | None
+    chime_state: int | None
+    device_type: int | None
+
+
+@dataclass(slots=True)
+class Zone:
+    """A zone in PanelStatus (ZoneInfo) or ZoneStatus (ZoneStatusInfoWithPartitionId)."""
+
+    zone_id: int
+    description: str | None
+    partition: int | None
+    status: int | None
+    can_be_bypassed: bool | None
+    zone_type_id: int | None
+    battery_level: int | None
+    signal_strength: int | None
+    additional_info: ZoneAdditionalInfo | None
+
+
+@dataclass(slots=True)
+class ZoneStatusList:
+    """ZoneStatus of a zone details response."""
+
+    zones: list[dict[str, Any]]
+
+
+@dataclass(slots=True)
+class ZoneDetails:
+    """A zone details (ZoneStatusListEx_V1) response."""
+
+    zone_status: ZoneStatusList
+
+
+@dataclass(slots=True)
+class PartitionDetails:
+    """A partition in a partitions/config response."""
+
+    partition_id: int
+    name: str | None
+    is_stay_armed: bool | None
+    is_fire_enabled: bool | None
+    is_common_enabled: bool | None
+    is_locked: bool | None
+    is_new_partition: bool | None
+    is_night_stay_enabled: bool | None
+    exit_delay_timer: int | None
+    arming_state: int
+
+
+@dataclass(slots=True)
+class PartitionsConfig:
+    """A partitions/config response."""
+
+    partitions: tuple[PartitionDetails, ...]
+
+
+@dataclass(slots=True)
+class UserInfo:
+    """UserInfo of a sessiondetails response."""
+
+    user_id: int
+    username: str
+    user_feature_list: str
+
+
+@dataclass(slots=True)
+class SessionDetails:
+    """SessionDetailsResult of a sessiondetails response."""
+
+    module_flags: str
+    user_info: UserInfo
+    locations: list[dict[str, Any]] | None
+
+
+@dataclass(slots=True)
+class SessionDetailsResponse:
+    """A sessiondetails response."""
+
+    session_details: SessionDetails
+
+
+PARTITION_STATUS: Final = Schema(
+    PartitionStatus,
+    partition_id=Field("PartitionID", required=True, convert=int),
+    arming_state=Field("ArmingState", required=True),
+)
+
+PANEL_STATUS: Final = Schema(
+    PanelStatus,
+    ac_loss=Field("IsInACLoss"),
+    low_battery=Field("IsInLowBattery"),
+    cover_tampered=Field("IsCoverTampered"),
+    last_updated_timestamp_ticks=Field("LastUpdatedTimestampTicks"),
+    configuration_sequence_number=Field("ConfigurationSequenceNumber"),
+    partitions=Field("Partitions", required=True, schema=PARTITION_STATUS, many=True),
+    zones=Field("Zones", required=True),
+)
+
+FULL_STATUS: Final = Schema(
+    FullStatus,
+    panel_status=Field("PanelStatus", required=True, nonempty=True, schema=PANEL_STATUS),
+    arming_state=Field("ArmingState", required=True, nonempty=True),
+)
+
+ZONE_ADDITIONAL_INFO: Final = Schema(
+    ZoneAdditionalInfo,
+    sensor_serial_number=Field("SensorSerialNumber"),
+    loop_number=Field("LoopNumber"),
+    response_type=Field("ResponseType"),
+    alarm_report_state=Field("AlarmReportState"),
+    supervision_type=Field("ZoneSupervisionType"),
+    chime_state=Field("ChimeState"),
+    device_type=Field("DeviceType"),
+)
+
+ZONE: Final = Schema(
+    Zone,
+    zone_id=Field("ZoneID", required=True),
+    description=Field("ZoneDescription"),
+    # ZoneInfo gives 'PartitionID' but ZoneStatusInfoWithPartitionId gives 'PartitionId'
+    partition=Field("PartitionId", alternate="PartitionID"),
+    status=Field("ZoneStatus"),
+    can_be_bypassed=Field("CanBeBypassed"),
+    zone_type_id=Field("ZoneTypeId"),
+    battery_level=Field("Batterylevel"),
+    signal_strength=Field("Signalstrength"),
+    additional_info=Field("zoneAdditionalInfo", schema=ZONE_ADDITIONAL_INFO),
+)
+
+ZONE_STATUS_LIST: Final = Schema(ZoneStatusList, zones=Field("Zones", required=True))
+
+ZONE_DETAILS: Final = Schema(
+    ZoneDetails,
+    zone_status=Field("ZoneStatus", required=True, schema=ZONE_STATUS_LIST),
+)
+
+PARTITION_DETAILS: Final = Schema(
+    PartitionDetails,
+    partition_id=Field("PartitionID", required=True),
+    name=Field("PartitionName"),
+    is_stay_armed=Field("IsStayArmed"),
+    is_fire_enabled=Field("IsFireEnabled"),
+    is_common_enabled=Field("IsCommonEnabled"),
+    is_locked=Field("IsLocked"),
+    is_new_partition=Field("IsNewPartition"),
+    is_night_stay_enabled=Field("IsNightStayEnabled"),
+    exit_delay_timer=Field("ExitDelayTimer"),
+    arming_state=Field("ArmingState", required=True),
+)
+
+PARTITIONS_CONFIG: Final = Schema(
+    PartitionsConfig,
+    partitions=Field(
+        "Partitions",
+        required=True,
+        nonempty=True,
+        schema=PARTITION_DETAILS,
+        many=True,
+        message="no PartitionDetails",
+    ),
+)
+
+USER_INFO: Final = Schema(
+    UserInfo,
+    user_id=Field("UserID", required=True),
+    username=Field("Username", required=True),
+    user_feature_list=Field("UserFeatureList", required=True),
+)
+
+SESSION_DETAILS: Final = Schema(
+    SessionDetails,
+    module_flags=Field("ModuleFlags", required=True),
+    user_info=Field("UserInfo", required=True, schema=USER_INFO),
+    locations=Field("Locations"),
+)
+
+SESSION_DETAILS_RESPONSE: Final = Schema(
+    SessionDetailsResponse,
+    session_details=Field("SessionDetailsResult", required=True, schema=SESSION_DETAILS),
+)
@@ -0,0 +1,431 @@
+"""Poll accounts from several processes into a shared-memory table.
+
+Decoding responses and updating zones hold the GIL, so one process
+polls only as fast as one core. ShardedPoller spreads accounts over
+worker processes, round robin. Each worker polls its accounts and writes
+the state of their locations into one SharedMemory block, and the
+parent reads it through a SharedStateView without any messages between
+the processes:
+
+    with ShardedPoller(accounts, processes=4, poll_interval=10) as poller:
+        ...
+        poller.view.arming_state(0, location_id)
+
+accounts is a list of (username, password, usercodes) tuples, and an
+account is known by its index in it. The table has room for
+max_locations locations per account, and max_partitions partitions and
+max_zones zones per location; anything beyond that is left out.
+
+Each location has a row of 64-bit integers: a header (see the HEADER_*
+offsets), then room for max_partitions (partition ID, ArmingState)
+pairs and then for max_zones (zone ID, ZoneStatus) pairs. Writers bump the row's
+sequence number to an odd value while they write it and to the next even
+value when done, and readers retry until they see the same even value
+before and after reading, so a reader never sees a half-written row. A
+row left odd by a worker that died while writing it is read as if it
+had not been written, after read_timeout seconds.
+"""
+
+import logging
+import multiprocessing
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.synchronize import Event
+from typing import Any, Final, TypeVar
+
+from .const import ArmingState
+from .exceptions import TotalConnectError
+from .location import TotalConnectLocation
+from .zone import ZoneStatus
+
+LOGGER: Final = logging.getLogger(__name__)
+
+# offsets in the header of a location's row
+HEADER_SEQUENCE: Final[int] = 0
+HEADER_LOCATION_ID: Final[int] = 1
+HEADER_ARMING_STATE: Final[int] = 2
+HEADER_PARTITION_COUNT: Final[int] = 3
+HEADER_ZONE_COUNT: Final[int] = 4
+HEADER_POLLS: Final[int] = 5
+HEADER_ERRORS: Final[int] = 6
+HEADER_SIZE: Final[int] = 7
+
+_ITEM_SIZE: Final[int] = 8  # bytes in each 64-bit integer
+
+# seconds a reader waits for a row being written before giving up on it
+READ_TIMEOUT: Final[float] = 1.0
+
+# (username, password, usercodes)
+Account = tuple[str, str, dict[str, str] | None]
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class LocationState:
+    """A consistent copy of one location's row."""
+
+    location_id: int
+    arming_state: ArmingState
+    partitions: dict[int, ArmingState]
+    zones: dict[int, ZoneStatus]
+    polls: int
+    errors: int
+
+
+class SharedStateView:
+    """Reads and writes the rows of a shared state table.
+
+    read() copies a whole row into a LocationState. arming_state(),
+    partition_arming_state() and zone_status() read just what they return
+    from the table, without copying the row.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        buffer: memoryview,
+        max_locations: int,
+        max_zones: int,
+        max_partitions: int = 4,
+        read_timeout: float = READ_TIMEOUT,
+    ) -> None:
+        """Initialize on a buffer of table_size(...) bytes."""
+        self.max_locations: int = max_locations
+        self.max_zones: int = max_zones
+        self.max_partitions: int = max_partitions
+        self.read_timeout: float = read_timeout
+        self.row_size: int = self.row_length(max_zones, max_partitions)
+        self._table = buffer.cast("q")
+        self.accounts: int = len(self._table) // (self.row_size * max_locations)
+
+    @staticmethod
+    def row_length(max_zones: int, max_partitions: int) -> int:
+        """Return the number of integers in a location's row."""
+        return HEADER_SIZE + 2 * max_partitions + 2 * max_zones
+
+    @classmethod
+    def table_size(
+        cls, accounts: int, max_locations: int, max_zones: int, max_partitions: int = 4
+    ) -> int:
+        """Return the size in bytes of a table."""
+        return accounts * max_locations * cls.row_length(max_zones, max_partitions) * _ITEM_SIZE
+
+    def release(self) -> None:
+        """Release the buffer, which must be done before closing shared memory."""
+        self._table.release()
+
+    def _row(self, account: int, location_id: int) -> int | None:
+        """Return the offset of a location's row, or None if it has none."""
+        start = account * self.max_locations * self.row_size
+        for slot in range(self.max_locations):
+            offset = start + slot * self.row_size
+            if self._table[offset + HEADER_LOCATION_ID] == location_id:
+                return offset
+        return None
+
+    def _zones_offset(self, offset: int) -> int:
+        """Return the offset of the zone pairs of the row at offset."""
+        return offset + HEADER_SIZE + 2 * self.max_partitions
+
+    def location_ids(self, account: int) -> list[int]:
+        """Return the IDs of the locations of an account that have been written."""
+        start = account * self.max_locations * self.row_size
+        ids = (
+            self._table[start + slot * self.row_size + HEADER_LOCATION_ID]
+            for slot in range(self.max_locations)
+        )
+        return [location_id for location_id in ids if location_id]
+
+    def _consistent(
+        self, account: int, location_id: int, reader: "Callable[[memoryview, int], T]"
+    ) -> T | None:
+        """Return reader(table, offset) for a location's row, read while it is not written.
+
+        None if the location has no row, or if the row is still being
+        written after read_timeout seconds, with a warning.
+        """
+        offset = self._row(account, location_id)
+        if offset is None:
+            return None
+        table = self._table
+        deadline: float | None = None
+        while True:
+            sequence = table[offset + HEADER_SEQUENCE]
+            if not sequence % 2:
+                value = reader(table, offset)
+                if table[offset + HEADER_SEQUENCE] == sequence:
+                    return value
+            if deadline is None:
+                deadline = time.monotonic() + self.read_timeout
+            elif time.monotonic() >= deadline:
+                LOGGER.warning(
+                    f"location {location_id} of account {account} is still being written"
+                    f" after {self.read_timeout}s"
+                )
+                return None
+            time.sleep(0)
+
+    def read(self, account: int, location_id: int) -> LocationState | None:
+        """Return a copy of the state of a location, or None if it has not been written.
+
+        None is also returned, with a warning, if the row is still being
+        written after read_timeout seconds.
+        """
+        row = self._consistent(
+            account,
+            location_id,
+            lambda table, offset: table[offset : offset + self.row_size].tolist(),
+        )
+        if row is None:
+            return None
+        partitions = row[HEADER_SIZE : HEADER_SIZE + 2 * row[HEADER_PARTITION_COUNT]]
+        zones_start = HEADER_SIZE + 2 * self.max_partitions
+        zones = row[zones_start : zones_start + 2 * row[HEADER_ZONE_COUNT]]
+        return LocationState(
+            location_id,
+            ArmingState(row[HEADER_ARMING_STATE]),
+            {partitions[i]: ArmingState(partitions[i + 1]) for i in range(0, len(partitions), 2)},
+            {zones[i]: ZoneStatus(zones[i + 1]) for i in range(0, len(zones), 2)},
+            row[HEADER_POLLS],
+            row[HEADER_ERRORS],
+        )
+
+    def arming_state(self, account: int, location_id: int) -> ArmingState | None:
+        """Return the arming state of a location, or None if it has not been written."""
+        value = self._consistent(
+            account, location_id, lambda table, offset: table[offset + HEADER_ARMING_STATE]
+        )
+        return None if value is None else ArmingState(value)
+
+    def partition_arming_state(
+        self, account: int, location_id: int, partition_id: int
+    ) -> ArmingState | None:
+        """Return the arming state of a partition, or None if it has not been written."""
+
+        def reader(table: memoryview, offset: int) -> int | None:
+            position = offset + HEADER_SIZE
+            for _ in range(table[offset + HEADER_PARTITION_COUNT]):
+                if table[position] == partition_id:
+                    return int(table[position + 1])
+                position += 2
+            return None
+
+        value = self._consistent(account, location_id, reader)
+        return None if value is None else ArmingState(value)
+
+    def zone_status(self, account: int, location_id: int, zone_id: int) -> ZoneStatus | None:
+        """Return the status of a zone, or None if it has not been written."""
+
+        def reader(table: memoryview, offset: int) -> int | None:
+            position = self._zones_offset(offset)
+            for _ in range(table[offset + HEADER_ZONE_COUNT]):
+                if table[position] == zone_id:
+                    return int(table[position + 1])
+                position += 2
+            return None
+
+        value = self._consistent(account, location_id, reader)
+        return None if value is None else ZoneStatus(value)
+
+    def write(self, account: int, slot: int, location: TotalConnectLocation) -> None:
+        """Write a location into a slot of an account; only one process may write a row."""
+        table = self._table
+        offset = (account * self.max_locations + slot) * self.row_size
+        partitions = list(location.partitions.items())[: self.max_partitions]
+        zones = list(location.zones.items())[: self.max_zones]
+        table[offset + HEADER_SEQUENCE] += 1
+        table[offset + HEADER_LOCATION_ID] = location.location_id
+        table[offset + HEADER_ARMING_STATE] = location.arming_state.value
+        table[offset + HEADER_PARTITION_COUNT] = len(partitions)
+        table[offset + HEADER_ZONE_COUNT] = len(zones)
+        table[offset + HEADER_POLLS] += 1
+        position = offset + HEADER_SIZE
+        for partition_id, partition in partitions:
+            table[position] = partition_id
+            table[position + 1] = partition.arming_state.value
+            position += 2
+        position = self._zones_offset(offset)
+        for zone_id, zone in zones:
+            table[position] = zone_id
+            table[position + 1] = int(zone.status)
+            position += 2
+        table[offset + HEADER_SEQUENCE] += 1
+
+    def count_error(self, account: int) -> None:
+        """Count a failed poll of an account in its first row."""
+        offset = account * self.max_locations * self.row_size
+        self._table[offset + HEADER_SEQUENCE] += 1
+        self._table[offset + HEADER_ERRORS] += 1
+        self._table[offset + HEADER_SEQUENCE] += 1
+
+
+class ShardedPoller:
+    """Polls accounts in worker processes into a SharedStateView.
+
+    Use it as a context manager, or call start() and close().
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        accounts: Sequence[Account],
+        processes: int = 2,
+        poll_interval: float = 30.0,
+        max_locations: int = 4,
+        max_zones: int = 128,
+        max_partitions: int = 4,
+        origin: str | None = None,
+        client_kwargs: dict[str, Any] | None = None,
+    ) -> None:
+        """Initialize.
+
+        origin sends all requests there instead of to Total Connect, as
+        RedirectTransport does. client_kwargs are passed to each client
+        (which must be picklable).
+        """
+        self.accounts: list[Account] = list(accounts)
+        self.processes: int = processes
+        self.poll_interval: float = poll_interval
+        self.max_locations: int = max_locations
+        self.max_zones: int = max_zones
+        self.max_partitions: int = max_partitions
+        self.origin: str | None = origin
+        self.client_kwargs: dict[str, Any] = client_kwargs or {}
+        self._context = multiprocessing.get_context("spawn")
+        self._memory: SharedMemory | None = None
+        self._view: SharedStateView | None = None
+        self._stopping: Event = self._context.Event()
+        self._workers: list[multiprocessing.process.BaseProcess] = []
+
+    def __enter__(self) -> "ShardedPoller":
+        """Start polling."""
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop polling and free the table."""
+        self.close()
+
+    @property
+    def view(self) -> SharedStateView:
+        """Return the view of the shared table."""
+        if self._view is None:
+            raise RuntimeError("sharded poller is not running")
+        return self._view
+
+    def start(self) -> "ShardedPoller":
+        """Create the table and start the workers."""
+        if self._memory is not None:
+            raise RuntimeError("sharded poller is already running")
+        size = SharedStateView.table_size(
+            len(self.accounts), self.max_locations, self.max_zones, self.max_partitions
+        )
+        # new shared memory is filled with zeros, so every row starts unwritten
+        self._memory = SharedMemory(create=True, size=max(size, 1))
+        self._view = SharedStateView(
+            _buffer(self._memory, size), self.max_locations, self.max_zones, self.max_partitions
+        )
+        self._stopping.clear()
+        for shard in range(self.processes):
+            indexes = list(range(shard, len(self.accounts), self.processes))
+            if not indexes:
+                continue
+            worker = self._context.Process(
+                target=_poll_shard,
+                args=(
+                    self._memory.name,
+                    size,
+                    self.max_locations,
+                    self.max_zones,
+                    self.max_partitions,
+                    [(index, self.accounts[index]) for index in indexes],
+                    self.poll_interval,
+                    self.origin,
+                    self.client_kwargs,
+                    self._stopping,
+                ),
+                name=f"total-connect-shard-{shard}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+        return self
+
+    def stop(self) -> None:
+        """Stop the workers; the table can still be read."""
+        self._stopping.set()
+        for worker in self._workers:
+            worker.join(timeout=30)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+    def close(self) -> None:
+        """Stop the workers and free the table."""
+        self.stop()
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._memory is not None:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+
+def _buffer(memory: SharedMemory, size: int) -> memoryview:
+    """Return the first size bytes of memory."""
+    if memory.buf is None:
+        raise RuntimeError(f"shared memory {memory.name} is closed")
+    return memory.buf[:size]
+
+
+def _poll_shard(  # pylint: disable=too-many-arguments
+    memory_name: str,
+    size: int,
+    max_locations: int,
+    max_zones: int,
+    max_partitions: int,
+    shard: list[tuple[int, Account]],
+    poll_interval: float,
+    origin: str | None,
+    client_kwargs: dict[str, Any],
+    stopping: Event,
+) -> None:
+    """Poll the accounts of one shard until stopping is set; runs in a worker."""
+    # imported here so the parent does not need the client to read the table
+    from .client import TotalConnectClient
+    from .transport import RedirectTransport
+
+    memory = SharedMemory(name=memory_name)
+    view = SharedStateView(_buffer(memory, size), max_locations, max_zones, max_partitions)
+    clients: dict[int, TotalConnectClient] = {}
+    loaded: set[int] = set()
+    kwargs = {"skip_unchanged": True, "lazy": True, **client_kwargs}
+    try:
+        while not stopping.is_set():
+            start = time.monotonic()
+            for index, (username, password, usercodes) in shard:
+                if stopping.is_set():
+                    break
+                try:
+                    client = clients.get(index)
+                    if client is None:
+                        transport = RedirectTransport(origin) if origin else None
+                        client = TotalConnectClient(
+                            username, password, usercodes, transport=transport, **kwargs
+                        )
+                        clients[index] = client
+                    locations = list(client.locations.values())[:max_locations]
+                    for slot, location in enumerate(locations):
+                        if index in loaded:
+                            location.get_panel_meta_data()
+                        # the first poll loads the location when the zones are read
+                        view.write(index, slot, location)
+                    loaded.add(index)
+                except TotalConnectError as err:
+                    LOGGER.warning(f"polling {username} failed: {err}")
+                    view.count_error(index)
+            stopping.wait(max(0.0, poll_interval - (time.monotonic() - start)))
+    finally:
+        view.release()
+        memory.close()
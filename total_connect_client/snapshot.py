@@ -0,0 +1,159 @@
+"""Immutable snapshots of a location's state.
+
+A TotalConnectLocation is updated in place as responses arrive, so a
+thread reading it while another polls can see half of an update: the
+new arming state with the old zones, or some zones updated and others
+not. After each refresh the location publishes a LocationSnapshot by
+replacing one attribute, so a reader that takes location.snapshot once
+sees a consistent state without any lock:
+
+    snapshot = location.snapshot
+    if snapshot.arming_state.is_armed():
+        faulted = snapshot.zones_with_status(ZoneStatus.FAULT)
+
+A new snapshot is only made when something changed, and its version is
+one more than the last. Zones are copied on write: a new snapshot has
+new ZoneSnapshots for the zones that changed since the last one, and
+shares those of the others with it.
+"""
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+from .const import ArmingState
+from .zone import ZoneStatus, ZoneType
+
+if TYPE_CHECKING:
+    from .location import TotalConnectLocation
+    from .partition import TotalConnectPartition
+    from .zone import TotalConnectZone
+
+
+@dataclass(frozen=True, slots=True)
+class ZoneSnapshot:
+    """The state of a zone when a snapshot was published."""
+
+    zone_id: int
+    partition: int
+    description: str | None
+    status: ZoneStatus
+    zone_type_id: ZoneType | int | None
+    can_be_bypassed: bool | None
+    battery_level: int | None
+    signal_strength: int | None
+
+    @classmethod
+    def of(cls, zone: "TotalConnectZone") -> "ZoneSnapshot":
+        """Return the current state of a zone."""
+        return cls(
+            zone.zoneid,
+            zone.partition,
+            zone.description,
+            zone.status,
+            zone.zone_type_id,
+            zone.can_be_bypassed,
+            zone.battery_level,
+            zone.signal_strength,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class PartitionSnapshot:
+    """The state of a partition when a snapshot was published."""
+
+    partition_id: int
+    name: str | None
+    arming_state: ArmingState
+
+    @classmethod
+    def of(cls, partition: "TotalConnectPartition") -> "PartitionSnapshot":
+        """Return the current state of a partition."""
+        return cls(partition.partitionid, partition.name, partition.arming_state)
+
+
+_NO_PARTITIONS: Mapping[int, PartitionSnapshot] = MappingProxyType({})
+_NO_ZONES: Mapping[int, ZoneSnapshot] = MappingProxyType({})
+
+
+@dataclass(frozen=True, slots=True)
+class LocationSnapshot:
+    """The state of a location when it was published; see the module docstring."""
+
+    location_id: int
+    version: int = 0
+    arming_state: ArmingState = ArmingState.UNKNOWN
+    ac_loss: bool | None = None
+    low_battery: bool | None = None
+    cover_tampered: bool | None = None
+    last_updated_timestamp_ticks: int | None = None
+    configuration_sequence_number: int | None = None
+    partitions: Mapping[int, PartitionSnapshot] = field(default_factory=lambda: _NO_PARTITIONS)
+    zones: Mapping[int, ZoneSnapshot] = field(default_factory=lambda: _NO_ZONES)
+
+    def zones_with_status(self, mask: ZoneStatus) -> set[int]:
+        """Return IDs of zones with any of the status bits in mask."""
+        return {zone_id for zone_id, zone in self.zones.items() if zone.status & mask}
+
+    def changed_zones(self, older: "LocationSnapshot") -> set[int]:
+        """Return IDs of zones that are not the same as in an older snapshot."""
+        return {
+            zone_id for zone_id, zone in self.zones.items() if older.zones.get(zone_id) is not zone
+        }
+
+    def following(
+        self, location: "TotalConnectLocation", changed_zones: Iterable[int]
+    ) -> "LocationSnapshot":
+        """Return the next snapshot of location, or self if nothing changed.
+
+        changed_zones are the IDs of the zones created or updated since self
+        was made; only they are copied.
+        """
+        zones = self._following_zones(location._zones, changed_zones)
+        new_partitions = {
+            partition_id: PartitionSnapshot.of(partition)
+            for partition_id, partition in location._partitions.items()
+        }
+        partitions = self.partitions
+        if new_partitions != partitions:
+            partitions = MappingProxyType(new_partitions)
+
+        snapshot = replace(
+            self,
+            arming_state=location.arming_state,
+            ac_loss=location.ac_loss,
+            low_battery=location.low_battery,
+            cover_tampered=location.cover_tampered,
+            last_updated_timestamp_ticks=location.last_updated_timestamp_ticks,
+            configuration_sequence_number=location.configuration_sequence_number,
+            partitions=partitions,
+            zones=zones,
+        )
+        if snapshot == self:
+            return self
+        return replace(snapshot, version=self.version + 1)
+
+    def _following_zones(
+        self, current: Mapping[int, "TotalConnectZone"], changed_zones: Iterable[int]
+    ) -> Mapping[int, ZoneSnapshot]:
+        """Return the zones of the next snapshot, or self.zones if none changed."""
+        zones = self.zones
+        new_zones: dict[int, ZoneSnapshot] | None = None
+        for zone_id in changed_zones:
+            zone = current.get(zone_id)
+            if zone is None:
+                continue
+            zone_snapshot = ZoneSnapshot.of(zone)
+            # a zone updated to the state it had is shared with the last snapshot
+            if zones.get(zone_id) != zone_snapshot:
+                if new_zones is None:
+                    new_zones = dict(zones)
+                new_zones[zone_id] = zone_snapshot
+        if len(current) < len(zones):
+            new_zones = {
+                zone_id: zone
+                for zone_id, zone in (new_zones or zones).items()
+                if zone_id in current
+            }
+        return zones if new_zones is None else MappingProxyType(new_zones)
@@ -0,0 +1,861 @@
+"""Local stand-in for the Total Connect API.
+
+StandInService answers the endpoints used by this package from simulated
+panels, with configurable latency and injected failures per endpoint.
+StandInServer serves it over HTTP on localhost, and a RedirectTransport
+points a client at it:
+
+    with StandInServer(StandInService(num_zones=64)) as server:
+        client = TotalConnectClient(
+            "user", "password", {"default": "1234"}, transport=server.transport()
+        )
+
+It is meant for load testing and benchmarking the client end to end, and
+does not try to reproduce every quirk of the real service. To leave out
+the network entirely, use StandInService.transport() instead of a server.
+
+StandInHub pushes panel changes the way the SignalR hub does, over the
+long polling transport (see push.py).
+
+Endpoint names used to configure behavior (see ENDPOINTS):
+config, token, sessiondetails, logout, fullStatus, zones, partitions,
+arm, disArm, bypass, clearBypass, and for the hub negotiate, hubSend,
+hubPoll and hubClose.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from collections.abc import Callable, Mapping
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Final
+
+from Crypto.Cipher import PKCS1_v1_5
+from Crypto.PublicKey import RSA
+
+from .const import ArmingState, ArmType, _ResultCode
+from .transport import FakeTransport, RedirectTransport
+from .zone import ZoneStatus, ZoneType
+
+LOGGER: Final = logging.getLogger(__name__)
+
+Payload = dict[str, Any]
+
+# (method, path pattern, endpoint name); path groups are location and device IDs
+_ROUTES: Final[list[tuple[str, re.Pattern[str], str]]] = [
+    ("GET", re.compile(r"/application\.config\.json$"), "config"),
+    ("POST", re.compile(r"/TC2API\.Auth/token$"), "token"),
+    ("GET", re.compile(r"/api/v3/authentication/sessiondetails$"), "sessiondetails"),
+    ("POST", re.compile(r"/api/v3/authentication/logout$"), "logout"),
+    ("GET", re.compile(r"/api/v3/locations/(\d+)/partitions/fullStatus$"), "fullStatus"),
+    ("GET", re.compile(r"/api/v1/locations/(\d+)/partitions/zones/0$"), "zones"),
+    (
+        "GET",
+        re.compile(r"/api/v1/locations/(\d+)/devices/(\d+)/partitions/config$"),
+        "partitions",
+    ),
+    ("PUT", re.compile(r"/api/v3/locations/(\d+)/devices/(\d+)/partitions/arm$"), "arm"),
+    ("PUT", re.compile(r"/api/v3/locations/(\d+)/devices/(\d+)/partitions/disArm$"), "disArm"),
+    ("PUT", re.compile(r"/api/v1/locations/(\d+)/devices/(\d+)/bypass$"), "bypass"),
+    ("PUT", re.compile(r"/api/v2/locations/(\d+)/devices/(\d+)/clearBypass$"), "clearBypass"),
+    ("POST", re.compile(r"/TC2HubService/SignalRHub/negotiate$"), "negotiate"),
+    ("POST", re.compile(r"/TC2HubService/SignalRHub$"), "hubSend"),
+    ("GET", re.compile(r"/TC2HubService/SignalRHub$"), "hubPoll"),
+    ("DELETE", re.compile(r"/TC2HubService/SignalRHub$"), "hubClose"),
+]
+
+ENDPOINTS: Final[tuple[str, ...]] = tuple(name for _, _, name in _ROUTES)
+
+# endpoints that do not need a session token
+_UNAUTHENTICATED: Final[frozenset[str]] = frozenset({"config", "token"})
+
+_ARMED_STATES: Final[dict[int, ArmingState]] = {
+    ArmType.AWAY.value: ArmingState.ARMED_AWAY,
+    ArmType.STAY.value: ArmingState.ARMED_STAY,
+    ArmType.STAY_INSTANT.value: ArmingState.ARMED_STAY_INSTANT,
+    ArmType.AWAY_INSTANT.value: ArmingState.ARMED_AWAY_INSTANT,
+    ArmType.STAY_NIGHT.value: ArmingState.ARMED_STAY_NIGHT,
+}
+
+# (ZoneType, DeviceType, CanBeBypassed, description) repeated across a panel's zones
+_ZONE_KINDS: Final[list[tuple[ZoneType, int, int, str]]] = [
+    (ZoneType.ENTRY_EXIT1, 0, 1, "Door"),
+    (ZoneType.PERIMETER, 0, 1, "Window"),
+    (ZoneType.INTERIOR_FOLLOWER, 2, 1, "Motion Sensor"),
+    (ZoneType.PERIMETER, 0, 1, "Window"),
+    (ZoneType.FIRE_SMOKE, 5, 0, "Smoke Detector"),
+    (ZoneType.CARBON_MONOXIDE, 6, 0, "CO Detector"),
+]
+
+# .NET ticks (100 ns units since 0001-01-01) at the Unix epoch
+_EPOCH_TICKS: Final[int] = 621355968000000000
+
+# SignalR record separator, which ends each message of the JSON hub protocol
+_RECORD_SEPARATOR: Final[str] = "\x1e"
+
+_ERROR_MESSAGES: Final[dict[int, str]] = {
+    _ResultCode.CONNECTION_ERROR.value: (
+        "We are unable to connect to the security panel. Please try again later or contact support"
+    ),
+    _ResultCode.INVALID_SESSION.value: "Invalid Session",
+    429: "Too many requests",
+    500: "Request Not Completed, Please Try Again Later",
+}
+
+
+def _ticks() -> int:
+    return _EPOCH_TICKS + int(time.time() * 10_000_000)
+
+
+def _route(method: str, path: str) -> tuple[str, list[int]] | None:
+    """Return the endpoint name and the IDs in the path, or None if unknown."""
+    for route_method, pattern, name in _ROUTES:
+        match = pattern.search(path)
+        if match and route_method == method:
+            return name, [int(group) for group in match.groups()]
+    return None
+
+
+def _result(code: int = 0, data: str = "Success") -> Payload:
+    return {"ResultCode": code, "ResultData": data}
+
+
+class EndpointBehavior:
+    """How the stand-in answers requests to one endpoint.
+
+    error_rates maps an error to the probability of answering with it.
+    Values from 400 to 599 are HTTP status codes; anything else is a
+    ResultCode in an otherwise successful response, e.g. 4101
+    (CONNECTION_ERROR) or -102 (INVALID_SESSION).
+
+    fail_first answers the first N requests with ResultCode 4101, like
+    the zone details endpoint does (see docs/REST_NOTES.md).
+    retry_after is sent as the Retry-After header with HTTP 429.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rates: Mapping[int, float] | None = None,
+        fail_first: int = 0,
+        retry_after: float | None = None,
+    ) -> None:
+        """Initialize."""
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.error_rates: dict[int, float] = dict(error_rates or {})
+        self.fail_first: int = fail_first
+        self.retry_after: float | None = retry_after
+
+
+class SimulatedPanel:
+    """State of one location and its security panel."""
+
+    def __init__(
+        self,
+        location_id: int,
+        security_device_id: int,
+        num_zones: int = 8,
+        num_partitions: int = 1,
+        usercode: str = "1234",
+    ) -> None:
+        """Initialize a disarmed panel with normal zones."""
+        self.location_id: int = location_id
+        self.security_device_id: int = security_device_id
+        self.usercode: str = usercode
+        self.partitions: dict[int, ArmingState] = dict.fromkeys(
+            range(1, num_partitions + 1), ArmingState.DISARMED
+        )
+        self.zones: dict[int, Payload] = {}
+        for zone_id in range(1, num_zones + 1):
+            zone_type, device_type, can_be_bypassed, kind = _ZONE_KINDS[
+                (zone_id - 1) % len(_ZONE_KINDS)
+            ]
+            self.zones[zone_id] = {
+                "ZoneID": zone_id,
+                "ZoneDescription": f"Zone {zone_id} {kind}",
+                "ZoneStatus": ZoneStatus.NORMAL.value,
+                "PartitionID": 1 + (zone_id - 1) % num_partitions,
+                "CanBeBypassed": can_be_bypassed,
+                "ZoneTypeId": zone_type.value,
+                "DeviceType": device_type,
+                "Batterylevel": 5,
+                "Signalstrength": 4,
+            }
+        self.ac_loss: bool = False
+        self.low_battery: bool = False
+        self.cover_tampered: bool = False
+        self.last_updated_ticks: int = _ticks()
+        # called with a hub message target and argument for each change
+        self.on_change: Callable[[str, Payload], None] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def arming_state(self) -> ArmingState:
+        """Return the location arming state, taken from the first partition."""
+        return next(iter(self.partitions.values()))
+
+    def _changed(self, zone_ids: list[int] | None = None, partitions: bool = False) -> None:
+        """Note a change to the given zones or to the partitions; call with the lock held."""
+        self.last_updated_ticks = _ticks()
+        if self.on_change is None:
+            return
+        if zone_ids:
+            zones = [self._zone_info(self.zones[zone_id]) for zone_id in zone_ids]
+            self.on_change("ZoneStatusChanged", {"LocationID": self.location_id, "Zones": zones})
+        if partitions:
+            self.on_change(
+                "PartitionStatusChanged",
+                {
+                    "LocationID": self.location_id,
+                    "ArmingState": self.arming_state.value,
+                    "Partitions": self._partition_infos(),
+                },
+            )
+
+    @staticmethod
+    def _zone_info(zone: Payload) -> Payload:
+        """Return the ZoneInfo of a zone, as in fullStatus."""
+        return {
+            "ZoneID": zone["ZoneID"],
+            "ZoneDescription": zone["ZoneDescription"],
+            "ZoneStatus": zone["ZoneStatus"],
+            "PartitionID": zone["PartitionID"],
+            "CanBeBypassed": zone["CanBeBypassed"],
+            "AlarmTriggerTime": None,
+            "AlarmTriggerTimeLocalized": None,
+            "ZoneTypeId": zone["ZoneTypeId"],
+            "DeviceType": zone["DeviceType"],
+        }
+
+    def _partition_infos(self) -> list[Payload]:
+        """Return the PartitionInfo of each partition, as in fullStatus."""
+        return [
+            {
+                "PartitionName": f"Partition-{partition_id:02}",
+                "PartitionID": partition_id,
+                "PartitionArmingState": state.value,
+                "ArmingState": state.value,
+                "IsAlarmResponded": False,
+            }
+            for partition_id, state in self.partitions.items()
+        ]
+
+    def set_zone_status(self, zone_id: int, status: ZoneStatus) -> None:
+        """Set the status of a zone, e.g. to simulate a door opening."""
+        with self._lock:
+            self.zones[zone_id]["ZoneStatus"] = int(status)
+            self._changed([zone_id])
+
+    def location_info(self) -> Payload:
+        """Return the LocationInfoBasic of this location for sessiondetails."""
+        return {
+            "LocationID": self.location_id,
+            "LocationName": f"Location {self.location_id}",
+            "PhotoURL": "",
+            "LocationModuleFlags": "Security=1,Video=0,Automation=0,GPS=0,VideoPIR=0",
+            "SecurityDeviceID": self.security_device_id,
+            "DeviceList": [
+                {
+                    "DeviceID": self.security_device_id,
+                    "DeviceName": "Security System",
+                    "DeviceClassID": 1,
+                    "DeviceSerialNumber": f"{self.security_device_id:012}",
+                    "DeviceFlags": "PanelType=12,PanelVariant=1,PartitionCount="
+                    + str(len(self.partitions)),
+                    "SecurityPanelTypeID": 12,
+                    "DeviceSerialText": None,
+                }
+            ],
+        }
+
+    def full_status(self) -> Payload:
+        """Return the fullStatus response."""
+        with self._lock:
+            zones = [self._zone_info(zone) for zone in self.zones.values()]
+            partitions = self._partition_infos()
+            return {
+                "PanelStatus": {
+                    "Zones": zones,
+                    "IsCoverTampered": self.cover_tampered,
+                    "LastUpdatedTimestampTicks": self.last_updated_ticks,
+                    "ConfigurationSequenceNumber": 1,
+                    "IsInACLoss": self.ac_loss,
+                    "IsInLowBattery": self.low_battery,
+                    "Partitions": partitions,
+                },
+                "ArmingState": self.arming_state.value,
+                **_result(),
+            }
+
+    def zone_details(self) -> Payload:
+        """Return the partitions/zones/0 response."""
+        with self._lock:
+            zones = [
+                {
+                    "PartitionId": zone["PartitionID"],
+                    "Batterylevel": zone["Batterylevel"],
+                    "Signalstrength": zone["Signalstrength"],
+                    "zoneAdditionalInfo": {
+                        "SensorSerialNumber": f"{zone['ZoneID']:06}",
+                        "LoopNumber": 1,
+                        "ResponseType": "1",
+                        "AlarmReportState": 1,
+                        "ZoneSupervisionType": 0,
+                        "ChimeState": 1,
+                        "DeviceType": zone["DeviceType"],
+                    },
+                    "CanBeBypassed": zone["CanBeBypassed"],
+                    "ZoneID": zone["ZoneID"],
+                    "ZoneDescription": zone["ZoneDescription"],
+                    "ZoneStatus": zone["ZoneStatus"],
+                    "ZoneTypeId": zone["ZoneTypeId"],
+                }
+                for zone in self.zones.values()
+            ]
+            return {"ZoneStatus": {"Zones": zones}, **_result()}
+
+    def partition_config(self) -> Payload:
+        """Return the partitions/config response."""
+        with self._lock:
+            partitions = [
+                {
+                    "PartitionName": f"Partition-{partition_id:02}",
+                    "IsStayArmed": False,
+                    "IsFireEnabled": False,
+                    "IsCommonEnabled": False,
+                    "IsLocked": False,
+                    "IsNewPartition": False,
+                    "IsNightStayEnabled": 0,
+                    "ExitDelayTimer": 0,
+                    "PartitionID": partition_id,
+                    "PartitionArmingState": state.value,
+                    "ArmingState": state.value,
+                }
+                for partition_id, state in self.partitions.items()
+            ]
+            return {"Partitions": partitions, **_result()}
+
+    def _check_usercode(self, usercode: str | None) -> Payload | None:
+        if usercode is None or usercode.lstrip("0") != self.usercode.lstrip("0"):
+            return _result(_ResultCode.USER_CODE_INVALID.value, "Invalid user code")
+        return None
+
+    def _partition_ids(self, requested: list[str]) -> list[int]:
+        return [int(p) for p in requested] or list(self.partitions)
+
+    def arm(self, arm_type: int, usercode: str | None, partitions: list[str]) -> Payload:
+        """Arm the given partitions (all of them if none are given)."""
+        error = self._check_usercode(usercode)
+        if error:
+            return error
+        state = _ARMED_STATES.get(arm_type)
+        if state is None:
+            return _result(_ResultCode.COMMAND_FAILED.value, "Unknown arm type")
+        with self._lock:
+            for partition_id in self._partition_ids(partitions):
+                self.partitions[partition_id] = state
+            self._changed(partitions=True)
+        return _result()
+
+    def disarm(self, usercode: str | None, partitions: list[str]) -> Payload:
+        """Disarm the given partitions (all of them if none are given)."""
+        error = self._check_usercode(usercode)
+        if error:
+            return error
+        with self._lock:
+            for partition_id in self._partition_ids(partitions):
+                self.partitions[partition_id] = ArmingState.DISARMED
+            self._changed(partitions=True)
+        return _result()
+
+    def bypass(self, usercode: str | None, zone_ids: list[str]) -> Payload:
+        """Bypass zones. Fails if any of them cannot be bypassed."""
+        error = self._check_usercode(usercode)
+        if error:
+            return error
+        with self._lock:
+            zones = [self.zones.get(int(zone_id)) for zone_id in zone_ids]
+            if not zones or not all(zone and zone["CanBeBypassed"] for zone in zones):
+                return _result(_ResultCode.FAILED_TO_BYPASS_ZONE.value, "Failed to bypass zone")
+            for zone in zones:
+                assert zone is not None
+                zone["ZoneStatus"] |= ZoneStatus.BYPASSED.value
+            self._changed([zone["ZoneID"] for zone in zones if zone])
+        return _result()
+
+    def clear_bypass(self, usercode: str | None) -> Payload:
+        """Clear the bypass of all zones."""
+        error = self._check_usercode(usercode)
+        if error:
+            return error
+        with self._lock:
+            bypassed = [
+                zone["ZoneID"]
+                for zone in self.zones.values()
+                if zone["ZoneStatus"] & ZoneStatus.BYPASSED.value
+            ]
+            for zone in self.zones.values():
+                zone["ZoneStatus"] &= ~ZoneStatus.BYPASSED.value
+            self._changed(bypassed)
+        return _result()
+
+
+class StandInHub:
+    """A SignalR hub that pushes panel changes over long polling.
+
+    It speaks just enough of the protocol for push.py: negotiate, the JSON
+    protocol handshake, polls that wait for messages, and close. Each
+    change of a SimulatedPanel is sent to every connection as an
+    invocation of ZoneStatusChanged or PartitionStatusChanged.
+    """
+
+    def __init__(self, poll_timeout: float = 1.0) -> None:
+        """Initialize. A poll with no messages returns empty after poll_timeout."""
+        self.poll_timeout: float = poll_timeout
+        # queued frames by connection token; None once the handshake is due
+        self._queues: dict[str, list[str] | None] = {}
+        self._condition = threading.Condition()
+
+    @property
+    def connections(self) -> int:
+        """Return the number of open connections."""
+        with self._condition:
+            return len(self._queues)
+
+    def negotiate(self) -> Payload:
+        """Open a connection and return the negotiate response."""
+        token = secrets.token_hex(16)
+        with self._condition:
+            self._queues[token] = None
+        return {
+            "negotiateVersion": 1,
+            "connectionId": token,
+            "connectionToken": token,
+            "availableTransports": [{"transport": "LongPolling", "transferFormats": ["Text"]}],
+        }
+
+    def send(self, token: str) -> tuple[int, dict[str, str], Payload | str | None]:
+        """Accept a message from a client; the first one is the handshake."""
+        with self._condition:
+            if token not in self._queues:
+                return 404, {}, None
+            if self._queues[token] is None:
+                self._queues[token] = ["{}" + _RECORD_SEPARATOR]
+                self._condition.notify_all()
+        return 200, {}, ""
+
+    def poll(self, token: str) -> tuple[int, dict[str, str], Payload | str | None]:
+        """Return the queued messages, waiting up to poll_timeout for one."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: token not in self._queues or bool(self._queues[token]),
+                self.poll_timeout,
+            )
+            if token not in self._queues:
+                # the connection was closed
+                return 204, {}, None
+            frames = self._queues[token] or []
+            if self._queues[token] is not None:
+                self._queues[token] = []
+        return 200, {}, "".join(frames)
+
+    def close(self, token: str) -> tuple[int, dict[str, str], Payload | str | None]:
+        """Close a connection."""
+        self.disconnect(token)
+        return 202, {}, ""
+
+    def disconnect(self, token: str) -> None:
+        """Drop a connection; its pending poll ends with 204 No Content."""
+        with self._condition:
+            self._queues.pop(token, None)
+            self._condition.notify_all()
+
+    def disconnect_all(self) -> None:
+        """Drop every connection, as when the hub restarts."""
+        with self._condition:
+            self._queues.clear()
+            self._condition.notify_all()
+
+    def publish(self, target: str, *arguments: Any) -> None:
+        """Send an invocation of target to every connection."""
+        frame = json.dumps({"type": 1, "target": target, "arguments": list(arguments)})
+        with self._condition:
+            for queue in self._queues.values():
+                if queue is not None:
+                    queue.append(frame + _RECORD_SEPARATOR)
+            self._condition.notify_all()
+
+
+class StandInService:
+    """Answers Total Connect API requests from simulated panels.
+
+    handle() does the work for one request, so it can be driven over HTTP
+    by StandInServer or called directly.
+    """
+
+    def __init__(
+        self,
+        num_locations: int = 1,
+        num_zones: int = 8,
+        num_partitions: int = 1,
+        usercode: str = "1234",
+        credentials: tuple[str, str] | None = None,
+        seed: int | None = None,
+        etags: bool = False,
+    ) -> None:
+        """Initialize with num_locations identical panels.
+
+        If credentials (username, password) are given, other credentials
+        are rejected; otherwise any login succeeds.
+        seed makes the injected failures repeatable.
+        If etags is true, fullStatus responses have an ETag, and a request
+        with a matching If-None-Match is answered 304 Not Modified.
+        """
+        self.panels: dict[int, SimulatedPanel] = {}
+        for index in range(num_locations):
+            location_id = 1000001 + index
+            self.panels[location_id] = SimulatedPanel(
+                location_id, 2000001 + index, num_zones, num_partitions, usercode
+            )
+        self.credentials: tuple[str, str] | None = credentials
+        self.etags: bool = etags
+        self.hub: StandInHub = StandInHub()
+        for panel in self.panels.values():
+            panel.on_change = self.hub.publish
+        self.behaviors: dict[str, EndpointBehavior] = {}
+        self.default_behavior: EndpointBehavior = EndpointBehavior()
+        self.request_counts: Counter[str] = Counter()
+        self._tokens: set[str] = set()
+        self._key = RSA.generate(1024)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def behavior(self, endpoint: str) -> EndpointBehavior:
+        """Return the behavior of an endpoint."""
+        return self.behaviors.get(endpoint, self.default_behavior)
+
+    def set_behavior(self, endpoint: str, **kwargs: Any) -> EndpointBehavior:
+        """Set the behavior of an endpoint; kwargs are EndpointBehavior arguments."""
+        if endpoint not in ENDPOINTS:
+            raise ValueError(f"unknown endpoint {endpoint}")
+        behavior = EndpointBehavior(**kwargs)
+        self.behaviors[endpoint] = behavior
+        return behavior
+
+    def transport(self) -> FakeTransport:
+        """Return a transport that answers a client's requests in process."""
+        return FakeTransport(self)
+
+    def expire_sessions(self) -> None:
+        """Invalidate all access tokens, forcing clients to authenticate again."""
+        with self._lock:
+            self._tokens.clear()
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        query: Mapping[str, list[str]],
+        form: Mapping[str, list[str]],
+        headers: Mapping[str, str],
+    ) -> tuple[int, dict[str, str], Payload | str | None]:
+        """Answer one request. Return (HTTP status, headers, body).
+
+        The body is decoded JSON, or a string for the text of hub messages,
+        or None for no body. query and form are parsed with
+        urllib.parse.parse_qs().
+        """
+        route = _route(method, path)
+        if route is None:
+            return 404, {}, {"Message": f"No HTTP resource was found for {method} {path}"}
+        name, ids = route
+
+        behavior = self.behavior(name)
+        with self._lock:
+            self.request_counts[name] += 1
+            count = self.request_counts[name]
+            delay = behavior.latency + behavior.jitter * self._random.random()
+            error = self._pick_error(behavior)
+            authorized = name in _UNAUTHENTICATED or self._authorized(headers)
+        if delay > 0:
+            time.sleep(delay)
+
+        if not authorized:
+            return 401, {}, {"Message": "Authorization has been denied for this request."}
+        if count <= behavior.fail_first:
+            error = _ResultCode.CONNECTION_ERROR.value
+        if error is not None:
+            return self._error(error, behavior)
+
+        return self._dispatch(name, ids, query, form, headers)
+
+    def _authorized(self, headers: Mapping[str, str]) -> bool:
+        scheme, _, token = (headers.get("Authorization") or "").partition(" ")
+        return scheme == "Bearer" and token in self._tokens
+
+    def _pick_error(self, behavior: EndpointBehavior) -> int | None:
+        for error, rate in behavior.error_rates.items():
+            if rate > 0 and self._random.random() < rate:
+                return error
+        return None
+
+    def _error(self, error: int, behavior: EndpointBehavior) -> tuple[int, dict[str, str], Payload]:
+        message = _ERROR_MESSAGES.get(error, "Error")
+        if 400 <= error < 600:
+            headers = {}
+            if error == 429 and behavior.retry_after is not None:
+                headers["Retry-After"] = f"{behavior.retry_after:g}"
+            return error, headers, {"Message": message}
+        return 200, {}, _result(error, message)
+
+    def _dispatch(
+        self,
+        name: str,
+        ids: list[int],
+        query: Mapping[str, list[str]],
+        form: Mapping[str, list[str]],
+        headers: Mapping[str, str],
+    ) -> tuple[int, dict[str, str], Payload | str | None]:
+        def first(key: str) -> str | None:
+            values = form.get(key)
+            return values[0] if values else None
+
+        if name == "config":
+            return 200, {}, self._config()
+        if name == "token":
+            return self._token(first("username"), first("password"))
+        if name == "sessiondetails":
+            return 200, {}, self._session_details()
+        if name == "logout":
+            return 200, {}, _result()
+        if name == "negotiate":
+            return 200, {}, self.hub.negotiate()
+        if name in ("hubSend", "hubPoll", "hubClose"):
+            token = (query.get("id") or [""])[0]
+            if name == "hubSend":
+                return self.hub.send(token)
+            if name == "hubPoll":
+                return self.hub.poll(token)
+            return self.hub.close(token)
+
+        panel = self.panels.get(ids[0])
+        if panel is None or (len(ids) > 1 and ids[1] != panel.security_device_id):
+            return 404, {}, {"Message": "Location or device not found"}
+        if name == "fullStatus":
+            payload = panel.full_status()
+            if not self.etags:
+                return 200, {}, payload
+            body = json.dumps(payload, sort_keys=True).encode()
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            if headers.get("If-None-Match") == etag:
+                return 304, {"ETag": etag}, None
+            return 200, {"ETag": etag}, payload
+        if name == "zones":
+            return 200, {}, panel.zone_details()
+        if name == "partitions":
+            return 200, {}, panel.partition_config()
+        if name == "arm":
+            arm_type = int(first("armType") or -1)
+            return 200, {}, panel.arm(arm_type, first("userCode"), form.get("partitions", []))
+        if name == "disArm":
+            return 200, {}, panel.disarm(first("userCode"), form.get("partitions", []))
+        if name == "bypass":
+            return 200, {}, panel.bypass(first("UserCode"), form.get("ZoneIds", []))
+        # clearBypass
+        return 200, {}, panel.clear_bypass(first("userCode"))
+
+    def _config(self) -> Payload:
+        der = self._key.public_key().export_key(format="DER")
+        return {
+            "RevisionNumber": "1.0.0",
+            "version": "1.0.0.1",
+            "AppConfig": [
+                {
+                    "tc2APIKey": base64.b64encode(der).decode(),
+                    "tc2ClientId": "stand-in-client-id",
+                }
+            ],
+            "brandInfo": [{"AppID": 16808, "BrandName": "totalconnect"}],
+        }
+
+    def _decrypt(self, value: str | None) -> str | None:
+        if value is None:
+            return None
+        try:
+            plain = PKCS1_v1_5.new(self._key).decrypt(base64.b64decode(value), None)
+        except ValueError:
+            return None
+        return plain.decode() if plain else None
+
+    def _token(
+        self, username: str | None, password: str | None
+    ) -> tuple[int, dict[str, str], Payload]:
+        if self.credentials is not None and self.credentials != (
+            self._decrypt(username),
+            self._decrypt(password),
+        ):
+            return (
+                400,
+                {},
+                {
+                    "error": _ResultCode.BAD_USER_OR_PASSWORD.value,
+                    "error_description": "Bad username or password",
+                },
+            )
+        token = secrets.token_hex(16)
+        with self._lock:
+            self._tokens.add(token)
+        return (
+            200,
+            {},
+            {
+                "access_token": token,
+                "token_type": "Bearer",
+                "expires_in": 3600,
+                "refresh_token": secrets.token_hex(16),
+            },
+        )
+
+    def _session_details(self) -> Payload:
+        return {
+            "SessionDetailsResult": {
+                "ModuleFlags": "Security=1,Video=0,Automation=0,GPS=0,VideoPIR=0",
+                "UserInfo": {
+                    "UserID": 1,
+                    "Username": "stand-in",
+                    "UserFeatureList": (
+                        "Master=0,User Administration=0,Configuration Administration=0"
+                    ),
+                },
+                "Locations": [panel.location_info() for panel in self.panels.values()],
+            },
+            **_result(),
+        }
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: StandInService) -> None:
+        super().__init__(address, _Handler)
+        self.service: StandInService = service
+        self.connections: int = 0
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep connections open so connection reuse can be measured
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately; don't let them wait on delayed ACKs
+    disable_nagle_algorithm = True
+    server: _HTTPServer
+
+    def _handle(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        status, headers, payload = self.server.service.handle(
+            self.command,
+            url.path,
+            urllib.parse.parse_qs(url.query),
+            urllib.parse.parse_qs(body, keep_blank_values=True),
+            dict(self.headers.items()),
+        )
+        if isinstance(payload, str):
+            data = payload.encode()
+            content_type = "text/plain; charset=utf-8"
+        else:
+            data = b"" if payload is None else json.dumps(payload).encode()
+            content_type = "application/json; charset=utf-8"
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format: str, *args: Any) -> None:
+        LOGGER.debug(f"stand-in {self.address_string()}: {format % args}")
+
+
+class StandInServer:
+    """Serves a StandInService over HTTP on a local port.
+
+    Use it as a context manager, or call start() and stop().
+    """
+
+    def __init__(
+        self, service: StandInService | None = None, host: str = "127.0.0.1", port: int = 0
+    ) -> None:
+        """Initialize. Port 0 picks a free port when the server starts."""
+        self.service: StandInService = service or StandInService()
+        self._address = (host, port)
+        self._httpd: _HTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "StandInServer":
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop the server."""
+        self.stop()
+
+    def start(self) -> "StandInServer":
+        """Start serving in a background thread."""
+        self._httpd = _HTTPServer(self._address, self.service)
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="total-connect-stand-in",
+            daemon=True,
+        )
+        self._thread.start()
+        LOGGER.info(f"stand-in server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Return the origin of the running server, e.g. http://127.0.0.1:8080."""
+        if self._httpd is None:
+            raise RuntimeError("stand-in server is not running")
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def connections(self) -> int:
+        """Return the number of TCP connections accepted so far."""
+        return self._httpd.connections if self._httpd else 0
+
+    def transport(self, **kwargs: Any) -> RedirectTransport:
+        """Return a transport that sends a client's requests to this server.
+
+        kwargs are passed to RedirectTransport (and on to HTTPAdapter).
+        """
+        return RedirectTransport(self.url, **kwargs)
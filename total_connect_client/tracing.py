@@ -0,0 +1,143 @@
+"""Optional tracing of TotalConnectClient API calls.
+
+Pass a tracer to TotalConnectClient(tracer=...) and the client opens a
+span around each of these, nested as they happen:
+
+  total_connect.authenticate     logging in, including re-authentication
+  total_connect.session_details  loading the session and its locations
+  total_connect.load_details     the initial fetch for all locations
+  total_connect.load_location    the initial fetch for one location
+  total_connect.http_request     one API call, including its retries
+  total_connect.attempt          one attempt of an API call
+  total_connect.update_status    applying a location's panel status
+  total_connect.update_partitions  applying a location's partition statuses
+  total_connect.update_zones     applying a location's zone statuses
+
+Spans carry the ATTR_* attributes below where they apply.
+
+An OpenTelemetry tracer, e.g. opentelemetry.trace.get_tracer(__name__),
+can be passed directly; OpenTelemetry is not required. Without a tracer
+the client uses NO_OP_TRACER, which does nothing. RecordingTracer keeps
+spans in memory, which is handy for debugging and tests.
+"""
+
+import contextvars
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import AbstractContextManager, contextmanager
+from typing import Any, Final, Protocol
+
+ATTR_LOCATION_ID: Final[str] = "total_connect.location_id"
+ATTR_ENDPOINT: Final[str] = "total_connect.endpoint"  # see const.endpoint_template()
+ATTR_METHOD: Final[str] = "http.request.method"
+ATTR_RESULT_CODE: Final[str] = "total_connect.result_code"
+ATTR_ATTEMPT: Final[str] = "total_connect.attempt"  # 1 for the first attempt
+
+
+class Span(Protocol):
+    """The part of an OpenTelemetry Span used by the client."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute of the span."""
+
+
+class Tracer(Protocol):
+    """The part of an OpenTelemetry Tracer used by the client."""
+
+    def start_as_current_span(
+        self, name: str, *, attributes: Mapping[str, Any] | None = None
+    ) -> AbstractContextManager[Span]:
+        """Return a context manager that opens a span as the current span."""
+
+
+class _NoOpSpan:
+    """A span that does nothing, and is its own context manager."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Do nothing."""
+
+    def __enter__(self) -> "_NoOpSpan":
+        """Return this span."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Do nothing."""
+
+
+_NO_OP_SPAN: Final = _NoOpSpan()
+
+
+class NoOpTracer:
+    """A tracer that does nothing. This is the default."""
+
+    __slots__ = ()
+
+    def start_as_current_span(
+        self, name: str, *, attributes: Mapping[str, Any] | None = None
+    ) -> _NoOpSpan:
+        """Return a span that does nothing."""
+        return _NO_OP_SPAN
+
+
+NO_OP_TRACER: Final = NoOpTracer()
+
+
+class RecordedSpan:
+    """A span kept by RecordingTracer."""
+
+    def __init__(self, name: str, attributes: Mapping[str, Any], parent: "RecordedSpan | None"):
+        """Initialize and start the span."""
+        self.name: str = name
+        self.attributes: dict[str, Any] = dict(attributes)
+        self.parent: RecordedSpan | None = parent
+        self.start: float = time.perf_counter()
+        self.end: float | None = None
+        self.exception: BaseException | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute of the span."""
+        self.attributes[key] = value
+
+    @property
+    def duration(self) -> float:
+        """Return the duration in seconds, so far if the span is still open."""
+        return (self.end or time.perf_counter()) - self.start
+
+    def __repr__(self) -> str:
+        """Return a short description of the span."""
+        return f"<RecordedSpan {self.name} {self.attributes} {self.duration:.6f}s>"
+
+
+class RecordingTracer:
+    """A tracer that keeps every span in memory, in the order they started."""
+
+    def __init__(self) -> None:
+        """Initialize with no spans."""
+        self.spans: list[RecordedSpan] = []
+        self._current: contextvars.ContextVar[RecordedSpan | None] = contextvars.ContextVar(
+            f"total_connect_span_{id(self)}", default=None
+        )
+
+    @contextmanager
+    def start_as_current_span(
+        self, name: str, *, attributes: Mapping[str, Any] | None = None
+    ) -> Iterator[RecordedSpan]:
+        """Open a span as a child of the current span of this context."""
+        parent = self._current.get()
+        span = RecordedSpan(name, attributes or {}, parent)
+        self.spans.append(span)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.exception = exc
+            raise
+        finally:
+            span.end = time.perf_counter()
+            self._current.reset(token)
+
+    def find(self, name: str) -> list[RecordedSpan]:
+        """Return the spans with the given name."""
+        return [span for span in self.spans if span.name == name]
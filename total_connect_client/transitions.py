@@ -0,0 +1,107 @@
+"""Fixed-size, in-memory history of one zone's state.
+
+TotalConnectClient(zone_transitions=N) gives each zone a
+ZoneTransitions that keeps its last N transitions: when the zone is
+created, and each time an update changes its status, battery level or
+signal strength, the new values are written into the next row of a ring
+buffer, over the oldest row once it is full.
+
+The buffer is four preallocated arrays (the same struct-of-arrays layout
+as ZoneTable), so its memory is fixed when the zone is created and
+recording a transition allocates nothing. A transition is stamped with
+the LastUpdatedTimestampTicks of the panel status it came from, or
+MISSING if it came from elsewhere: the zone details, a push message or
+a bypass.
+
+    ticks, statuses, battery_levels, signal_strengths = zone.transitions.last(10)
+"""
+
+from array import array
+from typing import NamedTuple
+
+from .zone_table import MISSING
+
+
+class TransitionColumns(NamedTuple):
+    """Transitions oldest first, as parallel arrays; see ZoneTransitions.last()."""
+
+    ticks: "array[int]"
+    statuses: "array[int]"
+    battery_levels: "array[int]"
+    signal_strengths: "array[int]"
+
+
+class ZoneTransitions:
+    """A ring buffer of the last transitions of a zone."""
+
+    __slots__ = (
+        "capacity",
+        "_ticks",
+        "_statuses",
+        "_battery_levels",
+        "_signal_strengths",
+        "_next",
+        "_count",
+    )
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize empty, with room for capacity transitions."""
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, not {capacity}")
+        self.capacity: int = capacity
+        self._ticks: array[int] = array("q", [MISSING]) * capacity
+        self._statuses: array[int] = array("q", [MISSING]) * capacity
+        self._battery_levels: array[int] = array("q", [MISSING]) * capacity
+        self._signal_strengths: array[int] = array("q", [MISSING]) * capacity
+        self._next: int = 0
+        self._count: int = 0
+
+    def __len__(self) -> int:
+        """Return the number of transitions kept."""
+        return self._count
+
+    def __repr__(self) -> str:
+        """Return a short description of the buffer."""
+        return f"<ZoneTransitions {self._count}/{self.capacity}>"
+
+    def append(
+        self, ticks: int | None, status: int, battery_level: int | None, signal_strength: int | None
+    ) -> None:
+        """Record a transition, replacing the oldest if the buffer is full."""
+        row = self._next
+        self._ticks[row] = MISSING if ticks is None else ticks
+        self._statuses[row] = status
+        self._battery_levels[row] = MISSING if battery_level is None else battery_level
+        self._signal_strengths[row] = MISSING if signal_strength is None else signal_strength
+        self._next = 0 if row + 1 == self.capacity else row + 1
+        if self._count < self.capacity:
+            self._count += 1
+
+    def is_last(self, status: int, battery_level: int | None, signal_strength: int | None) -> bool:
+        """Return whether these are the values of the last transition recorded."""
+        if not self._count:
+            return False
+        # -1 is the last row when _next has wrapped around to 0
+        row = self._next - 1
+        return (
+            self._statuses[row] == status
+            and self._battery_levels[row] == (MISSING if battery_level is None else battery_level)
+            and self._signal_strengths[row]
+            == (MISSING if signal_strength is None else signal_strength)
+        )
+
+    def last(self, count: int | None = None) -> TransitionColumns:
+        """Return the last count transitions (all kept if None), oldest first."""
+        count = self._count if count is None else max(0, min(count, self._count))
+        start = (self._next - count) % self.capacity
+        end = start + count
+        columns = (self._ticks, self._statuses, self._battery_levels, self._signal_strengths)
+        if end <= self.capacity:
+            return TransitionColumns(*(column[start:end] for column in columns))
+        end -= self.capacity
+        return TransitionColumns(*(column[start:] + column[:end] for column in columns))
+
+    def clear(self) -> None:
+        """Forget all transitions."""
+        self._next = 0
+        self._count = 0
@@ -0,0 +1,118 @@
+"""Transport adapters for TotalConnectClient.
+
+TotalConnectClient(..., transport=adapter) sends every HTTPS request,
+including authentication, through the given requests transport adapter
+instead of the default one.
+
+RedirectTransport sends the requests to another server, such as the
+local stand-in in the standin module. FakeTransport answers them in
+process from a StandInService, without sockets or HTTP parsing, so the
+client's own CPU cost can be measured apart from I/O.
+"""
+
+import http.client
+import json
+import urllib.parse
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+if TYPE_CHECKING:
+    from .standin import StandInService
+
+
+class RedirectTransport(HTTPAdapter):
+    """Send requests for the Total Connect hosts to another origin.
+
+    Only the scheme, host and port are replaced; the path and query are
+    kept. This is how a client is pointed at the local stand-in server.
+    The client still uses the https:// endpoint URLs, so OAuth2 does not
+    object to the plain HTTP origin.
+    """
+
+    def __init__(self, origin: str, **kwargs: Any) -> None:
+        """Initialize with an origin such as 'http://127.0.0.1:8080'.
+
+        Other arguments are passed to HTTPAdapter.
+        """
+        super().__init__(**kwargs)
+        parsed = urllib.parse.urlsplit(origin)
+        self.scheme: str = parsed.scheme
+        self.netloc: str = parsed.netloc
+
+    def send(  # type: ignore[override]
+        self, request: PreparedRequest, **kwargs: Any
+    ) -> Response:
+        """Rewrite the request URL, then send it."""
+        request = request.copy()
+        request.url = self.rewrite(request.url or "")
+        return super().send(request, **kwargs)
+
+    def rewrite(self, url: str) -> str:
+        """Return url with its scheme and host replaced by the origin."""
+        parts = urllib.parse.urlsplit(url)
+        return urllib.parse.urlunsplit((self.scheme, self.netloc, *parts[2:]))
+
+
+class FakeTransport(BaseAdapter):
+    """Answer requests in process from a StandInService.
+
+    The service sees the same method, path, query, form data and headers
+    as it would over HTTP; only the socket and HTTP parsing are skipped.
+    """
+
+    def __init__(self, service: "StandInService") -> None:
+        """Initialize with the service that answers requests."""
+        super().__init__()
+        self.service: StandInService = service
+
+    def send(  # type: ignore[override]
+        self, request: PreparedRequest, **kwargs: Any
+    ) -> Response:
+        """Answer the request."""
+        url = urllib.parse.urlsplit(request.url or "")
+        body = request.body or ""
+        if isinstance(body, bytes):
+            body = body.decode()
+        status, headers, payload = self.service.handle(
+            request.method or "GET",
+            url.path,
+            urllib.parse.parse_qs(url.query),
+            urllib.parse.parse_qs(body, keep_blank_values=True),
+            request.headers,
+        )
+        return json_response(request, status, payload, headers)
+
+    def close(self) -> None:
+        """Nothing to clean up."""
+
+
+def json_response(
+    request: PreparedRequest,
+    status: int,
+    payload: Any,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """Return a requests Response to request with payload as its JSON body.
+
+    A payload of None gives an empty body, e.g. for 304 Not Modified, and
+    a string is sent as plain text.
+    """
+    if isinstance(payload, str):
+        content_type = "text/plain; charset=utf-8"
+        content = payload.encode()
+    else:
+        content_type = "application/json; charset=utf-8"
+        content = b"" if payload is None else json.dumps(payload).encode()
+    response = Response()
+    response.status_code = status
+    response.reason = http.client.responses.get(status, "")
+    response.headers = CaseInsensitiveDict({"Content-Type": content_type, **(headers or {})})
+    response._content = content
+    response.encoding = "utf-8"
+    response.url = request.url or ""
+    response.request = request
+    return response
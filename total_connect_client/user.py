@@ -3,17 +3,22 @@
 import logging
 from typing import Any
 
+from .flags import parse_flags
+from .schema import USER_INFO, UserInfo
+
 LOGGER = logging.getLogger(__name__)
 
 
 class TotalConnectUser:
     """User for Total Connect."""
 
-    def __init__(self, user_info: dict[str, Any]) -> None:
-        """Initialize based on UserInfo from LoginAndGetSessionDetails."""
-        self._user_id = user_info["UserID"]
-        self._username = user_info["Username"]
-        self._features = dict(x.split("=") for x in user_info["UserFeatureList"].split(","))
+    def __init__(self, user_info: dict[str, Any] | UserInfo) -> None:
+        """Initialize based on UserInfo from LoginAndGetSessionDetails, parsed or not."""
+        if not isinstance(user_info, UserInfo):
+            user_info = USER_INFO.parse(user_info)
+        self._user_id = user_info.user_id
+        self._username = user_info.username
+        self._features = parse_flags(user_info.user_feature_list)
         self._master_user = self._features["Master"] == "1"
         self._user_admin = self._features["User Administration"] == "1"
         self._config_admin = self._features["Configuration Administration"] == "1"
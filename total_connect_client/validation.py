@@ -0,0 +1,72 @@
+"""Per-endpoint validation of API responses.
+
+The Total Connect servers sometimes answer with ResultCode 0 but leave
+out a section that the response always has. TotalConnectClient runs the
+validator for the endpoint (see const.endpoint_template()) on each
+successful response inside its retry loop, so such a response raises
+PartialResponseError and only that request is retried, instead of the
+error surfacing after the request has returned. The validators are the
+parsers of the response schemas (see schema.py). A validated response is
+returned as a ValidatedResponse that keeps the validator's record, and
+parse_response() reuses it, so each response is parsed only once.
+
+TotalConnectClient.response_validators starts as a copy of
+RESPONSE_VALIDATORS.
+"""
+
+from collections.abc import Callable
+from typing import Any, Final, TypeVar, cast
+
+from .const import _ResultCode
+from .retry import ZONE_DETAILS_ENDPOINT
+from .schema import FULL_STATUS, PARTITIONS_CONFIG, SESSION_DETAILS_RESPONSE, ZONE_DETAILS
+
+# raises PartialResponseError if the response is incomplete
+ResponseValidator = Callable[[dict[str, Any]], object]
+
+R = TypeVar("R")
+
+FULL_STATUS_ENDPOINT: Final[str] = "api/v3/locations/{id}/partitions/fullStatus"
+PARTITIONS_CONFIG_ENDPOINT: Final[str] = "api/v1/locations/{id}/devices/{id}/partitions/config"
+SESSION_DETAILS_ENDPOINT: Final[str] = "api/v3/authentication/sessiondetails"
+
+RESPONSE_VALIDATORS: Final[dict[str, ResponseValidator]] = {
+    FULL_STATUS_ENDPOINT: FULL_STATUS.parse,
+    PARTITIONS_CONFIG_ENDPOINT: PARTITIONS_CONFIG.parse,
+    ZONE_DETAILS_ENDPOINT: ZONE_DETAILS.parse,
+    SESSION_DETAILS_ENDPOINT: SESSION_DETAILS_RESPONSE.parse,
+}
+
+
+class ValidatedResponse(dict[str, Any]):
+    """A response, with the validator that accepted it and the record it returned."""
+
+    __slots__ = ("validator", "record")
+
+    def __init__(
+        self, response: dict[str, Any], validator: ResponseValidator, record: object
+    ) -> None:
+        """Initialize as a copy of response."""
+        super().__init__(response)
+        self.validator: ResponseValidator = validator
+        self.record: object = record
+
+
+def validate(
+    validators: dict[str, ResponseValidator], endpoint: str, response: dict[str, Any]
+) -> dict[str, Any]:
+    """Run the validator for endpoint on response, if it succeeded and there is one.
+
+    Return the response, as a ValidatedResponse if it was validated.
+    """
+    validator = validators.get(endpoint)
+    if validator is None or _ResultCode.from_response(response) != _ResultCode.SUCCESS:
+        return response
+    return ValidatedResponse(response, validator, validator(response))
+
+
+def parse_response(response: dict[str, Any], parse: Callable[[dict[str, Any]], R]) -> R:
+    """Return parse(response), reusing the record if parse validated it already."""
+    if isinstance(response, ValidatedResponse) and response.validator is parse:
+        return cast(R, response.record)
+    return parse(response)
@@ -1,14 +1,17 @@
 """Total Connect Zone."""
 
 import logging
+from collections.abc import Mapping
 from enum import Enum, IntFlag
 from typing import TYPE_CHECKING, Any, Final
 
 from .const import PROJECT_URL
 from .exceptions import TotalConnectError
+from .schema import ZONE
 
 if TYPE_CHECKING:
     from .location import TotalConnectLocation
+    from .transitions import ZoneTransitions
 
 LOGGER: Final = logging.getLogger(__name__)
 
@@ -81,11 +84,132 @@ class ZoneType(Enum):
     VISTA_CONFIGURABLE_93 = 93
 
 
+class ZoneCategory(IntFlag):
+    """Categories of zone, used by the TotalConnectZone.is_type_*() predicates.
+
+    A zone type can be in more than one category.
+    """
+
+    NONE = 0
+    SECURITY = 1
+    BUTTON = 2
+    MOTION = 4
+    FIRE = 8
+    TEMPERATURE = 16
+    CARBON_MONOXIDE = 32
+    MEDICAL = 64
+    KEYPAD = 128
+
+
+ZONE_TYPE_CATEGORIES: Final[dict[ZoneCategory, tuple[ZoneType, ...]]] = {
+    ZoneCategory.SECURITY: (
+        ZoneType.SECURITY,
+        ZoneType.ENTRY_EXIT1,
+        ZoneType.ENTRY_EXIT2,
+        ZoneType.PERIMETER,
+        ZoneType.INTERIOR_FOLLOWER,
+        ZoneType.TROUBLE_ALARM,
+        ZoneType.SILENT_24HR,
+        ZoneType.AUDIBLE_24HR,
+        ZoneType.INTERIOR_DELAY,
+        ZoneType.LYRIC_LOCAL_ALARM,
+        ZoneType.PROA7_GARAGE_MONITOR,
+    ),
+    # as seen so far, any security zone that cannot be bypassed is also a button
+    # on a panel; TotalConnectZone adds that case since it depends on the zone
+    ZoneCategory.BUTTON: (
+        ZoneType.PROA7_MEDICAL,
+        ZoneType.AUDIBLE_24HR,
+        ZoneType.SILENT_24HR,
+        ZoneType.RF_ARM_STAY,
+        ZoneType.RF_ARM_AWAY,
+        ZoneType.RF_DISARM,
+    ),
+    ZoneCategory.MOTION: (ZoneType.INTERIOR_FOLLOWER,),
+    ZoneCategory.FIRE: (ZoneType.FIRE_SMOKE,),
+    ZoneCategory.TEMPERATURE: (ZoneType.MONITOR,),
+    ZoneCategory.CARBON_MONOXIDE: (ZoneType.CARBON_MONOXIDE,),
+    ZoneCategory.MEDICAL: (ZoneType.PROA7_MEDICAL,),
+    ZoneCategory.KEYPAD: (ZoneType.LYRIC_KEYPAD,),
+}
+
+"""
+Panels that report zone types differently can replace the categories of
+some zone types. Keys are the (DeviceClassID, PanelType, PanelVariant)
+keys of device.MODEL_LOOKUP. Zone type keys are ZoneType members, or raw
+values for zone types that are not in the ZoneType enum.
+"""
+PANEL_ZONE_CATEGORIES: Final[dict[tuple[int, int, int], dict[ZoneType | int, ZoneCategory]]] = {}
+
+# ZoneType compiled into a bitmask of ZoneCategory values
+_ZONE_TYPE_MASKS: Final[dict[ZoneType | int, int]] = dict.fromkeys(ZoneType, 0)
+for _category, _zone_types in ZONE_TYPE_CATEGORIES.items():
+    for _zone_type in _zone_types:
+        _ZONE_TYPE_MASKS[_zone_type] |= _category.value
+del _category, _zone_types, _zone_type
+
+# plain ints, because a bit test against an IntFlag member is much slower
+_SECURITY: Final[int] = ZoneCategory.SECURITY.value
+_BUTTON: Final[int] = ZoneCategory.BUTTON.value
+_MOTION: Final[int] = ZoneCategory.MOTION.value
+_FIRE: Final[int] = ZoneCategory.FIRE.value
+_TEMPERATURE: Final[int] = ZoneCategory.TEMPERATURE.value
+_CARBON_MONOXIDE: Final[int] = ZoneCategory.CARBON_MONOXIDE.value
+_MEDICAL: Final[int] = ZoneCategory.MEDICAL.value
+_KEYPAD: Final[int] = ZoneCategory.KEYPAD.value
+
+# ZoneType by raw value, and by member since callers may pass either
+_ZONE_TYPES: Final[dict[Any, ZoneType]] = {
+    **{member.value: member for member in ZoneType},
+    **{member: member for member in ZoneType},
+}
+
+# ZoneStatus by raw value, filled as values are seen. Only values without
+# unknown bits are cached, so those keep being reported on every update.
+_ZONE_STATUSES: dict[Any, ZoneStatus] = {}
+_MAX_CACHED_ZONE_STATUSES: Final[int] = 1024
+
+
+def _zone_status(value: Any, zone: dict[str, Any]) -> ZoneStatus:
+    """Return the ZoneStatus of the value from zone data, raising TotalConnectError if invalid."""
+    try:
+        return _ZONE_STATUSES[value]
+    except (KeyError, TypeError):
+        pass
+
+    try:
+        if value is None:
+            raise ValueError("ZoneStatus is required")
+        status = ZoneStatus(value)
+    except ValueError:
+        LOGGER.error(f"invalid ZoneStatus {value} in {zone}: please report at {PROJECT_URL}/issues")
+        raise TotalConnectError(f"unknown ZoneStatus in {zone}") from None
+
+    if status & ~ZoneStatus.KNOWN > 0:
+        LOGGER.warning(
+            f"unknown ZoneStatus {value} in {zone}: please report at {PROJECT_URL}/issues"
+        )
+    elif len(_ZONE_STATUSES) < _MAX_CACHED_ZONE_STATUSES:
+        _ZONE_STATUSES[value] = status
+    return status
+
+
 class TotalConnectZone:
     """Do not create instances of this class yourself."""
 
-    def __init__(self, zone: dict[str, Any], parent_location: "TotalConnectLocation") -> None:
-        """Initialize."""
+    def __init__(
+        self,
+        zone: dict[str, Any],
+        parent_location: "TotalConnectLocation",
+        category_overrides: Mapping[ZoneType | int, ZoneCategory] | None = None,
+        transitions: "ZoneTransitions | None" = None,
+    ) -> None:
+        """Initialize.
+
+        category_overrides replaces the categories of some zone types, see
+        PANEL_ZONE_CATEGORIES. transitions, if given, records the changes of
+        the zone.
+        """
         zone_id = zone.get("ZoneID")
         if zone_id is None:
             raise TotalConnectError("ZoneID is required")
@@ -105,7 +229,11 @@ class TotalConnectZone:
         self.chime_state: int | None = None
         self.device_type: int | None = None
         self._unknown_type_reported: bool = False
+        self._last_update: dict[str, Any] | None = None
+        self._category_overrides = category_overrides
+        self._categories: int = 0
         self.description: str | None  # Set by _update()
+        self.transitions: ZoneTransitions | None = transitions
         self._update(zone)
 
     def __str__(self) -> str:  # pragma: no cover
@@ -151,104 +279,92 @@ class TotalConnectZone:
         """Return true if zone is triggered."""
         return self.status & ZoneStatus.TRIGGERED > 0
 
+    @property
+    def categories(self) -> ZoneCategory:
+        """Return the categories of this zone."""
+        return ZoneCategory(self._categories)
+
+    def in_category(self, category: ZoneCategory) -> bool:
+        """Return true if the zone is in any of the given categories."""
+        return self._categories & category.value != 0
+
     def is_type_button(self) -> bool:
         """Return true if zone is a button."""
-        # as seen so far, any security zone that cannot be bypassed
-        # is a button on a panel
-        if self.is_type_security() and not self.can_be_bypassed:
-            return True
-
-        if self.zone_type_id in (
-            ZoneType.PROA7_MEDICAL,
-            ZoneType.AUDIBLE_24HR,
-            ZoneType.SILENT_24HR,
-            ZoneType.RF_ARM_STAY,
-            ZoneType.RF_ARM_AWAY,
-            ZoneType.RF_DISARM,
-        ):
-            return True
-
-        return False
+        return self._categories & _BUTTON != 0
 
     def is_type_security(self) -> bool:
         """Return true if zone type is security."""
-        return self.zone_type_id in (
-            ZoneType.SECURITY,
-            ZoneType.ENTRY_EXIT1,
-            ZoneType.ENTRY_EXIT2,
-            ZoneType.PERIMETER,
-            ZoneType.INTERIOR_FOLLOWER,
-            ZoneType.TROUBLE_ALARM,
-            ZoneType.SILENT_24HR,
-            ZoneType.AUDIBLE_24HR,
-            ZoneType.INTERIOR_DELAY,
-            ZoneType.LYRIC_LOCAL_ALARM,
-            ZoneType.PROA7_GARAGE_MONITOR,
-        )
+        return self._categories & _SECURITY != 0
 
     def is_type_motion(self) -> bool:
         """Return true if zone type is motion."""
-        return self.zone_type_id == ZoneType.INTERIOR_FOLLOWER
+        return self._categories & _MOTION != 0
 
     def is_type_fire(self) -> bool:
         """Return true if zone type is fire or smoke."""
-        return self.zone_type_id == ZoneType.FIRE_SMOKE
+        return self._categories & _FIRE != 0
 
     def is_type_temperature(self) -> bool:
         """Return true if zone monitors the temperature."""
-        return self.zone_type_id == ZoneType.MONITOR
+        return self._categories & _TEMPERATURE != 0
 
     def is_type_carbon_monoxide(self) -> bool:
         """Return true if zone type is carbon monoxide."""
-        return self.zone_type_id == ZoneType.CARBON_MONOXIDE
+        return self._categories & _CARBON_MONOXIDE != 0
 
     def is_type_medical(self) -> bool:
         """Return true if zone type is medical."""
-        return self.zone_type_id == ZoneType.PROA7_MEDICAL
+        return self._categories & _MEDICAL != 0
 
     def is_type_keypad(self) -> bool:
         """Return true if zone type is keypad."""
-        return self.zone_type_id == ZoneType.LYRIC_KEYPAD
+        return self._categories & _KEYPAD != 0
+
+    def _classify(self) -> int:
+        """Return the ZoneCategory bitmask for the current zone type."""
+        zone_type = self.zone_type_id
+        if zone_type is None:
+            return 0
+        try:
+            if self._category_overrides and zone_type in self._category_overrides:
+                categories = self._category_overrides[zone_type].value
+            else:
+                categories = _ZONE_TYPE_MASKS.get(zone_type, 0)
+        except TypeError:
+            # an unhashable raw zone type is in no category
+            categories = 0
+
+        if categories & _SECURITY and not self.can_be_bypassed:
+            categories |= _BUTTON
+        return categories
 
     def _update(self, zone: dict[str, Any]) -> None:
-        """Update zone state from zone data."""
+        """Update zone state from zone data.
+
+        Most zones are unchanged from one poll to the next, so data equal
+        to the last update applied returns without doing anything.
+        """
         if not zone:
             raise TotalConnectError("Missing data in zone update")
+        if zone == self._last_update:
+            return
 
-        zid = zone.get("ZoneID")
-        if not self.zoneid == zid:
+        record = ZONE.parse(zone)
+        if not self.zoneid == record.zone_id:
             raise TotalConnectError("Zone ID mismatch")
 
-        self.description = zone.get("ZoneDescription")
-        # ZoneInfo gives 'PartitionID' but
-        # ZoneStatusInfoWithPartitionId gives 'PartitionId'
-        partition_value = zone.get("PartitionId") or zone.get("PartitionID")
-        self.partition = partition_value if partition_value is not None else 0
-
-        try:
-            zone_status_value = zone.get("ZoneStatus")
-            if zone_status_value is None:
-                raise ValueError("ZoneStatus is required")
-            status = ZoneStatus(zone_status_value)
-            if status & ~ZoneStatus.KNOWN > 0:
-                LOGGER.warning(
-                    f"unknown ZoneStatus {zone.get('ZoneStatus')} in {zone}: please report at {PROJECT_URL}/issues"
-                )
-            self.status = status
-
-        except ValueError:
-            LOGGER.error(
-                f"invalid ZoneStatus {zone.get('ZoneStatus')} in {zone}: please report at {PROJECT_URL}/issues"
-            )
-            raise TotalConnectError(f"unknown ZoneStatus in {zone}") from None
-
-        self.can_be_bypassed = zone.get("CanBeBypassed")
+        self.description = record.description
+        self.partition = record.partition if record.partition is not None else 0
+        self.status = _zone_status(record.status, zone)
+        self.can_be_bypassed = record.can_be_bypassed
 
+        # fields that are only in ZoneStatusInfoWithPartitionId are kept when
+        # missing, but cleared when they are given as null
+        zid = record.zone_type_id if "ZoneTypeId" in zone else self.zone_type_id
+        # TODO: if zid is None should we raise PartialResponseError?
         try:
-            zid = zone.get("ZoneTypeId", self.zone_type_id)
-            # TODO: if zid is None should we raise PartialResponseError?
-            self.zone_type_id = None if zid is None else ZoneType(zid)
-        except ValueError:
+            self.zone_type_id = None if zid is None else _ZONE_TYPES[zid]
+        except (KeyError, TypeError):
             # if we get an unknown ZoneType we do not raise an exception, because
             # we know there are more zone types than we have in our enum, and
             # having an unknown ZoneType doesn't keep us from doing our work
@@ -259,21 +375,48 @@ class TotalConnectZone:
                 self._unknown_type_reported = True
             self.zone_type_id = zid
 
-        self.battery_level = zone.get("Batterylevel", self.battery_level)
-        self.signal_strength = zone.get("Signalstrength", self.signal_strength)
-        info = zone.get("zoneAdditionalInfo")
-        if info:
-            self.sensor_serial_number = info.get("SensorSerialNumber")
-            self.loop_number = info.get("LoopNumber")
-            self.response_type = info.get("ResponseType")
-            self.alarm_report_state = info.get("AlarmReportState")
-            self.supervision_type = info.get("ZoneSupervisionType")
-            self.chime_state = info.get("ChimeState")
-            self.device_type = info.get("DeviceType")
+        if "Batterylevel" in zone:
+            self.battery_level = record.battery_level
+        if "Signalstrength" in zone:
+            self.signal_strength = record.signal_strength
+        info = record.additional_info
+        if info is not None:
+            self.sensor_serial_number = info.sensor_serial_number
+            self.loop_number = info.loop_number
+            self.response_type = info.response_type
+            self.alarm_report_state = info.alarm_report_state
+            self.supervision_type = info.supervision_type
+            self.chime_state = info.chime_state
+            self.device_type = info.device_type
+
+        self._categories = self._classify()
+        self._last_update = zone.copy()
+        if self.transitions is not None:
+            self._record_transition()
+        if self._parent_location is not None:
+            self._parent_location._index_zone(self)
+
+    def _record_transition(self) -> None:
+        """Record the state in transitions if it differs from the last one recorded."""
+        transitions = self.transitions
+        assert transitions is not None
+        if transitions.is_last(self.status, self.battery_level, self.signal_strength):
+            return
+        location = self._parent_location
+        # None unless the update came from a panel status
+        ticks = location._status_ticks if location is not None else None
+        transitions.append(ticks, self.status, self.battery_level, self.signal_strength)
 
     def _mark_as_bypassed(self) -> None:
         """Set is_bypassed status."""
         self.status |= ZoneStatus.BYPASSED
+        # the next update must be applied even if the data is unchanged
+        self._last_update = None
+        if self.transitions is not None:
+            self._record_transition()
+        if self._parent_location is not None:
+            self._parent_location._index_zone(self)
+            self._parent_location._forget_panel_status()
 
     def bypass(self) -> None:
         """Bypass the zone."""
@@ -0,0 +1,189 @@
+"""Columnar view of Total Connect zones.
+
+A ZoneTable holds one row per zone, stored as parallel arrays (a
+"struct of arrays") instead of one TotalConnectZone object per zone.
+Status queries run over the whole table in a single pass inside the
+interpreter's C loops, which matters when monitoring many locations.
+
+numpy is deliberately not required: the standard library array module
+gives compact typed columns, and itertools.compress does the selection.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator
+from itertools import compress, repeat
+from operator import eq
+from typing import TYPE_CHECKING
+
+from .zone import TotalConnectZone, ZoneStatus, ZoneType
+
+if TYPE_CHECKING:
+    from .location import TotalConnectLocation
+
+# value stored in a numeric column when the API did not provide one
+MISSING: int = -1
+
+
+class ZoneTable:
+    """Struct-of-arrays table of zone state.
+
+    Each column is an array with one entry per row. Rows are appended in
+    the order the zones were added, and the row index is the same across
+    all columns.
+    """
+
+    __slots__ = (
+        "location_ids",
+        "zone_ids",
+        "statuses",
+        "partitions",
+        "zone_types",
+        "battery_levels",
+        "signal_strengths",
+    )
+
+    def __init__(self) -> None:
+        """Initialize an empty table."""
+        self.location_ids: array[int] = array("q")
+        self.zone_ids: array[int] = array("q")
+        self.statuses: array[int] = array("q")
+        self.partitions: array[int] = array("q")
+        self.zone_types: array[int] = array("q")
+        self.battery_levels: array[int] = array("q")
+        self.signal_strengths: array[int] = array("q")
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.zone_ids)
+
+    def __repr__(self) -> str:
+        """Return a short description of the table."""
+        return f"<ZoneTable rows={len(self)}>"
+
+    @classmethod
+    def from_location(cls, location: "TotalConnectLocation") -> "ZoneTable":
+        """Build a table from the zones of one location."""
+        table = cls()
+        table.add_zones(location.location_id, location.zones.values())
+        return table
+
+    @classmethod
+    def from_tables(cls, tables: Iterable["ZoneTable"]) -> "ZoneTable":
+        """Concatenate several tables into one."""
+        combined = cls()
+        for table in tables:
+            combined.extend(table)
+        return combined
+
+    def add_zone(self, location_id: int, zone: TotalConnectZone) -> None:
+        """Append one zone as a new row."""
+        zone_id, status, partition, zone_type, battery_level, signal_strength = _zone_row(zone)
+        self.location_ids.append(location_id)
+        self.zone_ids.append(zone_id)
+        self.statuses.append(status)
+        self.partitions.append(partition)
+        self.zone_types.append(zone_type)
+        self.battery_levels.append(battery_level)
+        self.signal_strengths.append(signal_strength)
+
+    def set_zone(self, row: int, zone: TotalConnectZone) -> None:
+        """Replace the state in a row with that of a zone, which was updated."""
+        (
+            self.zone_ids[row],
+            self.statuses[row],
+            self.partitions[row],
+            self.zone_types[row],
+            self.battery_levels[row],
+            self.signal_strengths[row],
+        ) = _zone_row(zone)
+
+    def add_zones(self, location_id: int, zones: Iterable[TotalConnectZone]) -> None:
+        """Append a row for each of the given zones."""
+        for zone in zones:
+            self.add_zone(location_id, zone)
+
+    def extend(self, other: "ZoneTable") -> None:
+        """Append all rows of another table."""
+        for column in self.__slots__:
+            getattr(self, column).extend(getattr(other, column))
+
+    def _select(self, selectors: Iterator[object]) -> list[int]:
+        """Return zone IDs of rows where the selector is true."""
+        return list(compress(self.zone_ids, selectors))
+
+    def _select_keys(self, selectors: Iterator[object]) -> list[tuple[int, int]]:
+        """Return (location ID, zone ID) of rows where the selector is true."""
+        return list(compress(zip(self.location_ids, self.zone_ids, strict=True), selectors))
+
+    def _any_bits(self, mask: ZoneStatus) -> Iterator[int]:
+        return map(int(mask).__and__, self.statuses)
+
+    def _all_bits(self, mask: ZoneStatus) -> Iterator[bool]:
+        bits = int(mask)
+        return map(eq, map(bits.__and__, self.statuses), repeat(bits))
+
+    def with_status(self, mask: ZoneStatus) -> list[int]:
+        """Return IDs of zones with any of the status bits in mask."""
+        return self._select(self._any_bits(mask))
+
+    def with_all_status(self, mask: ZoneStatus) -> list[int]:
+        """Return IDs of zones with all of the status bits in mask."""
+        return self._select(self._all_bits(mask))
+
+    def keys_with_status(self, mask: ZoneStatus) -> list[tuple[int, int]]:
+        """Return (location ID, zone ID) of zones with any of the status bits in mask.
+
+        Use this instead of with_status() on a table spanning several locations,
+        since zone IDs are only unique within a location.
+        """
+        return self._select_keys(self._any_bits(mask))
+
+    def faulted(self) -> list[int]:
+        """Return IDs of faulted zones."""
+        return self.with_status(ZoneStatus.FAULT)
+
+    def bypassed(self) -> list[int]:
+        """Return IDs of bypassed zones."""
+        return self.with_status(ZoneStatus.BYPASSED)
+
+    def low_battery(self) -> list[int]:
+        """Return IDs of zones with a low battery."""
+        return self.with_status(ZoneStatus.LOW_BATTERY)
+
+    def tampered(self) -> list[int]:
+        """Return IDs of tampered zones (same test as TotalConnectZone.is_tampered)."""
+        return self.with_status(ZoneStatus.TROUBLE | ZoneStatus.TAMPER)
+
+    def triggered(self) -> list[int]:
+        """Return IDs of triggered zones."""
+        return self.with_status(ZoneStatus.TRIGGERED)
+
+    def in_partition(self, partition_id: int) -> list[int]:
+        """Return IDs of zones in the given partition."""
+        return self._select(map(eq, self.partitions, repeat(partition_id)))
+
+    def of_type(self, zone_type: ZoneType | int) -> list[int]:
+        """Return IDs of zones of the given ZoneType (or raw zone type value)."""
+        value = zone_type.value if isinstance(zone_type, ZoneType) else zone_type
+        return self._select(map(eq, self.zone_types, repeat(value)))
+
+
+def _zone_row(zone: TotalConnectZone) -> tuple[int, int, int, int, int, int]:
+    """Return the columns of a zone but its location ID."""
+    zone_type = zone.zone_type_id
+    if isinstance(zone_type, ZoneType):
+        zone_type_value = zone_type.value
+    else:
+        zone_type_value = MISSING if zone_type is None else int(zone_type)
+    return (
+        zone.zoneid,
+        int(zone.status),
+        int(zone.partition or 0),
+        zone_type_value,
+        _or_missing(zone.battery_level),
+        _or_missing(zone.signal_strength),
+    )
+
+
+def _or_missing(value: int | None) -> int:
+    return MISSING if value is None else int(value)